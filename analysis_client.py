@@ -0,0 +1,169 @@
+"""Cliente mínimo del daemon de análisis (``analysis_daemon.py``).
+
+Sólo usa la biblioteca estándar: no importa PLY ni los analizadores, así
+que una consulta cuesta el arranque de Python más el análisis en el daemon
+(ya en caliente), no la construcción del lexer y las tablas del parser.
+
+Uso:
+    python analysis_client.py analizar <archivo.dart> <usuario-git> [--reglas R ...] [--workers N]
+    python analysis_client.py tokenizar <archivo.dart> <usuario-git>
+    python analysis_client.py parsear <archivo.dart> <usuario-git>
+    python analysis_client.py estado
+    python analysis_client.py detener
+    python analysis_client.py iniciar
+
+``--json`` imprime la respuesta completa; ``--iniciar`` lanza el daemon si
+no está corriendo. Código de salida: 0 sin errores, 1 si el análisis
+encontró errores, 2 si no se pudo hablar con el daemon.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+# Un análisis grande puede tardar; el daemon responde siempre, aun con error
+DEFAULT_TIMEOUT = 300.0
+START_TIMEOUT = 10.0
+
+_ids = itertools.count(1)
+
+
+class DaemonError(Exception):
+    """Error JSON-RPC devuelto por el daemon."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(f"{message} (código {code})")
+        self.code = code
+        self.message = message
+
+
+def default_socket_path() -> str:
+    """Ruta del socket: ``$TOKENMASTERS_SOCKET`` o un archivo por usuario en el temporal."""
+    configured = os.environ.get("TOKENMASTERS_SOCKET")
+    if configured:
+        return configured
+    owner = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    return os.path.join(tempfile.gettempdir(), f"tokenmasters-{owner}.sock")
+
+
+def call(method: str, params: Optional[Dict] = None, socket_path: Optional[str] = None,
+         timeout: Optional[float] = DEFAULT_TIMEOUT):
+    """Envía una petición y retorna ``result``; lanza DaemonError u OSError."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Esta plataforma no tiene sockets Unix")
+    request = {"jsonrpc": "2.0", "id": next(_ids), "method": method, "params": params or {}}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.settimeout(timeout)
+        conn.connect(socket_path or default_socket_path())
+        conn.sendall(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        with conn.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise OSError("El daemon cerró la conexión sin responder")
+    response = json.loads(line)
+    error = response.get("error")
+    if error:
+        raise DaemonError(error.get("code", 0), error.get("message", ""))
+    return response.get("result")
+
+
+def is_running(socket_path: Optional[str] = None) -> bool:
+    try:
+        call("ping", socket_path=socket_path, timeout=2.0)
+    except (OSError, DaemonError, ValueError):
+        return False
+    return True
+
+
+def start_daemon(socket_path: Optional[str] = None, timeout: float = START_TIMEOUT) -> None:
+    """Lanza el daemon en segundo plano y espera a que responda."""
+    socket_path = socket_path or default_socket_path()
+    subprocess.Popen(
+        [sys.executable, str(PROJECT_ROOT / "analysis_daemon.py"), "--socket", socket_path],
+        cwd=str(PROJECT_ROOT),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_running(socket_path):
+            return
+        time.sleep(0.05)
+    raise OSError(f"El daemon no respondió en {timeout:.0f} s ({socket_path})")
+
+
+def _print_errors(errors: List[Dict]) -> None:
+    for error in errors:
+        print(f"[{error['type']}] {error['description']}")
+    print(f"{len(errors)} error(es)" if errors else "Sin errores")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = argparse.ArgumentParser(description="Cliente del daemon de análisis de TokenMasters")
+    args.add_argument("--socket", default=None, help="ruta del socket (por defecto, default_socket_path())")
+    args.add_argument("--json", action="store_true", help="imprimir la respuesta completa en JSON")
+    args.add_argument("--iniciar", action="store_true", help="lanzar el daemon si no está corriendo")
+    commands = args.add_subparsers(dest="command", required=True)
+    for name in ("analizar", "tokenizar", "parsear"):
+        command = commands.add_parser(name)
+        command.add_argument("archivo")
+        command.add_argument("usuario")
+        if name == "analizar":
+            command.add_argument("--reglas", nargs="+", default=None)
+            command.add_argument("--workers", type=int, default=None)
+    for name in ("estado", "detener", "iniciar"):
+        commands.add_parser(name)
+    opts = args.parse_args(argv)
+
+    methods = {"analizar": "analyze", "tokenizar": "tokenize", "parsear": "parse",
+               "estado": "ping", "detener": "shutdown"}
+    try:
+        if opts.command == "iniciar" or (opts.iniciar and not is_running(opts.socket)):
+            if is_running(opts.socket):
+                print("El daemon ya está corriendo")
+                return 0
+            start_daemon(opts.socket)
+            if opts.command == "iniciar":
+                print(f"Daemon iniciado en {opts.socket or default_socket_path()}")
+                return 0
+
+        params: Dict = {}
+        if opts.command in ("analizar", "tokenizar", "parsear"):
+            with open(opts.archivo, "r", encoding="utf-8") as source:
+                params = {"code": source.read(), "git_user": opts.usuario}
+            if opts.command == "analizar":
+                params.update(rules=opts.reglas, workers=opts.workers)
+        result = call(methods[opts.command], params, opts.socket)
+    except DaemonError as exc:
+        print(f"Error del daemon: {exc}", file=sys.stderr)
+        return 2
+    except OSError as exc:
+        print(f"No se pudo contactar al daemon: {exc}", file=sys.stderr)
+        print("Inícielo con: python analysis_client.py iniciar", file=sys.stderr)
+        return 2
+
+    if opts.json or opts.command in ("estado", "detener"):
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+        return 0
+    if opts.command == "tokenizar":
+        print(f"{result['stats']['token_count']} tokens")
+    _print_errors(result["errors"])
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
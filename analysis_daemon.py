@@ -0,0 +1,347 @@
+"""Daemon de análisis: lexer y parser en caliente detrás de un socket Unix.
+
+Cada ``python parser.py`` paga el arranque de Python, importar PLY,
+construir el lexer y cargar las tablas LALR antes de unos pocos
+milisegundos de trabajo real. El daemon hace todo eso una sola vez y
+atiende peticiones JSON-RPC 2.0 sobre ``analyzer_service``, una por línea
+(UTF-8) y varias por conexión:
+
+    {"jsonrpc": "2.0", "id": 1, "method": "analyze",
+     "params": {"code": "...", "git_user": "Sam-24-dev"}}
+
+Métodos:
+    analyze   code, git_user[, rules, workers] -> AnalysisResult como dict
+    tokenize  code, git_user -> resultado de run_lexical_analysis
+    parse     code, git_user -> resultado de run_syntax_analysis
+    ping      -> pid, socket, huella de la gramática y contadores
+    shutdown  -> responde y detiene el daemon
+
+Las respuestas se guardan en memoria (LRU por método y parámetros, hasta
+``RESULT_CACHE_SIZE``): repetir una petición idéntica no vuelve a analizar
+ni a escribir logs; sus rutas de log son las de la primera vez. Por debajo
+sigue la caché de parseo en disco (``parse_cache.py``).
+
+El socket se crea con permisos 0600: sólo el usuario dueño puede
+conectarse. El cliente es ``analysis_client.py``.
+
+Con ``--metricas-puerto`` o ``--metricas-archivo`` se activan las métricas
+de ``service_metrics`` (análisis, errores, latencias, aciertos de caché):
+por HTTP en localhost (``GET /metrics``) o volcadas a un archivo cada
+``METRICS_WRITE_INTERVAL`` segundos y al detenerse.
+
+Cada análisis respeta los límites de recursos de ``parser.limits`` (bytes,
+tokens, profundidad y nodos del AST, segundos, errores); al superarlos la
+respuesta trae un diagnóstico "Límite de análisis excedido" en vez de
+colgar o tumbar el daemon. ``--limite NOMBRE=VALOR`` los cambia (p. ej.
+``--limite max_seconds=5``; ``ninguno`` quita el límite).
+
+Uso:
+    python analysis_daemon.py [--socket RUTA] [--metricas-puerto N] [--metricas-archivo RUTA]
+                              [--limite NOMBRE=VALOR ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import re
+import signal
+import socket
+import socketserver
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Dict, Optional
+
+import analysis_client
+import analyzer_service
+import lexer as lexer_module
+import parse_cache
+import parser as parser_module
+import service_metrics
+
+# Códigos de error de JSON-RPC 2.0
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+RESULT_CACHE_SIZE = 128
+METRICS_WRITE_INTERVAL = 15.0
+
+# El usuario forma parte del nombre de los logs: nada de rutas
+_GIT_USER_RE = re.compile(r"^[\w.\-]+$")
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _require_str(params: Dict, key: str) -> str:
+    value = params.get(key)
+    if not isinstance(value, str):
+        raise RpcError(INVALID_PARAMS, f"'{key}' debe ser un string")
+    return value
+
+
+def _analysis_params(params: Dict):
+    code = _require_str(params, "code")
+    git_user = _require_str(params, "git_user")
+    if not _GIT_USER_RE.match(git_user):
+        raise RpcError(INVALID_PARAMS, f"Usuario git inválido: {git_user!r}")
+    return code, git_user
+
+
+class AnalysisDaemon:
+    """Despacha las peticiones JSON-RPC y guarda las respuestas recientes."""
+
+    def __init__(self, socket_path: str) -> None:
+        self.socket_path = socket_path
+        self.started = monotonic()
+        self.requests = 0
+        self.cache_hits = 0
+        self._results: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.server: Optional[socketserver.BaseServer] = None
+        self._methods = {
+            "analyze": self._analyze,
+            "tokenize": self._tokenize,
+            "parse": self._parse,
+            "ping": self._ping,
+            "shutdown": self._shutdown,
+        }
+
+    def warm_up(self) -> None:
+        """Construye lexer y parser antes de aceptar conexiones."""
+        lexer_module.get_lexer()
+        parser_module.get_parser()
+        parse_cache.grammar_fingerprint()
+
+    # ---------------- métodos ----------------
+
+    def _analyze(self, params: Dict) -> Dict:
+        code, git_user = _analysis_params(params)
+        rules = params.get("rules")
+        if rules is not None and not (isinstance(rules, list) and all(isinstance(r, str) for r in rules)):
+            raise RpcError(INVALID_PARAMS, "'rules' debe ser una lista de nombres")
+        if rules is not None:
+            try:
+                parser_module.rule_dispatch(rules)
+            except ValueError as exc:
+                raise RpcError(INVALID_PARAMS, str(exc)) from None
+        workers = params.get("workers")
+        if workers is not None and (not isinstance(workers, int) or workers < 1):
+            raise RpcError(INVALID_PARAMS, "'workers' debe ser un entero positivo")
+        result = analyzer_service.run_full_analysis(code, git_user, rules, workers)
+        return dataclasses.asdict(result)
+
+    def _tokenize(self, params: Dict) -> Dict:
+        return analyzer_service.run_lexical_analysis(*_analysis_params(params))
+
+    def _parse(self, params: Dict) -> Dict:
+        return analyzer_service.run_syntax_analysis(*_analysis_params(params))
+
+    def _ping(self, params: Dict) -> Dict:
+        return {
+            "pid": os.getpid(),
+            "socket": self.socket_path,
+            "grammar": parse_cache.grammar_fingerprint(),
+            "uptime_s": round(monotonic() - self.started, 3),
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "cached_results": len(self._results),
+        }
+
+    def _shutdown(self, params: Dict) -> Dict:
+        if self.server is not None:
+            # shutdown() espera a serve_forever: no puede llamarse desde su hilo
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        return {"stopping": True}
+
+    # ---------------- despacho ----------------
+
+    def call(self, method: str, params: Dict):
+        handler = self._methods.get(method)
+        if handler is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Método desconocido: {method}")
+        if method in ("ping", "shutdown"):
+            return handler(params)
+
+        key = hashlib.sha256(
+            json.dumps([method, params], sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                self.cache_hits += 1
+                if service_metrics.is_enabled():
+                    service_metrics.record_cache("daemon", True)
+                return cached
+        if service_metrics.is_enabled():
+            service_metrics.record_cache("daemon", False)
+        result = handler(params)
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return result
+
+    def handle_line(self, line: bytes) -> Optional[bytes]:
+        """Respuesta serializada para una línea de petición (None si es notificación)."""
+        request_id = None
+        notification = False
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError as exc:
+                raise RpcError(PARSE_ERROR, f"JSON inválido: {exc}") from None
+            if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                raise RpcError(INVALID_REQUEST, "Se esperaba un objeto con 'method'")
+            request_id = request.get("id")
+            notification = "id" not in request
+            params = request.get("params", {})
+            if not isinstance(params, dict):
+                raise RpcError(INVALID_PARAMS, "'params' debe ser un objeto")
+            with self._lock:
+                self.requests += 1
+            response = {"jsonrpc": "2.0", "id": request_id, "result": self.call(request["method"], params)}
+        except RpcError as exc:
+            response = {"jsonrpc": "2.0", "id": request_id, "error": {"code": exc.code, "message": exc.message}}
+        except Exception as exc:  # el daemon sigue vivo aunque falle un análisis
+            response = {"jsonrpc": "2.0", "id": request_id,
+                        "error": {"code": INTERNAL_ERROR, "message": f"{type(exc).__name__}: {exc}"}}
+        if notification:
+            return None
+        return json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        daemon: AnalysisDaemon = self.server.daemon
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_BYTES + 1)
+            if not line:
+                return
+            if len(line) > MAX_REQUEST_BYTES:
+                error = {"code": INVALID_REQUEST, "message": f"Petición de más de {MAX_REQUEST_BYTES} bytes"}
+                self.wfile.write(json.dumps({"jsonrpc": "2.0", "id": None, "error": error}).encode("utf-8") + b"\n")
+                return
+            if not line.strip():
+                continue
+            response = daemon.handle_line(line)
+            if response is not None:
+                self.wfile.write(response)
+                self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _claim_socket(path: str) -> None:
+    """Elimina un socket abandonado; falla si otro daemon ya lo atiende."""
+    if not os.path.exists(path):
+        return
+    if analysis_client.is_running(path):
+        raise SystemExit(f"Ya hay un daemon escuchando en {path}")
+    os.unlink(path)
+
+
+def _write_metrics_periodically(path: str, stop: threading.Event) -> None:
+    while not stop.wait(METRICS_WRITE_INTERVAL):
+        try:
+            service_metrics.write(path)
+        except OSError:
+            pass  # se reintenta en el siguiente intervalo
+
+
+def serve(socket_path: Optional[str] = None, metrics_port: Optional[int] = None,
+          metrics_file: Optional[str] = None) -> None:
+    if not hasattr(socket, "AF_UNIX"):
+        raise SystemExit("Esta plataforma no tiene sockets Unix")
+    socket_path = socket_path or analysis_client.default_socket_path()
+    daemon = AnalysisDaemon(socket_path)
+    daemon.warm_up()
+    _claim_socket(socket_path)
+
+    previous_umask = os.umask(0o177)  # socket 0600 desde su creación
+    try:
+        server = _Server(socket_path, _RequestHandler)
+    finally:
+        os.umask(previous_umask)
+    server.daemon = daemon
+    daemon.server = server
+    # SIGTERM (kill, systemd) detiene el daemon igual que el método shutdown
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+
+    metrics_server = None
+    stop_metrics = threading.Event()
+    if metrics_port is not None:
+        metrics_server = service_metrics.serve(metrics_port)
+        print(f"Métricas en http://127.0.0.1:{metrics_port}/metrics", flush=True)
+    if metrics_file:
+        service_metrics.enable()
+        threading.Thread(target=_write_metrics_periodically, args=(metrics_file, stop_metrics), daemon=True).start()
+
+    print(f"Daemon de análisis escuchando en {socket_path} (pid {os.getpid()})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stop_metrics.set()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        if metrics_file:
+            service_metrics.write(metrics_file)
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+
+
+def _limit_arg(text: str):
+    name, sep, value = text.partition("=")
+    name = name.strip()
+    if not sep or name not in parser_module.DEFAULT_LIMITS:
+        raise argparse.ArgumentTypeError(
+            f"se esperaba NOMBRE=VALOR con NOMBRE en {', '.join(parser_module.DEFAULT_LIMITS)}"
+        )
+    value = value.strip()
+    if value.lower() in ("ninguno", "none"):
+        return name, None
+    try:
+        number = float(value) if name == "max_seconds" else int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valor inválido para {name}: {value}") from None
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"{name} debe ser positivo")
+    return name, number
+
+
+def main(argv=None) -> None:
+    args = argparse.ArgumentParser(description="Daemon de análisis de TokenMasters (JSON-RPC sobre socket Unix)")
+    args.add_argument("--socket", default=None, help="ruta del socket (por defecto, analysis_client.default_socket_path())")
+    args.add_argument("--metricas-puerto", type=int, default=None, help="exponer métricas Prometheus en este puerto local")
+    args.add_argument("--metricas-archivo", default=None, help="volcar las métricas a este archivo periódicamente")
+    args.add_argument(
+        "--limite", action="append", type=_limit_arg, default=[], metavar="NOMBRE=VALOR",
+        help="límite de recursos por análisis (repetible), p. ej. max_seconds=5",
+    )
+    opts = args.parse_args(argv)
+    parser_module.set_limits(**dict(opts.limite))
+    serve(opts.socket, opts.metricas_puerto, opts.metricas_archivo)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,18 +10,25 @@ consumidos por la interfaz gráfica u otros clientes.
 
 from __future__ import annotations
 
+import hashlib
 import io
 import os
 import re
 import tempfile
-from contextlib import redirect_stdout
-from dataclasses import dataclass
+import threading
+from bisect import bisect_right
+from contextlib import nullcontext, redirect_stdout
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from time import perf_counter_ns
+from typing import Dict, List, Optional, Tuple
 
 import lexer as lexer_module
 import parser as parser_module
+import profiler
+import service_metrics
+from token_stream import TokenArray
 
 
 # Directorios principales
@@ -29,6 +36,10 @@ PROJECT_ROOT = Path(__file__).resolve().parent
 LOG_DIR = PROJECT_ROOT / "logs"
 TEMP_DIR = LOG_DIR / "tmp"
 
+# parser.py guarda errores y tablas en variables globales y el objeto parser
+# de PLY no es reentrante: cualquier uso concurrente se serializa con este lock.
+ANALYSIS_LOCK = threading.RLock()
+
 
 @dataclass
 class AnalysisResult:
@@ -36,6 +47,10 @@ class AnalysisResult:
     errors: List[Dict]
     log_paths: Dict[str, Optional[str]]
     raw_outputs: Dict[str, str]
+    # Por fase: {"timings_ns": {subfase: ns}, "counters": {nombre: valor}}
+    metrics: Dict[str, Dict] = field(default_factory=dict)
+    # Archivo collapsed-stack de la corrida (sólo con profiler.enable())
+    profile_path: Optional[str] = None
 
 
 def _ensure_directories() -> None:
@@ -88,8 +103,8 @@ def _extract_line_number(message: str) -> Optional[int]:
     return None
 
 
-def _format_error_entry(message: str, kind: str) -> Dict:
-    """Crea una entrada uniforme de error para la GUI."""
+def format_error_entry(message: str, kind: str) -> Dict:
+    """Crea una entrada uniforme de error (la de la GUI, el modo watch y el análisis en vivo)."""
     return {
         "type": kind,
         "line": _extract_line_number(message),
@@ -99,15 +114,30 @@ def _format_error_entry(message: str, kind: str) -> Dict:
 
 def run_lexical_analysis(code: str, git_user: str) -> Dict:
     """Ejecuta el análisis léxico directamente sobre el texto recibido."""
+    return run_lexical_phase(code, git_user)[0]
+
+
+def run_lexical_phase(code: str, git_user: str) -> Tuple[Dict, Optional[TokenArray]]:
+    """Análisis léxico; además guarda los tokens para que el parser no vuelva a tokenizar.
+
+    Retorna (resultado léxico, TokenArray) para pasar los tokens a
+    ``run_syntax_analysis`` y ``run_semantic_analysis``. El TokenArray es
+    None si un límite cortó la tokenización.
+    """
     _ensure_directories()
 
     tokens: List[Dict] = []
     errors: List[Dict] = []
     token_count = 0
+    recorded: Optional[TokenArray] = TokenArray()
 
-    original_t_error = lexer_module.t_error
+    limits = parser_module.limits
+    max_tokens = limits["max_tokens"]
+    max_errors = limits["max_errors"]
 
     def custom_t_error(t):
+        if max_errors is not None and len(errors) >= max_errors:
+            raise parser_module.AnalysisLimitExceeded("max_errors", max_errors)
         message = (
             f"Carácter ilegal '{t.value[0]}' en línea {t.lexer.lineno}, "
             f"columna {lexer_module.find_column(t)}"
@@ -119,36 +149,54 @@ def run_lexical_analysis(code: str, git_user: str) -> Dict:
                 "description": message,
             }
         )
+        recorded.add_error(t.lexer.lineno, t.lexpos)
         t.lexer.skip(1)
 
-    lexer_module.t_error = custom_t_error
+    timings: Dict[str, int] = {}
+
+    start = perf_counter_ns()
+    ply_lexer = lexer_module.get_lexer()
+    timings["lexer_build"] = perf_counter_ns() - start
 
+    start = perf_counter_ns()
+    deadline = None if limits["max_seconds"] is None else start + int(limits["max_seconds"] * 1e9)
+    ply_lexer.lexerrorf = custom_t_error
     try:
-        ply_lexer = lexer_module.build_lexer()
+        parser_module._check_input_size(code)
         ply_lexer.input(code)
-
         while True:
             tok = ply_lexer.token()
             if not tok:
                 break
 
+            if max_tokens is not None and token_count >= max_tokens:
+                raise parser_module.AnalysisLimitExceeded("max_tokens", max_tokens)
             token_count += 1
+            if deadline is not None and not token_count & 0x3FF and perf_counter_ns() > deadline:
+                raise parser_module.AnalysisLimitExceeded("max_seconds", limits["max_seconds"])
+            recorded.append(tok)
             tokens.append(
                 {
                     "num": token_count,
                     "token": tok.type,
-                    "value": _stringify_token_value(tok.value),
+                    "value": _stringify_token_value(lexer_module.literal_value(tok.type, tok.value)),
                     "line": tok.lineno,
                 }
             )
-    finally:
-        lexer_module.t_error = original_t_error
+    except parser_module.AnalysisLimitExceeded as exc:
+        # Los tokens reconocidos hasta el límite igual van al log
+        errors.append({"type": "Léxico", "line": None, "description": str(exc)})
+        recorded = None
+    else:
+        recorded.finish(ply_lexer, code)
+    timings["tokenize"] = perf_counter_ns() - start
 
     now = datetime.now()
     timestamp = now.strftime("%d-%m-%Y-%Hh%M")
     log_filename = LOG_DIR / f"lexico-{git_user}-{timestamp}.txt"
 
-    with open(log_filename, "w", encoding="utf-8") as log_file:
+    start = perf_counter_ns()
+    with io.StringIO() as log_file:
         log_file.write("=" * 80 + "\n")
         log_file.write("  ANÁLISIS LÉXICO - DART\n")
         log_file.write("  Proyecto: TokenMasters\n")
@@ -182,12 +230,30 @@ def run_lexical_analysis(code: str, git_user: str) -> Dict:
                     f" Línea {error['line']}: {error['description']}\n"
                 )
 
+        log_file.write("\n" + "=" * 80 + "\n")
+        log_file.write("  TIEMPOS Y CONTADORES\n")
+        log_file.write("=" * 80 + "\n\n")
+        timings["log_render"] = perf_counter_ns() - start
+        for phase, elapsed in timings.items():
+            log_file.write(f" {phase:<28} {elapsed / 1e6:>10.3f} ms\n")
+        rendered = log_file.getvalue()
+
+    # log_io mide la escritura de lo ya renderizado; su fila y el pie van después
+    start = perf_counter_ns()
+    with open(log_filename, "w", encoding="utf-8") as log_file:
+        log_file.write(rendered)
+        timings["log_io"] = perf_counter_ns() - start
+        log_file.write(f" {'log_io':<28} {timings['log_io'] / 1e6:>10.3f} ms\n")
+        log_file.write(f" {'tokens':<28} {token_count:>10}\n")
         log_file.write("\n" + "=" * 80 + "\n")
         log_file.write(f"  Análisis realizado por: {git_user}\n")
         log_file.write("  Analizador Léxico para Dart - TokenMasters\n")
         log_file.write("=" * 80 + "\n")
 
-    return {
+    if service_metrics.is_enabled():
+        service_metrics.record_phase("lexico", timings, errors, tokens=token_count)
+
+    result = {
         "tokens": tokens,
         "errors": errors,
         "log_path": str(log_filename),
@@ -195,15 +261,26 @@ def run_lexical_analysis(code: str, git_user: str) -> Dict:
             "token_count": token_count,
             "error_count": len(errors),
         },
+        "timings": timings,
+        "counters": {"tokens": token_count},
     }
+    return result, recorded
 
 
 def _run_parser_phase(
     phase: str,
     code: str,
     git_user: str,
+    rules: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    token_array: Optional[TokenArray] = None,
 ) -> Dict:
-    """Ejecuta cualquiera de las fases del parser (sintáctica o semántica)."""
+    """Ejecuta cualquiera de las fases del parser (sintáctica o semántica).
+
+    ``rules`` limita las reglas semánticas aplicadas (None = todas las de
+    ``parser.SEMANTIC_RULES``) y ``workers`` > 1 reparte las funciones entre
+    procesos (ver ``parallel_semantic``); la fase sintáctica los ignora.
+    """
 
     temp_path = _write_temp_code(code)
     buffer = io.StringIO()
@@ -216,64 +293,385 @@ def _run_parser_phase(
         else:
             raise ValueError(f"Fase desconocida: {phase}")
 
-        with redirect_stdout(buffer):
-            analysis_fn(str(temp_path), git_user)
+        with ANALYSIS_LOCK:
+            with redirect_stdout(buffer):
+                if phase == "semantic":
+                    analysis_fn(str(temp_path), git_user, rules, workers, token_array)
+                else:
+                    analysis_fn(str(temp_path), git_user, token_array)
+
+            if phase == "syntax":
+                raw_errors = list(parser_module.syntax_errors)
+                kind = "Sintáctico"
+            else:
+                raw_errors = list(parser_module.semantic_errors)
+                kind = "Semántico"
+            timings = dict(parser_module.phase_timings)
+            counters = dict(parser_module.semantic_stats)
 
         raw_output = buffer.getvalue()
         log_path = _extract_log_path(raw_output)
         if log_path and not os.path.isabs(log_path):
             log_path = str((PROJECT_ROOT / log_path).resolve())
 
-        if phase == "syntax":
-            raw_errors = list(parser_module.syntax_errors)
-            kind = "Sintáctico"
-        else:
-            raw_errors = list(parser_module.semantic_errors)
-            kind = "Semántico"
-
-        errors = [_format_error_entry(message, kind) for message in raw_errors]
+        errors = [format_error_entry(message, kind) for message in raw_errors]
+        if service_metrics.is_enabled():
+            service_metrics.record_phase("sintactico" if phase == "syntax" else "semantico", timings, errors)
 
         return {
             "errors": errors,
             "log_path": log_path,
             "raw_output": raw_output,
+            "timings": timings,
+            "counters": counters,
         }
     finally:
         _cleanup_temp_code(temp_path)
 
 
-def run_syntax_analysis(code: str, git_user: str) -> Dict:
-    """Analiza la sintaxis del código recibido."""
-    return _run_parser_phase("syntax", code, git_user)
-
+def run_syntax_analysis(code: str, git_user: str, token_array: Optional[TokenArray] = None) -> Dict:
+    """Analiza la sintaxis del código recibido (con ``token_array``, sin volver a tokenizar)."""
+    return _run_parser_phase("syntax", code, git_user, token_array=token_array)
 
-def run_semantic_analysis(code: str, git_user: str) -> Dict:
-    """Analiza la semántica del código recibido."""
-    return _run_parser_phase("semantic", code, git_user)
 
+def run_semantic_analysis(
+    code: str,
+    git_user: str,
+    rules: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    token_array: Optional[TokenArray] = None,
+) -> Dict:
+    """Analiza la semántica del código recibido (opcionalmente sólo con ``rules``)."""
+    return _run_parser_phase("semantic", code, git_user, rules, workers, token_array)
 
-def run_full_analysis(code: str, git_user: str) -> AnalysisResult:
-    """Ejecuta léxico, sintáctico y semántico secuencialmente."""
-    lexical = run_lexical_analysis(code, git_user)
-    syntax = run_syntax_analysis(code, git_user)
-    semantic = run_semantic_analysis(code, git_user)
 
+def build_analysis_result(lexical: Dict, syntax: Dict, semantic: Dict) -> AnalysisResult:
+    """Combina los resultados de las tres fases en un AnalysisResult."""
     combined_errors: List[Dict] = []
     combined_errors.extend(lexical["errors"])
     combined_errors.extend(syntax["errors"])
     combined_errors.extend(semantic["errors"])
 
+    phases = {"lexico": lexical, "sintactico": syntax, "semantico": semantic}
     return AnalysisResult(
         tokens=lexical["tokens"],
         errors=combined_errors,
-        log_paths={
-            "lexico": lexical["log_path"],
-            "sintactico": syntax["log_path"],
-            "semantico": semantic["log_path"],
-        },
+        log_paths={key: phase["log_path"] for key, phase in phases.items()},
         raw_outputs={
             "lexico": "",
             "sintactico": syntax["raw_output"],
             "semantico": semantic["raw_output"],
         },
+        metrics={
+            key: {
+                "timings_ns": phase.get("timings", {}),
+                "counters": phase.get("counters", {}),
+            }
+            for key, phase in phases.items()
+        },
+    )
+
+
+def format_metrics_summary(metrics: Dict[str, Dict]) -> str:
+    """Resumen corto de tiempos por fase (para la barra de estado)."""
+    titles = {"lexico": "Léxico", "sintactico": "Sintáctico", "semantico": "Semántico"}
+    parts = []
+    total = 0
+    for key, title in titles.items():
+        elapsed = service_metrics.phase_total_ns(metrics.get(key, {}).get("timings_ns", {}))
+        total += elapsed
+        parts.append(f"{title} {elapsed / 1e6:.1f} ms")
+    return f"{total / 1e6:.1f} ms ({' · '.join(parts)})"
+
+
+def run_full_analysis(
+    code: str,
+    git_user: str,
+    rules: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+) -> AnalysisResult:
+    """Ejecuta léxico, sintáctico y semántico secuencialmente.
+
+    ``rules`` selecciona por nombre las reglas semánticas de esta corrida
+    (ver ``parser.SEMANTIC_RULES``); None aplica todas. ``workers`` > 1
+    valida las funciones de programas grandes en paralelo.
+    """
+    # Con perfilado, la corrida completa toma el lock para que ningún otro
+    # análisis (p. ej. el diagnóstico en vivo) se mezcle en las pilas.
+    profiling = profiler.is_enabled()
+    with ANALYSIS_LOCK if profiling else nullcontext():
+        if profiling:
+            profiler.reset()
+        # Se tokeniza una vez: las fases del parser consumen los mismos tokens
+        lexical, token_array = run_lexical_phase(code, git_user)
+        syntax = run_syntax_analysis(code, git_user, token_array)
+        semantic = run_semantic_analysis(code, git_user, rules, workers, token_array)
+        result = build_analysis_result(lexical, syntax, semantic)
+        if profiling:
+            result.profile_path = str(profiler.write_collapsed(profiler.collapsed_filename(git_user, LOG_DIR)))
+    if service_metrics.is_enabled():
+        service_metrics.record_analysis(code, result.metrics)
+    return result
+
+
+_LEXICAL_PREFIX = "ERROR LÉXICO: "
+_LINE_REF_RE = re.compile(r"([Ll][íi]nea\s+)(\d+)")
+
+
+def analyze_without_logs(
+    code: str,
+    rules: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    token_array: Optional[TokenArray] = None,
+) -> List[Dict]:
+    """Errores de las tres fases sobre el texto, sin logs ni archivos temporales.
+
+    Con ``token_array`` (un TokenArray de ``code``) el parser no vuelve a tokenizar.
+    """
+    last_line = code.count("\n") + 1
+    with ANALYSIS_LOCK:
+        parser_module.reset_semantic_state()
+        with redirect_stdout(io.StringIO()) as output:
+            # Los errores léxicos se imprimen durante el parseo (y se
+            # repiten tal cual cuando el AST sale de la caché)
+            tree = parser_module._parse_timed(code, token_array)
+            if tree is not None:
+                parser_module.validate_semantic_rules(tree, rules, workers)
+
+        errors = [
+            format_error_entry(line[len(_LEXICAL_PREFIX):], "Léxico")
+            for line in output.getvalue().splitlines()
+            if line.startswith(_LEXICAL_PREFIX)
+        ]
+        for message in parser_module.syntax_errors:
+            entry = format_error_entry(message, "Sintáctico")
+            if entry["line"] is None:
+                entry["line"] = last_line  # final de archivo inesperado
+            errors.append(entry)
+        errors.extend(format_error_entry(m, "Semántico") for m in parser_module.semantic_errors)
+    return errors
+
+
+# ---------------- análisis por lotes con deduplicación ----------------
+
+@dataclass
+class BatchItem:
+    name: str
+    errors: List[Dict]
+    token_count: int
+    # Archivo cuyo análisis se reutilizó (None si se analizó este mismo)
+    duplicate_of: Optional[str] = None
+
+
+@dataclass
+class BatchResult:
+    items: List[BatchItem]
+    unique: int
+    # Tiempo de los análisis realizados y estimado de los que se evitaron
+    analysis_ns: int
+    saved_ns: int
+
+    @property
+    def dedup_ratio(self) -> float:
+        return 1 - self.unique / len(self.items) if self.items else 0.0
+
+
+@dataclass
+class _Stream:
+    digest: str
+    tokens: TokenArray
+    lexical_errors: List[Dict]
+    last_line: int
+
+    @property
+    def token_lines(self) -> List[int]:
+        return self.tokens.lines
+
+
+def _normalized_stream(code: str) -> _Stream:
+    """Hash del flujo de tokens (sin comentarios ni espacios) y errores léxicos.
+
+    Lanza ``AnalysisLimitExceeded`` con los mismos límites que el análisis léxico.
+    """
+    errors: List[Dict] = []
+    max_tokens = parser_module.limits["max_tokens"]
+    max_errors = parser_module.limits["max_errors"]
+    parser_module._check_input_size(code)
+
+    def collect_error(t):
+        if max_errors is not None and len(errors) >= max_errors:
+            raise parser_module.AnalysisLimitExceeded("max_errors", max_errors)
+        errors.append(
+            format_error_entry(
+                f"Carácter ilegal '{t.value[0]}' en línea {t.lexer.lineno}, "
+                f"columna {lexer_module.find_column(t)}",
+                "Léxico",
+            )
+        )
+        recorded.add_error(t.lexer.lineno, t.lexpos)
+        t.lexer.skip(1)
+
+    recorded = TokenArray()
+    ply_lexer = lexer_module.get_lexer()
+    ply_lexer.lexerrorf = collect_error
+    ply_lexer.input(code)
+    while True:
+        tok = ply_lexer.token()
+        if not tok:
+            break
+        recorded.append(tok)
+        if max_tokens is not None and len(recorded) > max_tokens:
+            raise parser_module.AnalysisLimitExceeded("max_tokens", max_tokens)
+    recorded.finish(ply_lexer, code)
+
+    # Tipos y textos de los tokens (un STRING empieza y termina con comilla,
+    # así que separar con \0 no es ambiguo)
+    digest = hashlib.sha256()
+    digest.update("\0".join(recorded.types).encode("utf-8"))
+    digest.update(b"\1")
+    digest.update("\0".join(recorded.values).encode("utf-8", "surrogatepass"))
+    # Los caracteres ilegales también cuentan: cambian el parseo
+    for entry in errors:
+        digest.update(entry["description"].split(" en línea", 1)[0].encode("utf-8"))
+    return _Stream(digest.hexdigest(), recorded, errors, code.count("\n") + 1)
+
+
+def _line_mapper(source: _Stream, target: _Stream):
+    """Traduce líneas del archivo analizado a las del duplicado, token a token."""
+    keys: List[int] = []
+    values: List[int] = []
+    for source_line, target_line in zip(source.token_lines, target.token_lines):
+        if not keys or source_line != keys[-1]:
+            keys.append(source_line)
+            values.append(target_line)
+
+    def remap(line: int) -> int:
+        index = bisect_right(keys, line) - 1
+        if index < 0:
+            return line if not keys else max(1, values[0] - (keys[0] - line))
+        return max(1, values[index] + (line - keys[index]))
+
+    return remap
+
+
+def _fan_out(errors: List[Dict], source: _Stream, target: _Stream) -> List[Dict]:
+    """Errores sintácticos y semánticos del representante con las líneas del duplicado."""
+    remap = _line_mapper(source, target)
+    result = []
+    for entry in errors:
+        description = _LINE_REF_RE.sub(lambda m: f"{m.group(1)}{remap(int(m.group(2)))}", entry["description"])
+        if entry["line"] is None:
+            line = None
+        elif _LINE_REF_RE.search(entry["description"]) is None:
+            line = target.last_line  # final de archivo inesperado
+        else:
+            line = remap(entry["line"])
+        result.append({**entry, "line": line, "description": description})
+    return result
+
+
+def run_batch_analysis(
+    sources: Dict[str, str],
+    rules: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+) -> BatchResult:
+    """Analiza un lote (nombre -> código) una vez por flujo de tokens distinto.
+
+    Los archivos que sólo difieren en espacios o comentarios comparten el
+    análisis sintáctico y semántico del primero del lote; sus errores se
+    reportan con sus propias líneas y los léxicos se obtienen de cada uno.
+    No se escriben logs.
+    """
+    items: List[BatchItem] = []
+    # hash del texto -> índice del ítem; hash del flujo -> (nombre, flujo, errores)
+    by_bytes: Dict[str, int] = {}
+    by_stream: Dict[str, tuple] = {}
+    cost_ns: Dict[str, int] = {}  # nombre del representante -> tiempo de su análisis
+    analysis_ns = saved_ns = 0
+    # Construir lexer y parser fuera de la medición del primer archivo
+    lexer_module.get_lexer()
+    parser_module.get_parser()
+
+    for name, code in sources.items():
+        raw_digest = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        if raw_digest in by_bytes:
+            original = items[by_bytes[raw_digest]]
+            owner = original.duplicate_of or original.name
+            items.append(BatchItem(name, [dict(e) for e in original.errors], original.token_count, owner))
+            saved_ns += cost_ns[owner]
+            continue
+        by_bytes[raw_digest] = len(items)
+
+        try:
+            stream = _normalized_stream(code)
+        except parser_module.AnalysisLimitExceeded as exc:
+            # Sin el flujo completo no hay con qué deduplicar: sólo el diagnóstico
+            cost_ns[name] = 0
+            items.append(BatchItem(name, [format_error_entry(str(exc), "Léxico")], 0))
+            continue
+        known = by_stream.get(stream.digest)
+        if known is None:
+            start = perf_counter_ns()
+            errors = [e for e in analyze_without_logs(code, rules, workers, stream.tokens) if e["type"] != "Léxico"]
+            cost_ns[name] = perf_counter_ns() - start
+            analysis_ns += cost_ns[name]
+            by_stream[stream.digest] = (name, stream, errors)
+            items.append(BatchItem(name, stream.lexical_errors + errors, len(stream.token_lines)))
+            continue
+
+        owner, source, errors = known
+        saved_ns += cost_ns[owner]
+        items.append(
+            BatchItem(name, stream.lexical_errors + _fan_out(errors, source, stream), len(stream.token_lines), owner)
+        )
+
+    if service_metrics.is_enabled():
+        service_metrics.record_cache("lote", True, len(items) - len(by_stream))
+        service_metrics.record_cache("lote", False, len(by_stream))
+    return BatchResult(items, len(by_stream), analysis_ns, saved_ns)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import json
+    import workspace_index
+
+    args = argparse.ArgumentParser(
+        description="Análisis por lotes: cada código distinto (sin contar espacios ni comentarios) se analiza una vez"
     )
+    args.add_argument("rutas", nargs="+", help="archivos .dart o carpetas")
+    args.add_argument("--reglas", nargs="+", default=None)
+    args.add_argument("--workers", type=int, default=None)
+    args.add_argument("--salida", help="archivo JSON con los errores de cada archivo")
+    opts = args.parse_args(argv)
+
+    sources: Dict[str, str] = {}
+    for route in opts.rutas:
+        paths = sorted(e.path for e in workspace_index.iter_dart_files(route)) if os.path.isdir(route) else [route]
+        for path in paths:
+            with open(path, "r", encoding="utf-8-sig") as source:
+                sources[path] = source.read()
+
+    result = run_batch_analysis(sources, opts.reglas, opts.workers)
+    for item in result.items:
+        note = f"  (= {item.duplicate_of})" if item.duplicate_of else ""
+        print(f"{item.name}: {len(item.errors)} error(es){note}")
+    print(
+        f"{len(result.items)} archivo(s), {result.unique} distinto(s), "
+        f"deduplicación {result.dedup_ratio:.0%}; análisis {result.analysis_ns / 1e6:.1f} ms, "
+        f"ahorrado ~{result.saved_ns / 1e6:.1f} ms"
+    )
+    if opts.salida:
+        Path(opts.salida).write_text(
+            json.dumps([item.__dict__ for item in result.items], indent=2, ensure_ascii=False) + "\n",
+            encoding="utf-8",
+        )
+    return 1 if any(item.errors for item in result.items) else 0
+
+
+if __name__ == "__main__":
+    # Como script este archivo es __main__; usar el módulo "analyzer_service"
+    # que importan los demás (un solo ANALYSIS_LOCK)
+    import sys
+    import analyzer_service
+    sys.exit(analyzer_service.main())
@@ -0,0 +1,334 @@
+"""Codificación binaria compacta del AST de TokenMasters.
+
+El AST es un anidamiento de tuplas ``(tipo, hijos...)``, listas, dicts (las
+entradas de un mapa literal) y hojas ``Ref`` / ``Literal`` / str / int /
+float / None.
+Este formato lo guarda en bytes para la caché de parseo y para enviar
+árboles entre procesos sin pickle:
+
+    cabecera   b"TMA" + versión (1 byte)
+    strings    varint N, y N veces: varint largo + UTF-8
+    índice     varint M, y M offsets (varint, relativos al cuerpo) de las
+               sentencias de nivel superior si la raíz es ('program', [...])
+    cuerpo     el árbol en preorden, un opcode por elemento
+
+Los nombres, tipos de nodo y literales se guardan una sola vez en la tabla
+de strings; en el cuerpo se referencian por índice. Un nodo cuyo primer
+elemento es un str se escribe como ``NODE <índice del tipo> <n hijos>``.
+Los Ref guardan nombre y línea; el símbolo enlazado (``Ref.symbol``) no se
+guarda: es resultado del análisis, no del parseo. Los Literal guardan el
+texto del token; su valor se vuelve a calcular sólo si se pide.
+
+``ASTReader`` lee sobre un ``memoryview`` (bytes, bytearray o mmap) sin
+copiar el buffer y puede decodificar sólo una sentencia de nivel superior
+usando el índice (lo usan los procesos de ``parallel_semantic``).
+"""
+
+from __future__ import annotations
+
+import gc
+import struct
+import sys
+from contextlib import contextmanager
+from typing import Dict, Iterable, List
+
+from parser import Literal, Ref
+from symbol_table import name_id
+
+MAGIC = b"TMA"
+VERSION = 2
+
+# Opcodes del cuerpo
+NONE = 0
+TRUE = 1
+FALSE = 2
+FLOAT = 3    # double little-endian
+# Desde aquí, el opcode va seguido de un varint
+INT = 4      # varint zigzag
+STR = 5      # índice en la tabla de strings
+REF = 6      # índice del nombre, línea + 1 (0 = sin línea)
+NODE = 7     # índice del tipo, cantidad de hijos
+TUPLE = 8    # tupla que no empieza con un tipo (p. ej. entrada de mapa)
+LIST = 9
+DICT = 10    # cantidad de pares clave/valor
+LITERAL = 11  # índice del texto del literal
+
+_DOUBLE = struct.Struct("<d")
+
+
+def encode(tree) -> bytes:
+    """Codifica ``tree`` (cualquier subárbol) en el formato binario."""
+    strings: Dict[str, int] = {}
+    body = bytearray()
+    append = body.append
+
+    def varint(value: int) -> None:
+        while value >= 0x80:
+            append((value & 0x7F) | 0x80)
+            value >>= 7
+        append(value)
+
+    def string_index(value: str) -> int:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    def emit(node) -> None:
+        kind = type(node)
+        if kind is tuple:
+            if node and type(node[0]) is str:
+                append(NODE)
+                varint(string_index(node[0]))
+                varint(len(node) - 1)
+                for child in node[1:]:
+                    emit(child)
+            else:
+                append(TUPLE)
+                varint(len(node))
+                for child in node:
+                    emit(child)
+        elif kind is Ref:
+            append(REF)
+            varint(string_index(str(node)))
+            lineno = node.lineno
+            varint(0 if lineno is None else lineno + 1)
+        elif kind is Literal:
+            append(LITERAL)
+            varint(string_index(node.text))
+        elif kind is list:
+            append(LIST)
+            varint(len(node))
+            for child in node:
+                emit(child)
+        elif kind is str:
+            append(STR)
+            varint(string_index(node))
+        elif kind is int:
+            append(INT)
+            varint((node << 1) if node >= 0 else ((-node << 1) - 1))
+        elif node is None:
+            append(NONE)
+        elif kind is float:
+            append(FLOAT)
+            body.extend(_DOUBLE.pack(node))
+        elif kind is bool:
+            append(TRUE if node else FALSE)
+        elif kind is dict:
+            append(DICT)
+            varint(len(node))
+            for key, value in node.items():
+                emit(key)
+                emit(value)
+        else:
+            raise TypeError(f"Valor no serializable en el AST: {node!r}")
+
+    offsets: List[int] = []
+    if type(tree) is tuple and len(tree) == 2 and tree[0] == "program" and type(tree[1]) is list:
+        # Raíz de programa: se registra dónde empieza cada sentencia
+        append(NODE)
+        varint(string_index("program"))
+        varint(1)
+        append(LIST)
+        varint(len(tree[1]))
+        for statement in tree[1]:
+            offsets.append(len(body))
+            emit(statement)
+    else:
+        emit(tree)
+
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _write_varint(out, len(strings))
+    for value in strings:
+        data = value.encode("utf-8")
+        _write_varint(out, len(data))
+        out.extend(data)
+    _write_varint(out, len(offsets))
+    for offset in offsets:
+        _write_varint(out, offset)
+    out.extend(body)
+    return bytes(out)
+
+
+@contextmanager
+def _gc_paused():
+    """Pausa el recolector cíclico mientras se crean miles de tuplas.
+
+    Un AST no tiene ciclos; sin la pausa el recolector recorre una y otra vez
+    los nodos recién creados y decodificar tarda más del doble.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class ASTReader:
+    """Lector del formato binario sobre un ``memoryview`` (sin copiar el buffer)."""
+
+    __slots__ = ("_view", "_strings", "_offsets", "_body")
+
+    def __init__(self, data) -> None:
+        view = memoryview(data)
+        if view[:3] != MAGIC or len(view) < 4:
+            raise ValueError("Formato de AST desconocido")
+        if view[3] != VERSION:
+            raise ValueError(f"Versión de AST no soportada: {view[3]}")
+        self._view = view
+        pos = 4
+        count, pos = self._varint(pos)
+        strings = []
+        for _ in range(count):
+            size, pos = self._varint(pos)
+            strings.append(sys.intern(str(view[pos:pos + size], "utf-8")))
+            pos += size
+        self._strings = strings
+        count, pos = self._varint(pos)
+        offsets = []
+        for _ in range(count):
+            offset, pos = self._varint(pos)
+            offsets.append(offset)
+        self._offsets = offsets
+        self._body = pos
+
+    def _varint(self, pos: int):
+        view = self._view
+        byte = view[pos]
+        if byte < 0x80:
+            return byte, pos + 1
+        value = byte & 0x7F
+        shift = 7
+        while True:
+            pos += 1
+            byte = view[pos]
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value, pos + 1
+            shift += 7
+
+    @property
+    def statement_count(self) -> int:
+        """Sentencias de nivel superior indexadas (0 si la raíz no es un programa)."""
+        return len(self._offsets)
+
+    def decode(self):
+        """El árbol completo."""
+        with _gc_paused():
+            return self._decode_at(self._body)
+
+    def statement(self, index: int):
+        """Sólo la sentencia de nivel superior ``index`` (requiere raíz de programa)."""
+        return self._decode_at(self._body + self._offsets[index])
+
+    def statements(self, indices: Iterable[int]) -> List:
+        """Las sentencias de nivel superior indicadas, en ese orden."""
+        body, offsets = self._body, self._offsets
+        with _gc_paused():
+            return [self._decode_at(body + offsets[index]) for index in indices]
+
+    def _decode_at(self, pos: int):
+        view = self._view
+        strings = self._strings
+        unpack_double = _DOUBLE.unpack_from
+        new_ref = str.__new__
+        ref_ids: Dict[int, int] = {}  # índice del string -> name_id
+
+        def varint(first):
+            # Resto de un varint de más de un byte; ``first`` ya fue leído
+            nonlocal pos
+            value = first & 0x7F
+            shift = 7
+            while True:
+                byte = view[pos]
+                pos += 1
+                value |= (byte & 0x7F) << shift
+                if byte < 0x80:
+                    return value
+                shift += 7
+
+        # Los varint de uno y dos bytes (casi todos) se leen en línea
+        def read():
+            nonlocal pos
+            op = view[pos]
+            if op <= FLOAT:  # opcodes sin varint
+                pos += 1
+                if op == NONE:
+                    return None
+                if op == FLOAT:
+                    value = unpack_double(view, pos)[0]
+                    pos += 8
+                    return value
+                return op == TRUE
+            arg = view[pos + 1]
+            pos += 2
+            if arg >= 0x80:
+                byte = view[pos]
+                if byte < 0x80:
+                    arg = (arg & 0x7F) | (byte << 7)
+                    pos += 1
+                else:
+                    arg = varint(arg)
+            if op == NODE:
+                kind = strings[arg]
+                count = view[pos]
+                pos += 1
+                if count >= 0x80:
+                    byte = view[pos]
+                    if byte < 0x80:
+                        count = (count & 0x7F) | (byte << 7)
+                        pos += 1
+                    else:
+                        count = varint(count)
+                return (kind, *[read() for _ in range(count)])
+            if op == REF:
+                lineno = view[pos]
+                pos += 1
+                if lineno >= 0x80:
+                    byte = view[pos]
+                    if byte < 0x80:
+                        lineno = (lineno & 0x7F) | (byte << 7)
+                        pos += 1
+                    else:
+                        lineno = varint(lineno)
+                ref = new_ref(Ref, strings[arg])
+                ref.lineno = lineno - 1 if lineno else None
+                ident = ref_ids.get(arg)
+                if ident is None:
+                    ident = ref_ids[arg] = name_id(ref)
+                ref.name_id = ident
+                return ref
+            if op == STR:
+                return strings[arg]
+            if op == LITERAL:
+                return Literal(strings[arg])
+            if op == LIST:
+                return [read() for _ in range(arg)]
+            if op == INT:
+                return (arg >> 1) if not arg & 1 else -((arg + 1) >> 1)
+            if op == TUPLE:
+                return tuple([read() for _ in range(arg)])
+            if op == DICT:
+                result = {}
+                for _ in range(arg):
+                    key = read()
+                    result[key] = read()
+                return result
+            raise ValueError(f"Opcode de AST desconocido: {op}")
+
+        return read()
+
+
+def decode(data):
+    """Decodifica el árbol completo de ``data`` (bytes, bytearray, mmap o memoryview)."""
+    return ASTReader(data).decode()
@@ -0,0 +1,151 @@
+"""Variantes asyncio de ``analyzer_service`` con concurrencia acotada.
+
+Las funciones de ``analyzer_service`` bloquean y, por el estado global de
+``parser.py``, se serializan con ``ANALYSIS_LOCK`` dentro de un proceso.
+``AsyncAnalyzer`` las ejecuta en un pool de procesos (cada uno con su
+propio lexer, parser y estado global) sin bloquear el event loop:
+
+- a lo sumo ``max_concurrency`` análisis ocupan el pool a la vez; el resto
+  espera en un semáforo, así miles de peticiones pendientes cuestan sólo
+  una corrutina cada una;
+- ``timeout`` (por defecto o por llamada) limita cada petición, contando
+  la espera en la cola; al vencer se lanza ``asyncio.TimeoutError``;
+- cancelar la corrutina (o vencer el plazo) descarta el análisis si aún no
+  empezó; si ya corre termina en su proceso y su lugar en el semáforo se
+  libera recién entonces, para que los cancelados no desborden el pool;
+- logs y archivos temporales se escriben en los procesos del pool, fuera
+  del event loop.
+
+Los procesos se crean con "forkserver" (o "spawn"), no con "fork": el
+proceso del event loop suele tener hilos. Como en ``parallel_semantic``,
+los scripts que lo usen deben proteger su punto de entrada con
+``if __name__ == "__main__":``.
+
+Uso:
+    async with AsyncAnalyzer(max_concurrency=8, timeout=30) as analyzer:
+        result = await analyzer.run_full_analysis(codigo, "Sam-24-dev")
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+import analyzer_service
+from analyzer_service import AnalysisResult
+
+# Marca "usar el timeout del analizador" (None ya significa "sin límite")
+_DEFAULT = object()
+
+
+def _warm_up() -> None:
+    """Inicializador de cada proceso del pool: lexer y parser una sola vez."""
+    analyzer_service.lexer_module.get_lexer()
+    analyzer_service.parser_module.get_parser()
+
+
+def _pool_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class AsyncAnalyzer:
+    """Fachada asyncio de ``analyzer_service`` sobre un pool de procesos.
+
+    ``executor`` permite pasar un pool propio (p. ej. un ThreadPoolExecutor
+    en pruebas); en ese caso ``aclose`` no lo cierra.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.timeout = timeout
+        self._executor = executor
+        self._owns_executor = executor is None
+        # Se crea en el primer uso, dentro del loop que lo va a usar
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncAnalyzer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_concurrency,
+                mp_context=_pool_context(),
+                initializer=_warm_up,
+            )
+        return self._executor
+
+    async def aclose(self) -> None:
+        """Cancela lo que no empezó y espera (sin bloquear el loop) a lo que corre."""
+        executor, self._executor = self._executor, None
+        if executor is not None and self._owns_executor:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, partial(executor.shutdown, wait=True, cancel_futures=True))
+
+    async def _submit(self, func, *args):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        semaphore = self._semaphore
+        await semaphore.acquire()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        def release(_) -> None:
+            # Corre en un hilo del pool: devolver el lugar desde el loop
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                pass  # el loop ya cerró
+
+        future.add_done_callback(release)
+        # Cancelar esta espera cancela el futuro del pool (si aún no empezó)
+        return await asyncio.wrap_future(future)
+
+    async def _run(self, timeout, func, *args):
+        limit = self.timeout if timeout is _DEFAULT else timeout
+        return await asyncio.wait_for(self._submit(func, *args), limit)
+
+    async def run_lexical_analysis(self, code: str, git_user: str, *, timeout=_DEFAULT) -> Dict:
+        return await self._run(timeout, analyzer_service.run_lexical_analysis, code, git_user)
+
+    async def run_syntax_analysis(self, code: str, git_user: str, *, timeout=_DEFAULT) -> Dict:
+        return await self._run(timeout, analyzer_service.run_syntax_analysis, code, git_user)
+
+    async def run_semantic_analysis(
+        self,
+        code: str,
+        git_user: str,
+        rules: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        *,
+        timeout=_DEFAULT,
+    ) -> Dict:
+        return await self._run(timeout, analyzer_service.run_semantic_analysis, code, git_user, rules, workers)
+
+    async def run_full_analysis(
+        self,
+        code: str,
+        git_user: str,
+        rules: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        *,
+        timeout=_DEFAULT,
+    ) -> AnalysisResult:
+        return await self._run(timeout, analyzer_service.run_full_analysis, code, git_user, rules, workers)
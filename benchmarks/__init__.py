@@ -0,0 +1 @@
+"""Benchmarks reproducibles del analizador (corpus sintético + mediciones)."""
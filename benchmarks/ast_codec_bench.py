@@ -0,0 +1,109 @@
+"""Velocidad y tamaño de ``ast_codec`` frente a pickle sobre ASTs grandes.
+
+Para cada factor de escala del corpus sintético (y un programa con muchas
+declaraciones) parsea una vez y mide, tomando el mínimo de ``--repeat``
+corridas:
+
+- tamaño en bytes del AST codificado y del pickle (protocolo más alto);
+- tiempo de codificar y decodificar el árbol completo;
+- tiempo de decodificar una sola sentencia de nivel superior con el
+  índice del formato (lo que hace cada proceso en ``parallel_semantic``).
+
+Uso:
+    python -m benchmarks.ast_codec_bench --factors 1 4 16 --repeat 5 --output codec.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import pickle
+import sys
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import ast_codec  # noqa: E402
+import parser as parser_module  # noqa: E402
+from benchmarks.corpus import CorpusSpec, generate_program  # noqa: E402
+from benchmarks.symbol_table_bench import generate_declarations_program  # noqa: E402
+
+
+def _best_ms(func: Callable[[], object], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = perf_counter_ns()
+        func()
+        elapsed = perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / 1e6
+
+
+def bench_tree(tree, repeat: int) -> Dict:
+    encoded = ast_codec.encode(tree)
+    pickled = pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL)
+    reader = ast_codec.ASTReader(encoded)
+    middle = reader.statement_count // 2
+    return {
+        "ast_nodes": parser_module.count_ast_nodes(tree),
+        "size_bytes": {"ast_codec": len(encoded), "pickle": len(pickled)},
+        "encode_ms": {
+            "ast_codec": _best_ms(lambda: ast_codec.encode(tree), repeat),
+            "pickle": _best_ms(lambda: pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL), repeat),
+        },
+        "decode_ms": {
+            "ast_codec": _best_ms(lambda: ast_codec.decode(encoded), repeat),
+            "pickle": _best_ms(lambda: pickle.loads(pickled), repeat),
+        },
+        "decode_one_statement_ms": _best_ms(lambda: ast_codec.ASTReader(encoded).statement(middle), repeat),
+    }
+
+
+def _parse(source: str):
+    parser_module.reset_semantic_state()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser_module.parse_source(source)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = argparse.ArgumentParser(description="Benchmark del formato binario del AST")
+    args.add_argument("--factors", type=int, nargs="+", default=[1, 4, 16])
+    args.add_argument("--declarations", type=int, default=20_000,
+                      help="declaraciones del programa de ``symbol_table_bench`` (0 = omitir)")
+    args.add_argument("--repeat", type=int, default=5)
+    args.add_argument("--output", help="archivo JSON de salida (por defecto, stdout)")
+    opts = args.parse_args(argv)
+
+    inputs = [(f"corpus x{factor}", generate_program(CorpusSpec().scaled(factor))) for factor in opts.factors]
+    if opts.declarations:
+        inputs.append((f"declaraciones {opts.declarations}", generate_declarations_program(opts.declarations)))
+
+    results = []
+    for name, source in inputs:
+        tree = _parse(source)
+        entry = {"input": name, "bytes": len(source.encode("utf-8")), **bench_tree(tree, opts.repeat)}
+        results.append(entry)
+        print(
+            f"{name:<22} codec {entry['size_bytes']['ast_codec'] / 1024:>8.1f} KB "
+            f"enc {entry['encode_ms']['ast_codec']:>8.2f} dec {entry['decode_ms']['ast_codec']:>8.2f} ms | "
+            f"pickle {entry['size_bytes']['pickle'] / 1024:>8.1f} KB "
+            f"enc {entry['encode_ms']['pickle']:>8.2f} dec {entry['decode_ms']['pickle']:>8.2f} ms",
+            file=sys.stderr,
+        )
+
+    text = json.dumps({"repeat": opts.repeat, "results": results}, indent=2, ensure_ascii=False)
+    if opts.output:
+        Path(opts.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
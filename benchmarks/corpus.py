@@ -0,0 +1,164 @@
+"""Generador de programas Dart sintéticos para benchmarks.
+
+Sólo usa construcciones que acepta la gramática de ``parser.py``:
+declaraciones con ``var``/``final``/``const``/tipo, asignaciones
+(``=``, ``+=``...), ``i++;``, if / else if / else, while, do-while, for,
+for-in, break/continue dentro de bucles, funciones con tipo, ``void`` y
+flecha, ``print(...)``, listas, mapas con claves string, llamadas y clases.
+
+La salida es determinista para una misma semilla y parámetros, de modo que
+dos corridas del benchmark comparan exactamente el mismo código.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import asdict, dataclass
+from typing import Dict, List
+
+
+@dataclass
+class CorpusSpec:
+    functions: int = 10          # funciones con tipo de retorno
+    if_chain: int = 5            # ramas else-if por cadena
+    expression_terms: int = 8    # términos por expresión larga
+    list_size: int = 20          # elementos por lista literal
+    map_size: int = 10           # entradas por mapa literal
+    scope_depth: int = 3         # bloques anidados por función
+    classes: int = 2
+    seed: int = 2025
+
+    def scaled(self, factor: int) -> "CorpusSpec":
+        """Misma forma de programa, ``factor`` veces más grande."""
+        return CorpusSpec(
+            functions=self.functions * factor,
+            if_chain=self.if_chain * factor,
+            expression_terms=self.expression_terms * factor,
+            list_size=self.list_size * factor,
+            map_size=self.map_size * factor,
+            scope_depth=self.scope_depth,
+            classes=self.classes * factor,
+            seed=self.seed,
+        )
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+_ARITH_OPS = ("+", "-", "*", "%")
+_COMPARE_OPS = ("<", ">", "<=", ">=", "==", "!=")
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.depth = 0
+
+    def emit(self, text: str) -> None:
+        self.lines.append("  " * self.depth + text)
+
+    def open(self, text: str) -> None:
+        self.emit(text + " {")
+        self.depth += 1
+
+    def close(self, suffix: str = "") -> None:
+        self.depth -= 1
+        self.emit("}" + suffix)
+
+
+def _long_expression(rng: random.Random, names: List[str], terms: int) -> str:
+    parts = [rng.choice(names)]
+    for _ in range(max(0, terms - 1)):
+        operand = rng.choice(names) if rng.random() < 0.6 else str(rng.randint(1, 99))
+        parts.append(f"{rng.choice(_ARITH_OPS)} {operand}")
+    return " ".join(parts)
+
+
+def _condition(rng: random.Random, name: str) -> str:
+    return f"{name} {rng.choice(_COMPARE_OPS)} {rng.randint(0, 100)}"
+
+
+def _function(w: _Writer, rng: random.Random, spec: CorpusSpec, index: int) -> None:
+    w.open(f"int calcular{index}(int a, int b)")
+    w.emit("int total = a + b;")
+    w.emit("var contador = 0;")
+    w.emit(f"var datos = [{', '.join(str(rng.randint(0, 999)) for _ in range(spec.list_size))}];")
+    entries = ", ".join(f"'k{i}': {rng.randint(0, 999)}" for i in range(spec.map_size))
+    w.emit(f"var tabla = {{{entries}}};")
+    w.emit(f"total = {_long_expression(rng, ['a', 'b', 'total'], spec.expression_terms)};")
+
+    # Cadena if / else if / else
+    w.open(f"if ({_condition(rng, 'total')})")
+    w.emit("total += 1;")
+    for branch in range(spec.if_chain):
+        w.depth -= 1
+        w.open(f"}} else if ({_condition(rng, 'total')})")
+        w.emit(f"total -= {branch + 1};")
+    w.depth -= 1
+    w.open("} else")
+    w.emit("total = total * 2;")
+    w.close()
+
+    # Ámbitos anidados con bucles
+    for level in range(spec.scope_depth):
+        kind = level % 3
+        if kind == 0:
+            w.open(f"for (var i{level} = 0; i{level} < {rng.randint(2, 9)}; i{level} += 1)")
+            w.emit(f"contador += i{level};")
+            w.open("if (contador > 1000)")
+            w.emit("break;")
+            w.close()
+        elif kind == 1:
+            w.open(f"while (contador < {rng.randint(10, 500)})")
+            w.emit("contador++;")
+            w.open("if (contador == 3)")
+            w.emit("continue;")
+            w.close()
+        else:
+            w.open("do")
+            w.emit("contador--;")
+    for level in reversed(range(spec.scope_depth)):
+        w.close(" while (contador > 0);" if level % 3 == 2 else "")
+
+    w.open("for (var x in datos)")
+    w.emit("print(x);")
+    w.close()
+    w.emit("print('resultado ' + 'parcial');")
+    w.emit("return total + contador;")
+    w.close()
+
+
+def generate_program(spec: CorpusSpec) -> str:
+    """Genera el código Dart descrito por ``spec``."""
+    rng = random.Random(spec.seed)
+    w = _Writer()
+    w.emit("// Corpus sintético generado por benchmarks/corpus.py")
+    w.emit(f"const int LIMITE = {rng.randint(10, 99)};")
+    w.emit("final String titulo = 'benchmark';")
+    w.emit("")
+
+    for index in range(spec.classes):
+        w.open(f"class Modelo{index}")
+        w.emit("int valor = 0;")
+        w.emit(f"int doble(int x) => x * {rng.randint(2, 9)};")
+        w.close()
+        w.emit("")
+
+    for index in range(spec.functions):
+        _function(w, rng, spec, index)
+        w.emit("")
+
+    w.emit("double promedio(int a, int b) => (a + b) / 2;")
+    w.emit("")
+    w.open("void main()")
+    w.emit("var acumulado = 0;")
+    for index in range(spec.functions):
+        w.emit(f"acumulado += calcular{index}({rng.randint(0, 9)}, {rng.randint(0, 9)});")
+    w.emit("print(acumulado);")
+    w.close()
+    return "\n".join(w.lines) + "\n"
+
+
+def generate_sweep(base: CorpusSpec, factors) -> Dict[int, str]:
+    """Programas de tamaño creciente con la misma forma."""
+    return {factor: generate_program(base.scaled(factor)) for factor in factors}
@@ -0,0 +1,460 @@
+"""Benchmark del lexer y comparación diferencial token por token.
+
+Genera "sopas" aleatorias (deterministas por semilla) de operadores,
+literales, comentarios, espacios y caracteres ilegales, pegados unos a
+otros muchas veces sin separador para forzar los casos en que el orden de
+las reglas de ``lexer.py`` decide el resultado (``?..`` frente a ``?.``,
+``...`` frente a ``..``, ``>>>`` frente a ``>>``, ``//`` frente a ``/=``).
+
+- Diferencial: cada sopa se tokeniza con el lexer de PLY y con un lexer
+  candidato; tipo, valor (y su tipo Python), línea, posición y errores
+  léxicos deben coincidir. Ante una diferencia se reduce la sopa quitando
+  fragmentos mientras la diferencia persista y se imprime el caso mínimo.
+- Benchmark: tokens/segundo y MB/segundo de cada lexer sobre sopas de cada
+  tipo y sobre el corpus sintético (mínimo de ``--repeat`` corridas).
+
+Un candidato es cualquier fábrica de lexers con la interfaz que usa el
+parser: ``input()``, ``token()`` (LexToken con type/value/lineno/lexpos),
+``lineno``, ``lexerrorf`` y ``skip()``. Por defecto se compara contra
+``ReferenceLexer``, un lexer escrito a mano con coincidencia máxima que
+documenta lo que el orden de las reglas de PLY debe producir.
+
+Uso:
+    python -m benchmarks.lexer_fuzz --seeds 500 --output lexer.json
+    python -m benchmarks.lexer_fuzz --candidate mi_lexer:get_lexer --no-bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import random
+import re
+import sys
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import ply.lex as lex  # noqa: E402
+
+import lexer as lexer_module  # noqa: E402
+from benchmarks.corpus import CorpusSpec, generate_program  # noqa: E402
+
+LexerFactory = Callable[[], object]
+# (tipo, valor, tipo Python del valor, línea, posición); los errores léxicos
+# entran como ('error', carácter, 'str', línea, posición) y el final como 'fin'
+LexItem = Tuple[str, object, str, int, Optional[int]]
+
+SOUP_KINDS = ("operadores", "literales", "comentarios", "mezcla")
+
+
+def _operator_types() -> Dict[str, str]:
+    """Texto -> tipo de cada regla de cadena de ``lexer.py`` que es un texto fijo (operadores)."""
+    types = {}
+    for name in lexer_module.tokens:
+        pattern = getattr(lexer_module, f"t_{name}", None)
+        if isinstance(pattern, str) and not re.search(r"[.^$*+?{}\[\]|()]", re.sub(r"\\.", "", pattern)):
+            types[re.sub(r"\\(.)", r"\1", pattern)] = name
+    return types
+
+
+_OPERATOR_TYPES = _operator_types()
+OPERATORS = sorted(_OPERATOR_TYPES)
+_OPERATOR_SET = frozenset(OPERATORS)
+_OPERATOR_LENGTHS = sorted({len(text) for text in OPERATORS}, reverse=True)
+
+
+# ----------------------------------------------------------------------
+# Lexer de referencia
+# ----------------------------------------------------------------------
+class ReferenceLexer:
+    """Lexer escrito a mano con la interfaz de PLY y coincidencia máxima.
+
+    Comentarios, números, strings e identificadores siguen las reglas de
+    ``lexer.py``; entre operadores gana siempre el más largo que coincide.
+    """
+
+    def __init__(self) -> None:
+        self.lexdata = ""
+        self.lexpos = 0
+        self.lineno = 1
+        self.lexerrorf = None
+
+    def input(self, data: str) -> None:
+        self.lexdata = data
+        self.lexpos = 0
+
+    def skip(self, n: int) -> None:
+        self.lexpos += n
+
+    def _make(self, type_: str, value, pos: int, end: int):
+        tok = lex.LexToken()
+        tok.type = type_
+        tok.value = value
+        tok.lineno = self.lineno
+        tok.lexpos = pos
+        tok.lexer = self
+        self.lexpos = end
+        return tok
+
+    def _string_end(self, pos: int) -> int:
+        """Posición de la comilla de cierre, o -1 (no hay string en ``pos``)."""
+        data = self.lexdata
+        quote = data[pos]
+        i = pos + 1
+        while i < len(data):
+            char = data[i]
+            if char == quote:
+                return i
+            if char == "\n":
+                return -1
+            if char == "\\":
+                if i + 1 >= len(data) or data[i + 1] == "\n":
+                    return -1
+                i += 2
+            else:
+                i += 1
+        return -1
+
+    def token(self):
+        data = self.lexdata
+        size = len(data)
+        while self.lexpos < size:
+            pos = self.lexpos
+            char = data[pos]
+            if char in " \t":
+                self.lexpos += 1
+                continue
+            if char == "\n":
+                self.lineno += 1
+                self.lexpos += 1
+                continue
+            if data.startswith("//", pos):
+                end = data.find("\n", pos)
+                self.lexpos = size if end < 0 else end
+                continue
+            if data.startswith("/*", pos):
+                end = data.find("*/", pos + 2)
+                if end >= 0:
+                    self.lineno += data.count("\n", pos, end)
+                    self.lexpos = end + 2
+                    continue
+            if char.isdecimal():
+                end = pos
+                while end < size and data[end].isdecimal():
+                    end += 1
+                if end + 1 < size and data[end] == "." and data[end + 1].isdecimal():
+                    end += 1
+                    while end < size and data[end].isdecimal():
+                        end += 1
+                return self._make("NUMBER", data[pos:end], pos, end)
+            if char in "\"'":
+                end = self._string_end(pos)
+                if end >= 0:
+                    return self._make("STRING", data[pos:end + 1], pos, end + 1)
+            if char == "_" or ("a" <= char <= "z") or ("A" <= char <= "Z"):
+                end = pos + 1
+                while end < size and (data[end] == "_" or data[end].isascii() and data[end].isalnum()):
+                    end += 1
+                name = sys.intern(data[pos:end])
+                return self._make(lexer_module.reserved.get(name, "ID"), name, pos, end)
+            for length in _OPERATOR_LENGTHS:
+                text = data[pos:pos + length]
+                if text in _OPERATOR_SET:
+                    return self._make(_OPERATOR_TYPES[text], text, pos, pos + length)
+            error = self._make("error", data[pos:], pos, pos)
+            if self.lexerrorf is None:
+                raise lex.LexError(f"Carácter ilegal {char!r} en la posición {pos}", data[pos:])
+            self.lexerrorf(error)
+            if self.lexpos == pos:
+                raise lex.LexError(f"lexerrorf no avanzó en la posición {pos}", data[pos:])
+        return None
+
+
+# ----------------------------------------------------------------------
+# Sopas de tokens
+# ----------------------------------------------------------------------
+_KEYWORDS = tuple(lexer_module.reserved)
+_ILLEGAL = ("@", "#", "$", "`", "\\", "ñ", "é", "\r", "\x00", "€")
+_WHITESPACE = (" ", "  ", "\t", "\n", "\n\n", " \n\t")
+
+
+def _number(rng: random.Random) -> str:
+    choice = rng.random()
+    if choice < 0.4:
+        return str(rng.randint(0, 10 ** rng.randint(1, 12)))
+    if choice < 0.7:
+        return f"{rng.randint(0, 999)}.{rng.randint(0, 999):0{rng.randint(1, 3)}d}"
+    if choice < 0.8:
+        return rng.choice(("0", "00", "007", "1.", ".5", "1..2", "1...2", "3.x"))
+    if choice < 0.9:
+        return rng.choice(("١٢", "٣.٥", "１"))  # \d de Python acepta dígitos Unicode
+    return str(rng.randint(0, 9)) * rng.randint(20, 60)
+
+
+def _string(rng: random.Random) -> str:
+    quote = rng.choice("\"'")
+    body = "".join(
+        rng.choice(("a", " ", "\\n", "\\\\", f"\\{quote}", "\"'"[quote == "\""], "//", "/*", "$x", "ñ"))
+        for _ in range(rng.randint(0, 8))
+    )
+    choice = rng.random()
+    if choice < 0.8:
+        return f"{quote}{body}{quote}"
+    if choice < 0.9:
+        return f"{quote}{body}"              # sin cerrar
+    return f"{quote}{body}\n{body}{quote}"   # salto de línea dentro
+
+
+def _identifier(rng: random.Random) -> str:
+    choice = rng.random()
+    if choice < 0.4:
+        return rng.choice(_KEYWORDS)
+    if choice < 0.6:
+        keyword = rng.choice(_KEYWORDS)
+        return rng.choice((keyword + "s", "_" + keyword, keyword.upper(), keyword + "1"))
+    alphabet = "abcxyzABC_019"
+    return rng.choice("abcxyzABC_") + "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 10)))
+
+
+def _comment(rng: random.Random) -> str:
+    text = "".join(rng.choice(("x", " ", "*", "/", "\n", "ñ", "*/", "/*")) for _ in range(rng.randint(0, 10)))
+    choice = rng.random()
+    if choice < 0.4:
+        return "//" + text.replace("\n", " ") + "\n"
+    if choice < 0.8:
+        return "/*" + text.replace("*/", "") + "*/"
+    return rng.choice(("/*", "/**/", "/*/", "/***/", "//", "*/", "/*\n*/", "///"))
+
+
+_GENERATORS: Dict[str, Tuple[Tuple[float, Callable[[random.Random], str]], ...]] = {
+    "operadores": ((0.9, lambda rng: rng.choice(OPERATORS)), (0.1, _identifier)),
+    "literales": ((0.35, _number), (0.35, _string), (0.3, _identifier)),
+    "comentarios": ((0.5, _comment), (0.3, _identifier), (0.2, lambda rng: rng.choice(OPERATORS))),
+    "mezcla": (
+        (0.45, lambda rng: rng.choice(OPERATORS)),
+        (0.15, _number),
+        (0.1, _string),
+        (0.15, _identifier),
+        (0.1, _comment),
+        (0.05, lambda rng: rng.choice(_ILLEGAL)),
+    ),
+}
+
+
+def generate_fragments(kind: str, seed: int, count: int) -> List[str]:
+    """``count`` fragmentos del tipo ``kind``, cada uno con su separador (a veces vacío)."""
+    rng = random.Random(f"{kind}:{seed}")
+    weights = [weight for weight, _ in _GENERATORS[kind]]
+    makers = [maker for _, maker in _GENERATORS[kind]]
+    fragments = []
+    for _ in range(count):
+        text = rng.choices(makers, weights)[0](rng)
+        # La mitad de las veces pegado al siguiente: ahí importa el orden de las reglas
+        fragments.append(text + (rng.choice(_WHITESPACE) if rng.random() < 0.5 else ""))
+    return fragments
+
+
+# ----------------------------------------------------------------------
+# Comparación diferencial
+# ----------------------------------------------------------------------
+def lex_all(make_lexer: LexerFactory, source: str) -> List[LexItem]:
+    """Todos los tokens y errores léxicos de ``source``, en orden."""
+    lexer = make_lexer()
+    items: List[LexItem] = []
+
+    def on_error(t) -> None:
+        items.append(("error", t.value[0], "str", t.lineno, t.lexpos))
+        t.lexer.skip(1)
+
+    lexer.lexerrorf = on_error
+    lexer.input(source)
+    while True:
+        tok = lexer.token()
+        if not tok:
+            break
+        items.append((tok.type, tok.value, type(tok.value).__name__, tok.lineno, tok.lexpos))
+    items.append(("fin", None, "NoneType", lexer.lineno, None))
+    return items
+
+
+def first_difference(expected: List[LexItem], actual: List[LexItem]) -> Optional[int]:
+    for index, (left, right) in enumerate(zip(expected, actual)):
+        if left != right:
+            return index
+    if len(expected) != len(actual):
+        return min(len(expected), len(actual))
+    return None
+
+
+def _differs(reference: LexerFactory, candidate: LexerFactory, source: str) -> bool:
+    try:
+        return lex_all(reference, source) != lex_all(candidate, source)
+    except Exception:
+        return True  # que el candidato falle también es una diferencia
+
+
+def shrink(fragments: List[str], reference: LexerFactory, candidate: LexerFactory) -> List[str]:
+    """Quita bloques de fragmentos (cada vez más chicos) mientras la diferencia persista."""
+    chunk = max(len(fragments) // 2, 1)
+    while True:
+        index = 0
+        while index < len(fragments):
+            attempt = fragments[:index] + fragments[index + chunk:]
+            if attempt and _differs(reference, candidate, "".join(attempt)):
+                fragments = attempt
+            else:
+                index += chunk
+        if chunk == 1:
+            return fragments
+        chunk = max(chunk // 2, 1)
+
+
+def _describe(items: List[LexItem], index: int) -> str:
+    if index >= len(items):
+        return "(nada)"
+    type_, value, value_type, line, pos = items[index]
+    return f"{type_} {value!r} ({value_type}) línea {line} pos {pos}"
+
+
+def fuzz(
+    candidate: LexerFactory,
+    seeds: int,
+    size: int,
+    reference: LexerFactory = lexer_module.get_lexer,
+    kinds=SOUP_KINDS,
+) -> Dict:
+    """Compara ``candidate`` contra ``reference`` en ``seeds`` sopas de cada tipo."""
+    checked = tokens = 0
+    for seed in range(seeds):
+        for kind in kinds:
+            fragments = generate_fragments(kind, seed, size)
+            source = "".join(fragments)
+            expected = lex_all(reference, source)
+            try:
+                actual = lex_all(candidate, source)
+            except Exception as exc:
+                actual = [("excepción", f"{type(exc).__name__}: {exc}", "str", 0, None)]
+            checked += 1
+            tokens += len(expected)
+            index = first_difference(expected, actual)
+            if index is None:
+                continue
+            minimal = "".join(shrink(fragments, reference, candidate))
+            expected = lex_all(reference, minimal)
+            try:
+                actual = lex_all(candidate, minimal)
+            except Exception as exc:
+                actual = [("excepción", f"{type(exc).__name__}: {exc}", "str", 0, None)]
+            index = first_difference(expected, actual) or 0
+            return {
+                "ok": False,
+                "checked": checked,
+                "tokens": tokens,
+                "kind": kind,
+                "seed": seed,
+                "source": minimal,
+                "expected": _describe(expected, index),
+                "actual": _describe(actual, index),
+            }
+    return {"ok": True, "checked": checked, "tokens": tokens}
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def _quiet_error(t) -> None:
+    t.lexer.skip(1)
+
+
+def bench_lexer(make_lexer: LexerFactory, source: str, repeat: int) -> Dict:
+    best = None
+    count = 0
+    for _ in range(repeat):
+        lexer = make_lexer()
+        lexer.lexerrorf = _quiet_error
+        start = perf_counter_ns()
+        lexer.input(source)
+        count = 0
+        while lexer.token():
+            count += 1
+        elapsed = perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    seconds = max(best, 1) / 1e9
+    return {
+        "ms": best / 1e6,
+        "tokens": count,
+        "tokens_per_s": count / seconds,
+        "mb_per_s": len(source.encode("utf-8")) / seconds / 1e6,
+    }
+
+
+def _load_factory(spec: str) -> LexerFactory:
+    module_name, _, attribute = spec.partition(":")
+    factory = getattr(importlib.import_module(module_name), attribute or "get_lexer")
+    if not callable(factory):
+        raise SystemExit(f"{spec} no es una fábrica de lexers")
+    return factory
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = argparse.ArgumentParser(description="Benchmark del lexer y comparación diferencial contra otro lexer")
+    args.add_argument("--candidate", help="fábrica de lexers 'modulo:funcion' (por defecto, ReferenceLexer)")
+    args.add_argument("--seeds", type=int, default=200, help="sopas de cada tipo a comparar")
+    args.add_argument("--size", type=int, default=300, help="fragmentos por sopa en la comparación")
+    args.add_argument("--bench-size", type=int, default=20000, help="fragmentos por sopa en el benchmark")
+    args.add_argument("--repeat", type=int, default=5)
+    args.add_argument("--no-bench", action="store_true", help="sólo la comparación diferencial")
+    args.add_argument("--output", help="archivo JSON de salida (por defecto, stdout)")
+    opts = args.parse_args(argv)
+
+    candidate_name = opts.candidate or "ReferenceLexer"
+    candidate = _load_factory(opts.candidate) if opts.candidate else ReferenceLexer
+
+    result = fuzz(candidate, opts.seeds, opts.size)
+    if result["ok"]:
+        print(
+            f"{candidate_name}: {result['checked']} sopas, {result['tokens']} tokens idénticos al lexer de PLY",
+            file=sys.stderr,
+        )
+    else:
+        print(f"{candidate_name} difiere del lexer de PLY (sopa '{result['kind']}', semilla {result['seed']})",
+              file=sys.stderr)
+        print(f"  entrada mínima: {result['source']!r}", file=sys.stderr)
+        print(f"  PLY:       {result['expected']}", file=sys.stderr)
+        print(f"  candidato: {result['actual']}", file=sys.stderr)
+
+    bench = []
+    if not opts.no_bench:
+        lexer_module.get_lexer()  # compilar las reglas fuera de la medición
+        sources = {kind: "".join(generate_fragments(kind, 0, opts.bench_size)) for kind in SOUP_KINDS}
+        sources["corpus"] = generate_program(CorpusSpec().scaled(4))
+        for kind, source in sources.items():
+            for name, factory in (("ply", lexer_module.get_lexer), (candidate_name, candidate)):
+                entry = {"source": kind, "lexer": name, "bytes": len(source.encode("utf-8")),
+                         **bench_lexer(factory, source, opts.repeat)}
+                bench.append(entry)
+                print(
+                    f"{kind:<12} {name:<16} {entry['tokens']:>8} tokens  {entry['ms']:>9.2f} ms  "
+                    f"{entry['tokens_per_s'] / 1e3:>9.1f} ktok/s  {entry['mb_per_s']:>6.2f} MB/s",
+                    file=sys.stderr,
+                )
+
+    text = json.dumps(
+        {"candidate": candidate_name, "seeds": opts.seeds, "size": opts.size, "fuzz": result, "bench": bench},
+        indent=2, ensure_ascii=False,
+    )
+    if opts.output:
+        Path(opts.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Tiempo de parseo y errores reportados con entradas muy mal formadas.
+
+Parte del corpus sintético y, de forma determinista por semilla, inserta
+basura (tokens sueltos, paréntesis y llaves desbalanceadas, operadores
+duplicados) en una fracción ``--rates`` de las líneas. Para cada tasa mide,
+con el mínimo de ``--repeat`` corridas:
+
+- tiempo de parseo;
+- errores sintácticos reportados (acotados por ``parser.MAX_SYNTAX_ERRORS``);
+- sentencias de nivel superior que sobreviven en el AST (0 si no hay árbol).
+
+Con recuperación por sincronización el tiempo debe crecer como el tamaño
+de la entrada y no como la cantidad de errores.
+
+Uso:
+    python -m benchmarks.malformed_bench --factors 1 4 --rates 0 0.01 0.1 0.5 --output malformed.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import parser as parser_module  # noqa: E402
+from benchmarks.corpus import CorpusSpec, generate_program  # noqa: E402
+
+_GARBAGE = ("}", "{", ")", "(", ";", "= =", "+ *", "var", "if (", "else", "]", "return return", "!!", ", ,")
+
+
+def inject_garbage(source: str, rate: float, seed: int) -> str:
+    """Inserta un fragmento de ``_GARBAGE`` en una fracción ``rate`` de las líneas."""
+    rng = random.Random(seed)
+    lines = source.splitlines()
+    for index, line in enumerate(lines):
+        if line.strip() and rng.random() < rate:
+            cut = rng.randint(0, len(line))
+            lines[index] = f"{line[:cut]} {rng.choice(_GARBAGE)} {line[cut:]}"
+    return "\n".join(lines) + "\n"
+
+
+def bench_source(source: str, repeat: int) -> Dict:
+    best = None
+    for _ in range(repeat):
+        parser_module.reset_semantic_state()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = perf_counter_ns()
+            tree = parser_module.parse_source(source)
+            elapsed = perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "parse_ms": best / 1e6,
+        "syntax_errors": len(parser_module.syntax_errors),
+        "statements": len(tree[1]) if tree else 0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = argparse.ArgumentParser(description="Benchmark de recuperación de errores sintácticos")
+    args.add_argument("--factors", type=int, nargs="+", default=[1, 4])
+    args.add_argument("--rates", type=float, nargs="+", default=[0.0, 0.01, 0.1, 0.5])
+    args.add_argument("--seed", type=int, default=2025)
+    args.add_argument("--repeat", type=int, default=3)
+    args.add_argument("--output", help="archivo JSON de salida (por defecto, stdout)")
+    opts = args.parse_args(argv)
+
+    parser_module.get_parser()  # construir las tablas fuera de la medición
+    bench_source(generate_program(CorpusSpec()), 1)
+
+    results = []
+    for factor in opts.factors:
+        clean = generate_program(CorpusSpec().scaled(factor))
+        for rate in opts.rates:
+            source = inject_garbage(clean, rate, opts.seed) if rate else clean
+            entry = {"factor": factor, "rate": rate, "bytes": len(source.encode("utf-8")),
+                     **bench_source(source, opts.repeat)}
+            results.append(entry)
+            print(
+                f"x{factor:<3} basura {rate:>5.0%}  {entry['parse_ms']:>9.2f} ms  "
+                f"errores {entry['syntax_errors']:>3}  sentencias {entry['statements']:>4}",
+                file=sys.stderr,
+            )
+
+    text = json.dumps(
+        {"max_syntax_errors": parser_module.MAX_SYNTAX_ERRORS, "repeat": opts.repeat, "results": results},
+        indent=2, ensure_ascii=False,
+    )
+    if opts.output:
+        Path(opts.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
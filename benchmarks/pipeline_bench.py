@@ -0,0 +1,110 @@
+"""Parseo secuencial frente a lexer y parser en tubería (``parse_pipeline``).
+
+Para cada tamaño del corpus mide, con el mínimo de ``--repeat`` corridas
+(las tres variantes se alternan en cada vuelta para repartir el ruido):
+
+- ``secuencial``: PLY pide cada token al lexer durante el parseo;
+- ``hilo``: el lexer corre en un hilo y deja lotes en la cola acotada;
+- ``proceso``: el lexer corre en el proceso hijo persistente.
+
+El proceso hijo se lanza antes de medir (en un servicio se lanza una vez).
+``speedup`` es secuencial / variante: mayor que 1 indica que la tubería
+compensa para ese tamaño, y ``min_bytes`` sugiere el umbral para
+``parse_pipeline.set_mode``. Con un solo núcleo (``cpus`` en la salida)
+ninguna variante puede compensar: sólo se mide su costo.
+
+Uso:
+    python -m benchmarks.pipeline_bench --factors 1 4 16 --repeat 5 --output tuberia.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import parse_pipeline  # noqa: E402
+import parser as parser_module  # noqa: E402
+from benchmarks.corpus import CorpusSpec, generate_program  # noqa: E402
+
+VARIANTS = ("secuencial",) + parse_pipeline.MODES
+
+
+def parse_once(source: str, variant: str, batch_size: int) -> int:
+    tokens = None if variant == "secuencial" else parse_pipeline.PipelinedTokens(source, variant, batch_size)
+    parser_module.reset_semantic_state()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = perf_counter_ns()
+        parser_module._parse_uncached(source, tokens)
+        return perf_counter_ns() - start
+
+
+def bench_source(source: str, repeat: int, batch_size: int) -> Dict[str, float]:
+    best: Dict[str, int] = {}
+    for _ in range(repeat):
+        for variant in VARIANTS:
+            elapsed = parse_once(source, variant, batch_size)
+            best[variant] = min(best.get(variant, elapsed), elapsed)
+    return {variant: best[variant] / 1e6 for variant in VARIANTS}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = argparse.ArgumentParser(description="Benchmark de lexer y parser en tubería")
+    args.add_argument("--factors", type=int, nargs="+", default=[1, 4, 16])
+    args.add_argument("--repeat", type=int, default=5)
+    args.add_argument("--batch-size", type=int, default=parse_pipeline.BATCH_SIZE)
+    args.add_argument("--output", help="archivo JSON de salida (por defecto, stdout)")
+    opts = args.parse_args(argv)
+
+    parse_pipeline.set_mode(None)  # sólo las variantes pedidas explícitamente
+    warmup = generate_program(CorpusSpec())
+    for variant in VARIANTS:  # tablas del parser y proceso hijo fuera de la medición
+        parse_once(warmup, variant, opts.batch_size)
+
+    results = []
+    for factor in opts.factors:
+        source = generate_program(CorpusSpec().scaled(factor))
+        times = bench_source(source, opts.repeat, opts.batch_size)
+        entry = {
+            "factor": factor,
+            "bytes": len(source.encode("utf-8")),
+            "parse_ms": times,
+            "speedup": {mode: times["secuencial"] / times[mode] for mode in parse_pipeline.MODES},
+        }
+        results.append(entry)
+        print(
+            f"x{factor:<3} {entry['bytes']:>9} B  secuencial {times['secuencial']:>9.2f} ms  "
+            + "  ".join(f"{mode} {times[mode]:>9.2f} ms (x{entry['speedup'][mode]:.2f})"
+                        for mode in parse_pipeline.MODES),
+            file=sys.stderr,
+        )
+    parse_pipeline.shutdown()
+
+    min_bytes = {
+        mode: next((r["bytes"] for r in results if r["speedup"][mode] > 1.0), None)
+        for mode in parse_pipeline.MODES
+    }
+    text = json.dumps(
+        {"cpus": os.cpu_count(), "repeat": opts.repeat, "batch_size": opts.batch_size,
+         "ring_slots": parse_pipeline.RING_SLOTS, "min_bytes": min_bytes, "results": results},
+        indent=2, ensure_ascii=False,
+    )
+    if opts.output:
+        Path(opts.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""Benchmarks del analizador sobre un corpus sintético de tamaño creciente.
+
+Mide, para cada factor de escala del corpus (ver ``benchmarks/corpus.py``):
+
+- ``lexer``: tokenización completa con el lexer en caché.
+- ``parser``: parseo (incluye tokenización y las reglas semánticas que se
+  ejecutan durante las reducciones).
+- ``semantico``: validaciones post-parse sobre el AST ya construido (con
+  ``--workers N`` las funciones se reparten entre N procesos).
+- ``pipeline``: ``analyzer_service.run_full_analysis`` completo, con logs
+  escritos en un directorio temporal.
+
+Reporta latencias (mín, p50, p90, p99, media), throughput y memoria pico
+(tracemalloc, en una corrida aparte) como JSON, y puede compararse contra
+un JSON previo para detectar regresiones.
+
+Uso:
+    python -m benchmarks.run_benchmarks --factors 1 2 4 8 --repeat 5 --output bench.json
+    python -m benchmarks.run_benchmarks --compare bench_base.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import analyzer_service  # noqa: E402
+import lexer as lexer_module  # noqa: E402
+import parse_cache  # noqa: E402
+import parser as parser_module  # noqa: E402
+from benchmarks.corpus import CorpusSpec, generate_program  # noqa: E402
+
+
+BENCHMARKS = ("lexer", "parser", "semantico", "pipeline")
+DEFAULT_FACTORS = (1, 2, 4, 8)
+# Procesos para la validación semántica (None = secuencial); ver --workers
+SEMANTIC_WORKERS = None
+
+
+def _quiet_error(t) -> None:
+    t.lexer.skip(1)
+
+
+def _count_tokens(source: str) -> int:
+    lex = lexer_module.get_lexer()
+    lex.lexerrorf = _quiet_error
+    lex.input(source)
+    count = 0
+    while lex.token():
+        count += 1
+    return count
+
+
+def _parse(source: str):
+    parser_module.reset_semantic_state()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parser_module.parse_source(source)
+
+
+# ----------------------------------------------------------------------
+# Una función por benchmark: preparan lo necesario y retornan los ns medidos
+# ----------------------------------------------------------------------
+def run_lexer(source: str) -> int:
+    lex = lexer_module.get_lexer()
+    lex.lexerrorf = _quiet_error
+    start = perf_counter_ns()
+    lex.input(source)
+    while lex.token():
+        pass
+    return perf_counter_ns() - start
+
+
+def run_parser(source: str) -> int:
+    parser_module.reset_semantic_state()
+    start = perf_counter_ns()
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser_module.parse_source(source)
+    return perf_counter_ns() - start
+
+
+def run_semantic(source: str) -> int:
+    tree = _parse(source)
+    start = perf_counter_ns()
+    if tree is not None:
+        parser_module.validate_semantic_rules(tree, workers=SEMANTIC_WORKERS)
+    return perf_counter_ns() - start
+
+
+def run_pipeline(source: str) -> int:
+    start = perf_counter_ns()
+    analyzer_service.run_full_analysis(source, "benchmark", workers=SEMANTIC_WORKERS)
+    return perf_counter_ns() - start
+
+
+RUNNERS: Dict[str, Callable[[str], int]] = {
+    "lexer": run_lexer,
+    "parser": run_parser,
+    "semantico": run_semantic,
+    "pipeline": run_pipeline,
+}
+
+
+# ----------------------------------------------------------------------
+# Estadísticas
+# ----------------------------------------------------------------------
+def percentile(sorted_values: List[int], pct: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return float(sorted_values[rank])
+
+
+def summarize(samples_ns: List[int]) -> Dict[str, float]:
+    ordered = sorted(samples_ns)
+    return {
+        "min": ordered[0] / 1e6,
+        "p50": percentile(ordered, 50) / 1e6,
+        "p90": percentile(ordered, 90) / 1e6,
+        "p99": percentile(ordered, 99) / 1e6,
+        "mean": sum(ordered) / len(ordered) / 1e6,
+    }
+
+
+def peak_memory(runner: Callable[[str], int], source: str) -> int:
+    tracemalloc.start()
+    try:
+        runner(source)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@contextlib.contextmanager
+def _isolated_logs():
+    """Redirige los logs de la fase pipeline a un directorio temporal.
+
+    También desactiva la caché de parseo: cada repetición debe parsear.
+    """
+    cache_was_enabled = parse_cache.set_enabled(False)
+    original_log_dir = analyzer_service.LOG_DIR
+    original_temp_dir = analyzer_service.TEMP_DIR
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="tokenmasters-bench-") as workdir:
+        analyzer_service.LOG_DIR = Path(workdir) / "logs"
+        analyzer_service.TEMP_DIR = analyzer_service.LOG_DIR / "tmp"
+        os.chdir(workdir)  # parser.py escribe en logs/ relativo al directorio actual
+        try:
+            yield
+        finally:
+            os.chdir(original_cwd)
+            analyzer_service.LOG_DIR = original_log_dir
+            analyzer_service.TEMP_DIR = original_temp_dir
+            parse_cache.set_enabled(cache_was_enabled)
+
+
+def run_suite(
+    base: CorpusSpec,
+    factors,
+    repeat: int,
+    benchmarks=BENCHMARKS,
+    measure_memory: bool = True,
+) -> Dict:
+    results = []
+    with _isolated_logs():
+        # Calentamiento: construir lexer y parser fuera de las mediciones
+        _parse(generate_program(CorpusSpec(functions=1, classes=1)))
+
+        for factor in factors:
+            spec = base.scaled(factor)
+            source = generate_program(spec)
+            size = len(source.encode("utf-8"))
+            tokens = _count_tokens(source)
+
+            for name in benchmarks:
+                runner = RUNNERS[name]
+                runner(source)  # calentamiento (cachés, asignaciones iniciales)
+                samples = [runner(source) for _ in range(repeat)]
+                latency = summarize(samples)
+                p50_seconds = latency["p50"] / 1e3 or 1e-9
+                entry = {
+                    "benchmark": name,
+                    "factor": factor,
+                    "spec": spec.to_dict(),
+                    "bytes": size,
+                    "lines": source.count("\n"),
+                    "tokens": tokens,
+                    "repeat": repeat,
+                    "latency_ms": latency,
+                    "throughput": {
+                        "bytes_per_s": size / p50_seconds,
+                        "tokens_per_s": tokens / p50_seconds,
+                    },
+                }
+                if measure_memory:
+                    entry["peak_memory_bytes"] = peak_memory(runner, source)
+                results.append(entry)
+                print(
+                    f"{name:<10} x{factor:<3} {size / 1024:>9.1f} KB "
+                    f"p50 {latency['p50']:>10.2f} ms  p90 {latency['p90']:>10.2f} ms  "
+                    f"{entry['throughput']['tokens_per_s']:>12.0f} tok/s",
+                    file=sys.stderr,
+                )
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "base_spec": base.to_dict(),
+            "factors": list(factors),
+            "repeat": repeat,
+            "semantic_workers": SEMANTIC_WORKERS,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Lista de regresiones de p50 mayores a ``threshold`` (fracción) contra la base."""
+    previous = {(r["benchmark"], r["factor"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        key = (result["benchmark"], result["factor"])
+        before = previous.get(key)
+        if before is None:
+            continue
+        old, new = before["latency_ms"]["p50"], result["latency_ms"]["p50"]
+        ratio = new / old if old else float("inf")
+        marker = ""
+        if ratio > 1 + threshold:
+            marker = "  <-- REGRESIÓN"
+            regressions.append(f"{key[0]} x{key[1]}: {old:.2f} ms -> {new:.2f} ms ({ratio:.2f}x)")
+        print(f"{key[0]:<10} x{key[1]:<3} {old:>10.2f} -> {new:>10.2f} ms  {ratio:>5.2f}x{marker}", file=sys.stderr)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = argparse.ArgumentParser(description="Benchmarks del analizador Dart TokenMasters")
+    args.add_argument("--factors", type=int, nargs="+", default=list(DEFAULT_FACTORS))
+    args.add_argument("--repeat", type=int, default=5)
+    args.add_argument("--seed", type=int, default=CorpusSpec.seed)
+    args.add_argument("--bench", choices=BENCHMARKS, nargs="+", default=list(BENCHMARKS))
+    args.add_argument("--workers", type=int, help="procesos para la validación semántica")
+    args.add_argument("--no-memory", action="store_true", help="omitir la corrida con tracemalloc")
+    args.add_argument("--output", help="archivo JSON de salida (por defecto, stdout)")
+    args.add_argument("--compare", help="JSON de una corrida anterior para comparar")
+    args.add_argument("--threshold", type=float, default=0.10, help="tolerancia de regresión (0.10 = 10%%)")
+    opts = args.parse_args(argv)
+
+    global SEMANTIC_WORKERS
+    SEMANTIC_WORKERS = opts.workers
+    report = run_suite(
+        CorpusSpec(seed=opts.seed),
+        opts.factors,
+        opts.repeat,
+        benchmarks=opts.bench,
+        measure_memory=not opts.no_memory,
+    )
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if opts.output:
+        Path(opts.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if opts.compare:
+        baseline = json.loads(Path(opts.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, opts.threshold)
+        if regressions:
+            print("\nRegresiones detectadas:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
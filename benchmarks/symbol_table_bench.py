@@ -0,0 +1,178 @@
+"""Memoria y tasa de búsqueda de la tabla de símbolos con muchas declaraciones.
+
+Compara ``symbol_table.SymbolTable`` (nombres internados, símbolos con
+``__slots__``) contra la representación anterior (pila de dicts con un dict
+por variable y búsqueda recorriendo la pila), y mide la pasada de enlace
+completa sobre un programa Dart sintético con N declaraciones.
+
+Uso:
+    python -m benchmarks.symbol_table_bench --declarations 100000 --output symbols.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import parser as parser_module  # noqa: E402
+from symbol_table import FINAL, Symbol, SymbolTable, name_id  # noqa: E402
+
+TYPES = ("int", "double", "String", "bool")
+
+
+def _names(count: int) -> List[str]:
+    return [f"v{i}" for i in range(count)]
+
+
+# ----------------------------------------------------------------------
+# Representación anterior (referencia)
+# ----------------------------------------------------------------------
+def _legacy_build(names: List[str], scopes: int) -> List[Dict]:
+    stack: List[Dict] = [{}]
+    per_scope = max(1, len(names) // scopes)
+    for index, name in enumerate(names):
+        if index and index % per_scope == 0:
+            stack.append({})
+        stack[-1][name] = {"type": TYPES[index % 4], "is_final": index % 3 == 0, "is_const": False}
+    return stack
+
+
+def _legacy_lookup(stack: List[Dict], name: str):
+    for scope in reversed(stack):
+        if name in scope:
+            return scope[name]
+    return None
+
+
+def _table_build(names: List[str], scopes: int) -> SymbolTable:
+    table = SymbolTable()
+    per_scope = max(1, len(names) // scopes)
+    for index, name in enumerate(names):
+        if index and index % per_scope == 0:
+            table.push()
+        ident = name_id(name)
+        table.declare(ident, Symbol(ident, TYPES[index % 4], FINAL if index % 3 == 0 else 0))
+    return table
+
+
+def _measure(build, names: List[str], scopes: int, lookup, keys, lookups: int) -> Dict:
+    tracemalloc.start()
+    start = perf_counter_ns()
+    structure = build(names, scopes)
+    build_ns = perf_counter_ns() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = perf_counter_ns()
+    for key in keys:
+        lookup(structure, key)
+    lookup_ns = perf_counter_ns() - start
+    return {
+        "build_ms": build_ns / 1e6,
+        "memory_bytes": memory,
+        "bytes_per_declaration": memory / len(names),
+        "lookups_per_s": lookups / (lookup_ns / 1e9),
+    }
+
+
+def bench_tables(declarations: int, scopes: int, lookups: int, seed: int) -> Dict:
+    names = _names(declarations)
+    rng = random.Random(seed)
+    sample = [rng.choice(names) for _ in range(lookups)]
+    # Los nombres del AST llegan internados (Ref.name_id), no se cuentan en la búsqueda
+    sample_ids = [name_id(name) for name in sample]
+    return {
+        "anterior": _measure(_legacy_build, names, scopes, _legacy_lookup, sample, lookups),
+        "symbol_table": _measure(_table_build, names, scopes, SymbolTable.lookup, sample_ids, lookups),
+    }
+
+
+# ----------------------------------------------------------------------
+# Pasada de enlace sobre un programa completo
+# ----------------------------------------------------------------------
+def generate_declarations_program(declarations: int, per_function: int = 50) -> str:
+    """Globales y funciones con locales que leen y reasignan variables previas."""
+    lines: List[str] = []
+    globals_count = declarations // 4
+    for i in range(globals_count):
+        lines.append(f"int g{i} = {i};")
+    remaining = declarations - globals_count
+    function = 0
+    while remaining > 0:
+        count = min(per_function, remaining)
+        lines.append(f"void f{function}(int p) {{")
+        for i in range(count):
+            previous = f"l{i - 1}" if i else "p"
+            lines.append(f"  int l{i} = {previous} + g{(function * per_function + i) % max(1, globals_count)};")
+            lines.append(f"  l{i} = l{i} * 2;")
+        lines.append("}")
+        remaining -= count
+        function += 1
+    return "\n".join(lines) + "\n"
+
+
+def bench_binding(declarations: int) -> Dict:
+    source = generate_declarations_program(declarations)
+    parser_module.reset_semantic_state()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tree = parser_module.parse_source(source)
+
+    tracemalloc.start()
+    start = perf_counter_ns()
+    parser_module.bind_symbols(tree)
+    elapsed = perf_counter_ns() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    lookups = parser_module.semantic_stats["symbol_lookups"]
+    return {
+        "bytes": len(source),
+        "syntax_errors": len(parser_module.syntax_errors),
+        "semantic_errors": len(parser_module.semantic_errors),
+        "bind_ms": elapsed / 1e6,
+        "peak_memory_bytes": peak,
+        "symbol_lookups": lookups,
+        "lookups_per_s": lookups / (elapsed / 1e9),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = argparse.ArgumentParser(description="Benchmark de la tabla de símbolos")
+    args.add_argument("--declarations", type=int, default=100_000)
+    args.add_argument("--scopes", type=int, default=100, help="ámbitos anidados en la prueba de tablas")
+    args.add_argument("--lookups", type=int, default=200_000)
+    args.add_argument("--seed", type=int, default=7)
+    args.add_argument("--skip-binding", action="store_true", help="omitir el parseo + enlace del programa")
+    args.add_argument("--output", help="archivo JSON de salida (por defecto, stdout)")
+    opts = args.parse_args(argv)
+
+    report = {
+        "declarations": opts.declarations,
+        "scopes": opts.scopes,
+        "tables": bench_tables(opts.declarations, opts.scopes, opts.lookups, opts.seed),
+    }
+    if not opts.skip_binding:
+        report["binding"] = bench_binding(opts.declarations)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if opts.output:
+        Path(opts.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""Resaltado incremental del editor de TokenMasters.
+
+El resaltado se obtiene del flujo real de tokens de ``lexer.py`` (no de
+búsquedas de texto), pero sólo se vuelve a tokenizar la región editada:
+
+- Cada línea guarda sus tramos coloreados ``(col_inicio, col_fin, tag)``
+  y si comienza dentro de un comentario de bloque.
+- Una edición invalida desde la primera línea modificada; al volver a
+  tokenizar, en cuanto el estado al inicio de una línea posterior a la
+  edición coincide con el que tenía antes, el resto del caché se reutiliza.
+- Las líneas se tokenizan de forma perezosa: sólo hasta donde la GUI pide
+  (normalmente, la última línea visible).
+
+Los comentarios no llegan como tokens (``t_COMMENT`` los descarta), por lo
+que se reconstruyen a partir de los huecos entre tokens consecutivos.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import lexer as lexer_module
+
+
+Span = Tuple[int, int, str]
+
+# Tokens que se colorean y el tag de Tk que les corresponde
+KEYWORD_TOKENS = frozenset(lexer_module.reserved.values())
+TOKEN_TAGS: Dict[str, str] = {token: "keyword" for token in KEYWORD_TOKENS}
+TOKEN_TAGS.update({"STRING": "string", "NUMBER": "number"})
+
+HIGHLIGHT_TAGS = ("keyword", "string", "number", "comment", "block_comment")
+
+# Mismas reglas que t_COMMENT y t_MULTILINE_COMMENT, aplicadas sobre los huecos
+_GAP_COMMENT_RE = re.compile(r"//[^\n]*|/\*(?:.|\n)*?\*/")
+
+# Cantidad mínima de líneas a tokenizar por lote
+CHUNK_LINES = 200
+
+
+def _quiet_error(t) -> None:
+    """Ignora caracteres ilegales sin imprimir nada (el resaltado no reporta)."""
+    t.lexer.skip(1)
+
+
+class IncrementalHighlighter:
+    """Mantiene los tramos resaltados por línea y los recalcula bajo demanda."""
+
+    def __init__(self) -> None:
+        self._lexer = lexer_module.build_lexer()
+        self._lexer.lexerrorf = _quiet_error
+        self._lines: List[str] = [""]
+        self._spans: List[List[Span]] = [[]]
+        # _in_comment[i] indica si la línea i empieza dentro de /* ... */
+        self._in_comment: List[bool] = [False, False]
+        # Líneas con un '/*' sin cerrar (el lexer lo ve como DIVIDE TIMES)
+        self._open_comment_lines: List[int] = []
+        self._valid_upto = 0
+        self._dirty_to = 0
+        self._resume_upto = 0
+
+    # ------------------------------------------------------------------
+    # API pública
+    # ------------------------------------------------------------------
+    @property
+    def line_count(self) -> int:
+        return len(self._lines)
+
+    def set_text(self, text: str) -> None:
+        """Reemplaza todo el documento y descarta el caché."""
+        self._lines = text.split("\n")
+        self._spans = [[] for _ in self._lines]
+        self._in_comment = [False] * (len(self._lines) + 1)
+        self._open_comment_lines = []
+        self._valid_upto = 0
+        self._dirty_to = 0
+        self._resume_upto = 0
+
+    def update(self, text: str) -> Tuple[int, int]:
+        """Sincroniza el documento con ``text`` e invalida sólo lo editado.
+
+        Retorna el rango de líneas (base 0, fin exclusivo) que cambió.
+        """
+        new_lines = text.split("\n")
+        old_lines = self._lines
+        old_count, new_count = len(old_lines), len(new_lines)
+
+        prefix = 0
+        limit = min(old_count, new_count)
+        while prefix < limit and old_lines[prefix] == new_lines[prefix]:
+            prefix += 1
+        if prefix == old_count == new_count:
+            return prefix, prefix
+
+        suffix = 0
+        limit -= prefix
+        while suffix < limit and old_lines[old_count - 1 - suffix] == new_lines[new_count - 1 - suffix]:
+            suffix += 1
+
+        old_end = old_count - suffix
+        new_end = new_count - suffix
+        delta = new_count - old_count
+
+        self._lines = new_lines
+        self._spans[prefix:old_end] = [[] for _ in range(new_end - prefix)]
+        # El estado al inicio de 'prefix' sigue siendo válido (sólo depende de las
+        # líneas anteriores); la cola conserva su estado previo para detectar convergencia.
+        tail = old_end if new_end > prefix else old_end + 1
+        self._in_comment = (
+            self._in_comment[:prefix + 1]
+            + [False] * max(0, new_end - prefix - 1)
+            + self._in_comment[tail:]
+        )
+        self._open_comment_lines = [
+            line if line < prefix else line + delta
+            for line in self._open_comment_lines
+            if line < prefix or line >= old_end
+        ]
+
+        restart = prefix
+        # Un '/*' sin cerrar antes de la edición podría cerrarse ahora
+        for line in self._open_comment_lines:
+            if line < restart:
+                restart = line
+        restart = self._comment_start(restart)
+
+        self._resume_upto = self._valid_upto + delta if self._valid_upto > old_end else 0
+        self._dirty_to = max(new_end, prefix + 1)
+        self._valid_upto = min(self._valid_upto, restart)
+        return prefix, new_end
+
+    def spans_for(self, first: int, last: int) -> Dict[int, List[Span]]:
+        """Tramos de las líneas ``first..last`` (base 0, inclusivo)."""
+        last = min(last, len(self._lines) - 1)
+        self._ensure(last + 1)
+        return {line: self._spans[line] for line in range(first, last + 1)}
+
+    # ------------------------------------------------------------------
+    # Tokenización incremental
+    # ------------------------------------------------------------------
+    def _comment_start(self, line: int) -> int:
+        """Retrocede hasta la línea donde se abrió el comentario que cubre ``line``."""
+        while line > 0 and self._in_comment[line]:
+            line -= 1
+        return line
+
+    def _ensure(self, upto: int) -> None:
+        total = len(self._lines)
+        upto = min(upto, total)
+        while self._valid_upto < upto:
+            first = self._valid_upto
+            last = min(total, max(upto, first + CHUNK_LINES))
+            spans, states, opened, last = self._lex_window(first, last)
+
+            self._open_comment_lines = [
+                line for line in self._open_comment_lines if not first <= line < last
+            ]
+            self._open_comment_lines.extend(opened)
+
+            for offset, line_spans in enumerate(spans):
+                line = first + offset
+                self._spans[line] = line_spans
+                next_state = states[offset + 1]
+                converged = (
+                    line + 1 >= self._dirty_to
+                    and line + 1 < self._resume_upto
+                    and self._in_comment[line + 1] == next_state
+                )
+                self._in_comment[line + 1] = next_state
+                if converged:
+                    # El resto del documento no cambió respecto al caché previo
+                    self._valid_upto = self._resume_upto
+                    self._resume_upto = 0
+                    break
+            else:
+                self._valid_upto = last
+
+    def _lex_window(self, first: int, last: int):
+        """Tokeniza las líneas ``first..last-1``; ``first`` empieza fuera de comentario."""
+        lines = self._lines
+        text = "\n".join(lines[first:last])
+        line_starts = [0]
+        for line in lines[first:last - 1]:
+            line_starts.append(line_starts[-1] + len(line) + 1)
+
+        count = last - first
+        spans: List[List[Span]] = [[] for _ in range(count)]
+        states = [False] * (count + 1)
+        opened: List[int] = []
+
+        def add_span(start: int, end: int, tag: str) -> None:
+            row = bisect_right(line_starts, start) - 1
+            while start < end:
+                line_end = line_starts[row] + len(lines[first + row])
+                stop = min(end, line_end)
+                if stop > start:
+                    spans[row].append((start - line_starts[row], stop - line_starts[row], tag))
+                if end <= line_end:
+                    break
+                row += 1
+                states[row] = tag == "block_comment"
+                start = line_starts[row]
+
+        lex = self._lexer
+        lex.lineno = 1
+        lex.input(text)
+        pos = 0
+        while True:
+            tok = lex.token()
+            tok_start = tok.lexpos if tok else len(text)
+            if tok_start > pos:
+                for match in _GAP_COMMENT_RE.finditer(text, pos, tok_start):
+                    tag = "comment" if match.group().startswith("//") else "block_comment"
+                    add_span(match.start(), match.end(), tag)
+            if tok is None:
+                break
+            pos = lex.lexpos
+            if tok.type == "DIVIDE" and text.startswith("*", pos):
+                close = self._find_comment_close(last)
+                if close is not None:
+                    # El comentario se cierra fuera de la ventana: ampliarla
+                    return self._lex_window(first, close + 1)
+                opened.append(first + bisect_right(line_starts, tok.lexpos) - 1)
+            tag = TOKEN_TAGS.get(tok.type)
+            if tag:
+                add_span(tok.lexpos, pos, tag)
+
+        return spans, states, opened, last
+
+    def _find_comment_close(self, start: int) -> Optional[int]:
+        """Primera línea desde ``start`` que contiene ``*/``."""
+        lines = self._lines
+        for line in range(start, len(lines)):
+            if "*/" in lines[line]:
+                return line
+        return None
+
+
+def to_tk_ranges(spans: Dict[int, Sequence[Span]]) -> Dict[str, List[str]]:
+    """Convierte tramos por línea (base 0) en índices de Tk agrupados por tag."""
+    ranges: Dict[str, List[str]] = {tag: [] for tag in HIGHLIGHT_TAGS}
+    for line, line_spans in spans.items():
+        row = line + 1
+        for start, end, tag in line_spans:
+            ranges[tag].extend((f"{row}.{start}", f"{row}.{end}"))
+    return ranges
@@ -2,6 +2,9 @@
 
 Incluye:
 - Numeración de líneas sincronizada con el editor.
+- Resaltado incremental (sólo líneas visibles) guiado por el lexer.
+- Diagnóstico en vivo opcional (análisis en segundo plano por segmentos).
+- Carga de archivos grandes en segundo plano, por bloques, con vista previa.
 - Indicador visual del progreso (léxico, sintáctico, semántico).
 - Tarjetas coloreadas para errores por tipo.
 - Botones para abrir cada log generado.
@@ -10,7 +13,9 @@ Incluye:
 from __future__ import annotations
 
 import os
+import queue
 import sys
+import threading
 from pathlib import Path
 from typing import Iterable, List
 
@@ -35,10 +40,36 @@ from tkinter import filedialog, messagebox, ttk
 
 from analyzer_service import (
     AnalysisResult,
-    run_lexical_analysis,
+    build_analysis_result,
+    format_metrics_summary,
+    run_lexical_phase,
     run_semantic_analysis,
     run_syntax_analysis,
 )
+from editor_highlighter import HIGHLIGHT_TAGS, IncrementalHighlighter, to_tk_ranges
+from live_analysis import AnalysisCancelled, LiveAnalyzer
+
+
+def _read_file_chunks(path: str, limit, out: "queue.Queue", chunk_chars: int = 1 << 20) -> None:
+    """Lee ``path`` por bloques y los encola (se ejecuta en un hilo aparte).
+
+    Encola ``("chunk", texto)`` por bloque y al final ``("done", None)`` o
+    ``("error", excepción)``. Con ``limit`` se leen como máximo esos caracteres.
+    """
+    remaining = limit
+    try:
+        with open(path, "r", encoding="utf-8") as source:
+            while remaining is None or remaining > 0:
+                size = chunk_chars if remaining is None else min(chunk_chars, remaining)
+                text = source.read(size)
+                if not text:
+                    break
+                if remaining is not None:
+                    remaining -= len(text)
+                out.put(("chunk", text))
+        out.put(("done", None))
+    except (OSError, UnicodeDecodeError) as exc:
+        out.put(("error", exc))
 
 
 class AnalyzerGUI:
@@ -52,6 +83,9 @@ class AnalyzerGUI:
         "line_bg": "#0f172a",
         "line_fg": "#a5b4fc",
         "comment_fg": "#60a5fa",
+        "keyword_fg": "#f472b6",
+        "string_fg": "#86efac",
+        "number_fg": "#fbbf24",
         "button_primary": "#1d4ed8",
         "button_primary_hover": "#1a3fb5",
         "button_secondary": "#dbeafe",
@@ -66,6 +100,20 @@ class AnalyzerGUI:
         "Semántico": ("#ede9fe", "#5b21b6"),
     }
 
+    # Espera (ms) tras la última tecla antes de refrescar gutter y resaltado
+    HIGHLIGHT_DELAY_MS = 120
+    # Diagnóstico en vivo: espera de inactividad y frecuencia de consulta al trabajador
+    LIVE_DELAY_MS = 400
+    LIVE_POLL_MS = 50
+    # Carga de archivos: caracteres insertados por iteración del loop de Tk
+    LOAD_CHUNK_CHARS = 256 * 1024
+    LOAD_POLL_MS = 15
+    # Análisis completo en un hilo: frecuencia de consulta de su progreso
+    ANALYSIS_POLL_MS = 50
+    # Archivos mayores se confirman y pueden abrirse en vista previa de solo lectura
+    LARGE_FILE_BYTES = 5 * 1024 * 1024
+    PREVIEW_BYTES = 2 * 1024 * 1024
+
     def __init__(self, root: tk.Tk) -> None:
         self.root = root
         self.root.title("TokenMasters – Analizador Dart")
@@ -84,10 +132,30 @@ class AnalyzerGUI:
         }
         self.log_paths = {phase: None for phase in self.phases}
 
+        self.highlighter = IncrementalHighlighter()
+        self._gutter_lines = 0
+        self._refresh_job = None
+        self._text_dirty = False
+        self._last_view = None
+
+        self.live_var = tk.BooleanVar(value=False)
+        self.live_analyzer = None
+        self._live_job = None
+        self._live_future = None
+
+        self._loading = False
+        self._load_queue = None
+        self._load_parts: List[str] = []
+        self._load_pending = ""
+        self._load_name = ""
+        self._load_preview = False
+
+        self._analysis_queue = None
+
         self._create_styles()
         self._build_layout()
         self._update_line_numbers()
-        self._apply_basic_highlighting()
+        self._apply_highlighting()
 
     # ------------------------------------------------------------------
     # Layout
@@ -185,6 +253,16 @@ class AnalyzerGUI:
             primary=True,
         )
         self.analyze_button.pack(side="left", padx=(8, 0))
+        self.live_check = tk.Checkbutton(
+            buttons,
+            text="Diagnóstico en vivo",
+            variable=self.live_var,
+            command=self._toggle_live_mode,
+            bg=self.COLORS["card_bg"],
+            activebackground=self.COLORS["card_bg"],
+            font=("Segoe UI", 10),
+        )
+        self.live_check.pack(side="left", padx=(12, 0))
 
         editor_container = tk.Frame(card, bg=self.COLORS["card_bg"])
         editor_container.grid(row=3, column=0, columnspan=2, sticky="nsew")
@@ -221,12 +299,22 @@ class AnalyzerGUI:
         )
         self.text_editor.grid(row=0, column=1, sticky="nsew")
 
+        self.text_editor.tag_configure("keyword", foreground=self.COLORS["keyword_fg"])
+        self.text_editor.tag_configure("string", foreground=self.COLORS["string_fg"])
+        self.text_editor.tag_configure("number", foreground=self.COLORS["number_fg"])
         self.text_editor.tag_configure("comment", foreground=self.COLORS["comment_fg"])
-
-        self.text_editor.bind("<KeyRelease>", self._on_text_modified)
-        self.text_editor.bind("<MouseWheel>", self._on_text_modified)
-        self.text_editor.bind("<ButtonRelease-1>", self._on_text_modified)
-        self.text_editor.bind("<Configure>", self._on_text_modified)
+        self.text_editor.tag_configure("block_comment", foreground=self.COLORS["comment_fg"])
+        for kind, (_, fg) in self.ERROR_COLORS.items():
+            self.text_editor.tag_configure(f"live_{kind}", underline=True)
+            try:
+                self.text_editor.tag_configure(f"live_{kind}", underlinefg=fg)
+            except tk.TclError:
+                pass  # Tk < 8.6.6 no soporta color de subrayado
+
+        self.text_editor.bind("<<Modified>>", self._on_text_modified)
+        self.text_editor.bind("<MouseWheel>", self._on_view_changed)
+        self.text_editor.bind("<ButtonRelease-1>", self._on_view_changed)
+        self.text_editor.bind("<Configure>", self._on_view_changed)
         self.text_editor.edit_modified(False)
 
         self.y_scroll = ttk.Scrollbar(editor_container, orient="vertical", command=self._on_scrollbar)
@@ -367,38 +455,143 @@ class AnalyzerGUI:
     # Editor helpers
     # ------------------------------------------------------------------
     def _on_text_modified(self, event=None) -> None:
-        if self.text_editor.edit_modified():
-            self.text_editor.edit_modified(False)
+        if not self.text_editor.edit_modified():
+            return
+        self.text_editor.edit_modified(False)
+        if self._loading:
+            return  # La carga por bloques actualiza todo al terminar
+        self._text_dirty = True
+        self._schedule_refresh()
+        if self.live_analyzer is not None:
+            self.live_analyzer.cancel()
+            self._schedule_live_analysis()
+
+    def _on_view_changed(self, event=None) -> None:
+        self._schedule_refresh()
+
+    def _schedule_refresh(self) -> None:
+        """Agrupa ediciones y desplazamientos seguidos en un único refresco."""
+        if self._refresh_job is not None:
+            self.root.after_cancel(self._refresh_job)
+        self._refresh_job = self.root.after(self.HIGHLIGHT_DELAY_MS, self._refresh_editor)
+
+    def _refresh_editor(self) -> None:
+        self._refresh_job = None
+        if self._text_dirty:
+            self._text_dirty = False
+            self.highlighter.update(self.text_editor.get("1.0", "end-1c"))
         self._update_line_numbers()
-        self._apply_basic_highlighting()
+        self._apply_highlighting()
 
     def _update_line_numbers(self) -> None:
-        content = self.text_editor.get("1.0", "end-1c")
-        line_count = content.count("\n") + 1
-        numbers = "\n".join(f"{i:>3}" for i in range(1, line_count + 1))
+        """Actualiza el gutter sólo si cambió la cantidad de líneas."""
+        line_count = int(self.text_editor.index("end-1c").split(".")[0])
+        if line_count == self._gutter_lines:
+            return
+
         self.line_numbers.configure(state="normal")
-        self.line_numbers.delete("1.0", "end")
-        self.line_numbers.insert("1.0", numbers)
+        if line_count > self._gutter_lines:
+            prefix = "\n" if self._gutter_lines else ""
+            numbers = "\n".join(f"{i:>3}" for i in range(self._gutter_lines + 1, line_count + 1))
+            self.line_numbers.insert("end-1c", prefix + numbers)
+        else:
+            self.line_numbers.delete(f"{line_count}.end", "end-1c")
         self.line_numbers.configure(state="disabled")
+        self._gutter_lines = line_count
+        self.line_numbers.yview_moveto(self.text_editor.yview()[0])
+
+    def _visible_lines(self) -> tuple:
+        """Primera y última línea visibles del editor (base 1)."""
+        first = int(self.text_editor.index("@0,0").split(".")[0])
+        last = int(self.text_editor.index(f"@0,{self.text_editor.winfo_height()}").split(".")[0])
+        return first, last
 
-    def _apply_basic_highlighting(self) -> None:
+    def _apply_highlighting(self) -> None:
+        """Colorea únicamente las líneas visibles a partir del caché del lexer."""
         if not hasattr(self, "text_editor"):
             return
 
-        self.text_editor.tag_remove("comment", "1.0", "end")
-        start = "1.0"
-        while True:
-            idx = self.text_editor.search("//", start, stopindex="end")
-            if not idx:
-                break
-            line = idx.split(".")[0]
-            line_end = f"{line}.end"
-            self.text_editor.tag_add("comment", idx, line_end)
-            start = line_end
+        first, last = self._visible_lines()
+        start, end = f"{first}.0", f"{last}.end"
+        for tag in HIGHLIGHT_TAGS:
+            self.text_editor.tag_remove(tag, start, end)
+
+        ranges = to_tk_ranges(self.highlighter.spans_for(first - 1, last - 1))
+        for tag, indices in ranges.items():
+            if indices:
+                self.text_editor.tag_add(tag, *indices)
+
+    # ------------------------------------------------------------------
+    # Diagnóstico en vivo
+    # ------------------------------------------------------------------
+    def _toggle_live_mode(self) -> None:
+        if self.live_var.get():
+            self.live_analyzer = LiveAnalyzer()
+            self._schedule_live_analysis()
+            self.set_status("Diagnóstico en vivo activado")
+            return
+
+        if self._live_job is not None:
+            self.root.after_cancel(self._live_job)
+            self._live_job = None
+        if self.live_analyzer is not None:
+            self.live_analyzer.shutdown()
+            self.live_analyzer = None
+        self._live_future = None
+        self._underline_diagnostics([])
+        self.set_status("Diagnóstico en vivo desactivado")
+
+    def _schedule_live_analysis(self) -> None:
+        if self._live_job is not None:
+            self.root.after_cancel(self._live_job)
+        self._live_job = self.root.after(self.LIVE_DELAY_MS, self._start_live_analysis)
+
+    def _start_live_analysis(self) -> None:
+        self._live_job = None
+        if self.live_analyzer is None:
+            return
+        future = self.live_analyzer.submit(self.text_editor.get("1.0", "end-1c"))
+        self._live_future = future
+        self.root.after(self.LIVE_POLL_MS, self._poll_live_analysis, future)
+
+    def _poll_live_analysis(self, future) -> None:
+        if future is not self._live_future:
+            return  # Una edición posterior ya lanzó otro análisis
+        if not future.done():
+            self.root.after(self.LIVE_POLL_MS, self._poll_live_analysis, future)
+            return
+
+        self._live_future = None
+        try:
+            errors = future.result()
+        except AnalysisCancelled:
+            return
+        except Exception as exc:
+            self.set_status(f"Diagnóstico en vivo falló: {exc}")
+            return
+
+        self._underline_diagnostics(errors)
+        self.set_status(f"En vivo: {len(errors)} errores")
+
+    def _underline_diagnostics(self, errors: Iterable[dict]) -> None:
+        ranges = {kind: [] for kind in self.ERROR_COLORS}
+        for error in errors:
+            line = error.get("line")
+            if line and error.get("type") in ranges:
+                ranges[error["type"]].extend((f"{line}.0", f"{line}.end"))
+
+        for kind, indices in ranges.items():
+            tag = f"live_{kind}"
+            self.text_editor.tag_remove(tag, "1.0", "end")
+            if indices:
+                self.text_editor.tag_add(tag, *indices)
 
     def _on_textscroll(self, *args) -> None:
         self.y_scroll.set(*args)
         self.line_numbers.yview_moveto(args[0])
+        if args[0] != self._last_view:
+            self._last_view = args[0]
+            self._schedule_refresh()
 
     def _on_scrollbar(self, *args) -> None:
         self.text_editor.yview(*args)
@@ -416,19 +609,122 @@ class AnalyzerGUI:
             return
 
         try:
-            content = Path(path).read_text(encoding="utf-8")
+            size = os.path.getsize(path)
         except OSError as exc:
             messagebox.showerror("Error", f"No se pudo leer el archivo:\n{exc}")
             return
 
+        limit = None
+        if size > self.LARGE_FILE_BYTES:
+            answer = messagebox.askyesnocancel(
+                "Archivo grande",
+                f"El archivo pesa {size / (1024 * 1024):.1f} MB y puede tardar en cargarse.\n\n"
+                "Sí: cargarlo completo.\n"
+                f"No: abrir una vista previa de solo lectura (primeros "
+                f"{self.PREVIEW_BYTES // (1024 * 1024)} MB).",
+            )
+            if answer is None:
+                return
+            if answer is False:
+                limit = self.PREVIEW_BYTES
+
+        self._start_loading(path, limit)
+
+    def _start_loading(self, path: str, limit) -> None:
+        """Lee el archivo en un hilo e inserta el texto por bloques sin congelar la GUI."""
+        self._loading = True
+        self._load_queue = queue.Queue()
+        self._load_parts = []
+        self._load_pending = ""
+        self._load_name = Path(path).name
+        self._load_preview = limit is not None
+
+        if self.live_analyzer is not None:
+            self.live_analyzer.cancel()
+        self._set_buttons_state("disabled")
+        self.text_editor.configure(state="normal", undo=False)
         self.text_editor.delete("1.0", "end")
-        self.text_editor.insert("1.0", content)
-        self.file_var.set(f"Archivo: {Path(path).name}")
+        self.set_status(f"Cargando {self._load_name}…")
+
+        threading.Thread(
+            target=_read_file_chunks,
+            args=(path, limit, self._load_queue),
+            daemon=True,
+        ).start()
+        self.root.after(self.LOAD_POLL_MS, self._poll_loading)
+
+    def _poll_loading(self) -> None:
+        budget = self.LOAD_CHUNK_CHARS
+        finished = False
+        error = None
+
+        while budget > 0:
+            if not self._load_pending:
+                try:
+                    kind, payload = self._load_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == "chunk":
+                    self._load_pending = payload
+                    continue
+                finished = kind == "done"
+                error = payload if kind == "error" else None
+                break
+
+            piece = self._load_pending[:budget]
+            self._load_pending = self._load_pending[budget:]
+            self.text_editor.insert("end-1c", piece)
+            self._load_parts.append(piece)
+            budget -= len(piece)
+
+        if error is not None:
+            self._finish_loading()
+            self.text_editor.delete("1.0", "end")
+            self.highlighter.set_text("")
+            self._update_line_numbers()
+            self.file_var.set("Sin archivo cargado")
+            messagebox.showerror("Error", f"No se pudo leer el archivo:\n{error}")
+            self.set_status("Error al cargar el archivo")
+            return
+
+        if not finished or self._load_pending:
+            loaded = sum(len(part) for part in self._load_parts)
+            self.set_status(f"Cargando {self._load_name}… {loaded // 1024} KB")
+            self.root.after(self.LOAD_POLL_MS, self._poll_loading)
+            return
+
+        content = "".join(self._load_parts)
+        self._finish_loading()
+        self.highlighter.set_text(content)
         self._update_line_numbers()
-        self._apply_basic_highlighting()
-        self.set_status(f"Archivo {Path(path).name} cargado")
+        self.text_editor.see("1.0")
+        # El resaltado se calcula sólo para la región visible
+        self._schedule_refresh()
+
+        if self._load_preview:
+            self.text_editor.configure(state="disabled")
+            self.analyze_button.configure(state="disabled")
+            self.file_var.set(f"Archivo: {self._load_name} (vista previa, solo lectura)")
+            self.set_status(f"Vista previa de {self._load_name}: análisis deshabilitado")
+        else:
+            self.file_var.set(f"Archivo: {self._load_name}")
+            self.set_status(f"Archivo {self._load_name} cargado")
+            if self.live_analyzer is not None:
+                self._schedule_live_analysis()
+
+    def _finish_loading(self) -> None:
+        self._loading = False
+        self._load_queue = None
+        self._load_parts = []
+        self._load_pending = ""
+        self._text_dirty = False
+        self.text_editor.configure(undo=True)
+        self.text_editor.edit_reset()
+        self.text_editor.edit_modified(False)
+        self._set_buttons_state("normal")
 
     def clear_all(self) -> None:
+        self.text_editor.configure(state="normal")
         self.text_editor.delete("1.0", "end")
         self._clear_tree(self.tokens_tree)
         self._clear_tree(self.errors_tree)
@@ -441,8 +737,10 @@ class AnalyzerGUI:
         self._render_error_cards([])
         self.set_status("Editor limpio")
         self.progress_var.set("· Léxico | · Sintáctico | · Semántico")
+        self.highlighter.set_text("")
+        self._text_dirty = False
         self._update_line_numbers()
-        self._apply_basic_highlighting()
+        self._apply_highlighting()
 
     def analyze_code(self) -> None:
         code = self.text_editor.get("1.0", "end").strip()
@@ -454,15 +752,55 @@ class AnalyzerGUI:
         self._set_buttons_state("disabled")
         self.set_status("Analizando código…")
 
+        # El análisis espera ANALYSIS_LOCK (lo toma también el diagnóstico en
+        # vivo): corre en un hilo y el loop de Tk consulta su cola
+        self._analysis_queue = queue.Queue()
+        threading.Thread(
+            target=self._run_pipeline,
+            args=(code, git_user, self._analysis_queue),
+            daemon=True,
+        ).start()
+        self.root.after(self.ANALYSIS_POLL_MS, self._poll_analysis)
+
+    def _run_pipeline(self, code: str, git_user: str, out: "queue.Queue") -> None:
+        """Ejecuta las tres fases (en un hilo aparte) y encola progreso y resultado."""
         try:
-            result = self._run_pipeline(code, git_user)
+            out.put(("progress", "… Léxico | · Sintáctico | · Semántico"))
+            # Se tokeniza una vez: las fases del parser consumen los mismos tokens
+            lexical, token_array = run_lexical_phase(code, git_user)
+            out.put(("progress", "✔ Léxico | … Sintáctico | · Semántico"))
+            syntax = run_syntax_analysis(code, git_user, token_array)
+            out.put(("progress", "✔ Léxico | ✔ Sintáctico | … Semántico"))
+            semantic = run_semantic_analysis(code, git_user, token_array=token_array)
+            out.put(("done", build_analysis_result(lexical, syntax, semantic)))
         except Exception as exc:
-            messagebox.showerror("Error", f"Ocurrió un error durante el análisis:\n{exc}")
-            self.set_status("Error durante el análisis")
-            self._set_buttons_state("normal")
-            self.progress_var.set("· Léxico | · Sintáctico | · Semántico")
+            out.put(("error", exc))
+
+    def _poll_analysis(self) -> None:
+        result = None
+        while True:
+            try:
+                kind, payload = self._analysis_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.progress_var.set(payload)
+                continue
+            if kind == "error":
+                messagebox.showerror("Error", f"Ocurrió un error durante el análisis:\n{payload}")
+                self.set_status("Error durante el análisis")
+                self._set_buttons_state("normal")
+                self.progress_var.set("· Léxico | · Sintáctico | · Semántico")
+                return
+            result = payload
+            break
+
+        if result is None:
+            self.root.after(self.ANALYSIS_POLL_MS, self._poll_analysis)
             return
+        self._show_analysis_result(result)
 
+    def _show_analysis_result(self, result: AnalysisResult) -> None:
         self._populate_tokens(result.tokens)
         self._populate_errors(result.errors)
         self._render_error_cards(result.errors)
@@ -475,35 +813,12 @@ class AnalyzerGUI:
             self.log_paths[key] = path
 
         self.set_status(
-            f"Análisis completado. {len(result.tokens)} tokens reconocidos, {len(result.errors)} errores."
+            f"Análisis completado. {len(result.tokens)} tokens reconocidos, {len(result.errors)} errores. "
+            f"Tiempo: {format_metrics_summary(result.metrics)}"
         )
         self.progress_var.set("✔ Léxico | ✔ Sintáctico | ✔ Semántico")
         self._set_buttons_state("normal")
 
-    def _run_pipeline(self, code: str, git_user: str) -> AnalysisResult:
-        self.progress_var.set("… Léxico | · Sintáctico | · Semántico")
-        lexical = run_lexical_analysis(code, git_user)
-        self.progress_var.set("✔ Léxico | … Sintáctico | · Semántico")
-        syntax = run_syntax_analysis(code, git_user)
-        self.progress_var.set("✔ Léxico | ✔ Sintáctico | … Semántico")
-        semantic = run_semantic_analysis(code, git_user)
-
-        combined_errors: List[dict] = []
-        combined_errors.extend(lexical["errors"])
-        combined_errors.extend(syntax["errors"])
-        combined_errors.extend(semantic["errors"])
-
-        return AnalysisResult(
-            tokens=lexical["tokens"],
-            errors=combined_errors,
-            log_paths={
-                "lexico": lexical["log_path"],
-                "sintactico": syntax["log_path"],
-                "semantico": semantic["log_path"],
-            },
-            raw_outputs={"lexico": "", "sintactico": syntax["raw_output"], "semantico": semantic["raw_output"]},
-        )
-
     # ------------------------------------------------------------------
     # Population helpers
     # ------------------------------------------------------------------
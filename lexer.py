@@ -186,20 +186,29 @@ def find_column(token):
 # Literales: números, strings e identificadores
 # ============================================================================
 
-def t_NUMBER(t):
-    r'\d+(\.\d+)?'
-    t.value = float(t.value) if '.' in t.value else int(t.value)
-    return t
-
-def t_STRING(t):
-    r'(\"([^\\\n]|(\\.))*?\")|(\'([^\\\n]|(\\.))*?\')'
-    # Marcar los literales string como tupla para distinguirlos de identificadores
-    t.value = ('str', t.value[1:-1])
-    return t
+# Reglas de cadena: PLY no llama a ninguna función y el token lleva el texto
+# fuente (comillas incluidas); el valor se calcula sólo si alguien lo pide,
+# con literal_value()
+t_NUMBER = r'\d+(\.\d+)?'
+t_STRING = r'(\"([^\\\n]|(\\.))*?\")|(\'([^\\\n]|(\\.))*?\')'
+
+def literal_value(token_type, text):
+    """
+    Valor de un literal a partir del texto del token: int o float para
+    NUMBER, ('str', contenido) para STRING (la tupla lo distingue de un
+    identificador). Cualquier otro token vale su texto.
+    """
+    if token_type == 'NUMBER':
+        return float(text) if '.' in text else int(text)
+    if token_type == 'STRING':
+        return ('str', text[1:-1])
+    return text
 
 def t_ID(t):
     r'[a-zA-Z_][a-zA-Z_0-9]*'
     t.type = reserved.get(t.value, 'ID')
+    # Un solo objeto por nombre: ahorra memoria y acelera las tablas de símbolos
+    t.value = sys.intern(t.value)
     return t
 
 # ============================================================================
@@ -211,6 +220,18 @@ def t_ID(t):
 def build_lexer():
     return lex.lex()
 
+# Lexer maestro: compilar las expresiones regulares una sola vez por proceso
+_master_lexer = None
+
+def get_lexer():
+    """Retorna una copia independiente del lexer maestro (sin recompilar reglas)."""
+    global _master_lexer
+    if _master_lexer is None:
+        _master_lexer = build_lexer()
+    lexer = _master_lexer.clone()
+    lexer.lineno = 1
+    return lexer
+
 def analyze_file(filename, git_user):
     if not os.path.exists(filename):
         print(f"Error: El archivo '{filename}' no existe")
@@ -246,13 +267,14 @@ def analyze_file(filename, git_user):
     token_count = 0
     for tok in lexer:
         token_count += 1
+        value = literal_value(tok.type, tok.value)
         tokens_list.append({
             'num': token_count,
             'type': tok.type,
-            'value': tok.value,
+            'value': value,
             'line': tok.lineno
         })
-        print(f"Token #{token_count:3d} | {tok.type:20s} | Línea {tok.lineno:3d} | Valor: {tok.value}")
+        print(f"Token #{token_count:3d} | {tok.type:20s} | Línea {tok.lineno:3d} | Valor: {value}")
     
     # Escribir el log en archivo
     with open(log_filename, 'w', encoding='utf-8') as log_file:
@@ -0,0 +1,268 @@
+"""Diagnóstico en vivo (mientras se escribe) para el editor de TokenMasters.
+
+El código se divide en segmentos de nivel superior (funciones, clases,
+sentencias globales) y cada segmento se analiza por separado con el
+lexer/parser en caché. Los resultados se guardan por texto de segmento, de
+modo que al editar una función sólo esa función vuelve a analizarse.
+
+Las reglas semánticas de un segmento dependen de las funciones y variables
+globales declaradas en los demás; ese contexto forma parte de la clave del
+caché, así que cambiar una firma invalida todo y editar un cuerpo no.
+
+Este análisis es una vista previa: no escribe logs ni archivos temporales.
+El análisis completo ("Analizar") sigue siendo la referencia.
+"""
+
+from __future__ import annotations
+
+import io
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Tuple
+
+import lexer as lexer_module
+import parser as parser_module
+from analyzer_service import ANALYSIS_LOCK, format_error_entry
+from symbol_table import Symbol
+
+
+# Delimitadores de nivel superior; comentarios y strings se consumen completos
+# con las mismas reglas que lexer.py para no contar llaves dentro de ellos.
+_SEGMENT_RE = re.compile(
+    r"//[^\n]*"
+    r"|/\*(?:.|\n)*?\*/"
+    r"|\"(?:[^\\\n]|\\.)*?\""
+    r"|'(?:[^\\\n]|\\.)*?'"
+    r"|[{};\n]"
+)
+
+# Sentencias que continúan a la anterior (if/else, do/while)
+_CONTINUATION_RE = re.compile(r"\s*(else|while)\b")
+
+_LINE_REF_RE = re.compile(r"([Ll][íi]nea\s+)(\d+)")
+
+
+class AnalysisCancelled(Exception):
+    """Una edición más reciente dejó obsoleto el análisis en curso."""
+
+
+@dataclass
+class Segment:
+    start_line: int  # base 1
+    text: str
+
+    @property
+    def line_count(self) -> int:
+        return self.text.count("\n") + 1
+
+
+@dataclass
+class SegmentResult:
+    # Diagnósticos con líneas relativas al segmento (base 1)
+    errors: List[Dict]
+    functions: Dict[str, Dict] = field(default_factory=dict)
+    globals: Mapping[int, Symbol] = field(default_factory=dict)  # name_id -> Symbol
+
+
+def split_top_level(code: str) -> List[Segment]:
+    """Divide el código en segmentos que terminan en ';' o '}' a profundidad 0."""
+    lines = code.split("\n")
+    boundaries: List[int] = []  # índice (base 0) de la última línea de cada segmento
+    depth = 0
+    last_delim = None
+    line = 0
+
+    for match in _SEGMENT_RE.finditer(code):
+        token = match.group()
+        if token == "\n":
+            if depth == 0 and last_delim in (";", "}"):
+                boundaries.append(line)
+                last_delim = None
+            line += 1
+        elif token == "{":
+            depth += 1
+            last_delim = token
+        elif token == "}":
+            depth = max(0, depth - 1)
+            last_delim = token
+        elif token == ";":
+            last_delim = token
+        else:
+            line += token.count("\n")
+
+    if not boundaries or boundaries[-1] != len(lines) - 1:
+        boundaries.append(len(lines) - 1)
+
+    segments: List[Segment] = []
+    start = 0
+    for end in boundaries:
+        text = "\n".join(lines[start:end + 1])
+        if segments and _CONTINUATION_RE.match(text):
+            previous = segments[-1]
+            previous.text = previous.text + "\n" + text
+        else:
+            segments.append(Segment(start + 1, text))
+        start = end + 1
+    return segments
+
+
+def _shift_line_refs(entry: Dict, delta: int) -> Dict:
+    """Traslada un diagnóstico relativo al segmento a líneas del documento."""
+    if not delta:
+        return dict(entry)
+    shifted = dict(entry)
+    if entry.get("line") is not None:
+        shifted["line"] = entry["line"] + delta
+    shifted["description"] = _LINE_REF_RE.sub(
+        lambda m: f"{m.group(1)}{int(m.group(2)) + delta}", entry["description"]
+    )
+    return shifted
+
+
+def _context_key(functions: Dict[str, Dict], global_vars: Mapping[int, Symbol]) -> str:
+    return repr((sorted(functions.items()), sorted(global_vars.items())))
+
+
+def analyze_segment(text: str, functions: Dict[str, Dict], global_vars: Mapping[int, Symbol]) -> SegmentResult:
+    """Léxico + sintáctico + semántico de un segmento aislado (líneas desde 1)."""
+    errors: List[Dict] = []
+
+    def collect_error(t):
+        errors.append(
+            format_error_entry(
+                f"Carácter ilegal '{t.value[0]}' en línea {t.lexer.lineno}, "
+                f"columna {lexer_module.find_column(t)}",
+                "Léxico",
+            )
+        )
+        t.lexer.skip(1)
+
+    last_line = text.count("\n") + 1
+    with ANALYSIS_LOCK:
+        parser_module.reset_semantic_state(functions, global_vars)
+        with redirect_stdout(io.StringIO()):
+            # Un solo paso del lexer: el parser consume todos los tokens y
+            # collect_error recoge los errores léxicos por el camino
+            lex = lexer_module.get_lexer()
+            lex.lexerrorf = collect_error
+            tree = parser_module.parse_source(text, lexer=lex)
+            if tree is not None:
+                parser_module.validate_semantic_rules(tree)
+
+        for message in parser_module.syntax_errors:
+            entry = format_error_entry(message, "Sintáctico")
+            if entry["line"] is None:
+                entry["line"] = last_line  # final de archivo inesperado
+            errors.append(entry)
+        errors.extend(format_error_entry(m, "Semántico") for m in parser_module.semantic_errors)
+
+        result_functions = {
+            name: parser_module.function_table[name]
+            for name in _top_level_functions(tree)
+            if name in parser_module.function_table
+        }
+        # Sólo las globales declaradas en el segmento (las sembradas son la base)
+        result_globals = parser_module.symbols.snapshot()
+
+    return SegmentResult(errors, result_functions, result_globals)
+
+
+def _top_level_functions(tree) -> List[str]:
+    names: List[str] = []
+    if not tree or tree[0] != "program":
+        return names
+    for stmt in tree[1]:
+        if not isinstance(stmt, tuple) or not stmt:
+            continue
+        if stmt[0] in ("function", "arrow_function"):
+            names.append(str(stmt[2]))
+        elif stmt[0] == "function_void":
+            names.append(stmt[1])
+    return names
+
+
+class LiveAnalyzer:
+    """Analiza en segundo plano y reutiliza resultados de segmentos sin cambios.
+
+    ``submit`` descarta cualquier análisis anterior que siga en curso: el
+    trabajador revisa la generación entre segmentos y aborta si quedó vieja.
+    """
+
+    def __init__(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-analysis")
+        self._generation = 0
+        self._lock = threading.Lock()
+        # texto del segmento -> resultado sin contexto (para exportar firmas)
+        self._exports: Dict[str, SegmentResult] = {}
+        # (texto del segmento, clave de contexto) -> resultado
+        self._results: Dict[Tuple[str, str], SegmentResult] = {}
+        self._context: Tuple[Dict, Dict] = ({}, {})
+        self.segments_analyzed = 0
+
+    @property
+    def functions(self) -> Dict[str, Dict]:
+        """Tabla de funciones de nivel superior del último documento analizado."""
+        return dict(self._context[0])
+
+    def submit(self, code: str) -> Future:
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        return self._executor.submit(self._run, code, generation)
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._generation += 1
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _check(self, generation: int) -> None:
+        if generation != self._generation:
+            raise AnalysisCancelled()
+
+    def _run(self, code: str, generation: int) -> List[Dict]:
+        segments = split_top_level(code)
+        analyzed = 0
+
+        # 1) Firmas de funciones y globales de cada segmento
+        functions, global_vars = self._context
+        exports: Dict[str, SegmentResult] = {}
+        for segment in segments:
+            self._check(generation)
+            result = self._exports.get(segment.text)
+            if result is None:
+                result = analyze_segment(segment.text, functions, global_vars)
+                self._results[(segment.text, _context_key(functions, global_vars))] = result
+                analyzed += 1
+            exports[segment.text] = result
+
+        functions, global_vars = {}, {}
+        for result in exports.values():
+            functions.update(result.functions)
+            global_vars.update(result.globals)
+        context_key = _context_key(functions, global_vars)
+
+        # 2) Diagnósticos con el contexto completo del documento
+        errors: List[Dict] = []
+        results: Dict[Tuple[str, str], SegmentResult] = {}
+        for segment in segments:
+            self._check(generation)
+            key = (segment.text, context_key)
+            result = self._results.get(key)
+            if result is None:
+                result = analyze_segment(segment.text, functions, global_vars)
+                analyzed += 1
+            results[key] = result
+            errors.extend(_shift_line_refs(e, segment.start_line - 1) for e in result.errors)
+
+        # Sólo se conservan los segmentos del documento actual
+        self._exports = exports
+        self._results = results
+        self._context = (functions, global_vars)
+        self.segments_analyzed = analyzed
+        return errors
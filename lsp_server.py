@@ -0,0 +1,489 @@
+"""Servidor LSP (Language Server Protocol) de TokenMasters sobre stdio.
+
+Reutiliza las piezas del editor de la GUI, una instancia por documento:
+
+- diagnósticos: ``live_analysis.LiveAnalyzer`` (caché por segmento de nivel
+  superior), en segundo plano y con espera (``DEBOUNCE_SECONDS``) tras cada
+  cambio; un análisis que quedó viejo se cancela entre segmentos;
+- tokens semánticos: ``editor_highlighter.IncrementalHighlighter``, que sólo
+  vuelve a tokenizar las líneas editadas;
+- símbolos: clases, métodos y funciones encontrados en el flujo de tokens de
+  ``lexer.py``, con tipo y parámetros de ``function_table`` cuando se conocen.
+
+La sincronización es incremental (``TextDocumentSyncKind.Incremental``) y las
+columnas del protocolo van en unidades UTF-16.
+
+Uso (comando del servidor en la configuración del editor):
+    python lsp_server.py
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+import threading
+from bisect import bisect_right
+from concurrent.futures import Future
+from typing import BinaryIO, Dict, List, Optional
+
+import lexer as lexer_module
+from editor_highlighter import IncrementalHighlighter
+from live_analysis import AnalysisCancelled, LiveAnalyzer
+
+# Espera tras la última edición antes de analizar
+DEBOUNCE_SECONDS = 0.3
+
+# Leyenda de tokens semánticos: índice = posición en la lista
+SEMANTIC_TOKEN_TYPES = ["keyword", "string", "number", "comment"]
+_TAG_TYPES = {"keyword": 0, "string": 1, "number": 2, "comment": 3, "block_comment": 3}
+
+# SymbolKind del protocolo
+SYMBOL_CLASS = 5
+SYMBOL_METHOD = 6
+SYMBOL_FUNCTION = 12
+
+# Tokens que pueden preceder al nombre en una declaración de función (tipo)
+_RETURN_TYPE_TOKENS = frozenset(("ID", "VOID", "INT_TYPE", "DOUBLE_TYPE", "STRING_TYPE", "BOOL_TYPE"))
+
+_UNEXPECTED_TOKEN_RE = re.compile(r"Token inesperado '(.+?)' \(tipo")
+
+# Códigos de error de JSON-RPC
+METHOD_NOT_FOUND = -32601
+INVALID_REQUEST = -32600
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+SERVER_NOT_INITIALIZED = -32002
+
+
+# ---------------- posiciones (UTF-16) ----------------
+
+def _utf16_column(line: str, index: int) -> int:
+    if line.isascii():
+        return index
+    return len(line[:index].encode("utf-16-le")) // 2
+
+
+def _index_from_utf16(line: str, units: int) -> int:
+    if line.isascii():
+        return min(units, len(line))
+    count = 0
+    for index, char in enumerate(line):
+        if count >= units:
+            return index
+        count += 2 if ord(char) > 0xFFFF else 1
+    return len(line)
+
+
+class _LineIndex:
+    """Convierte offsets del texto en posiciones del protocolo y viceversa."""
+
+    def __init__(self, text: str) -> None:
+        self.lines = text.split("\n")
+        self.starts = [0]
+        for line in self.lines[:-1]:
+            self.starts.append(self.starts[-1] + len(line) + 1)
+
+    def position(self, offset: int) -> Dict:
+        row = bisect_right(self.starts, offset) - 1
+        return {"line": row, "character": _utf16_column(self.lines[row], offset - self.starts[row])}
+
+    def offset(self, position: Dict) -> int:
+        row = position["line"]
+        if row >= len(self.lines):
+            return self.starts[-1] + len(self.lines[-1])
+        return self.starts[row] + _index_from_utf16(self.lines[row], position["character"])
+
+
+def apply_change(text: str, change: Dict) -> str:
+    """Aplica un ``TextDocumentContentChangeEvent`` (con o sin rango)."""
+    if "range" not in change:
+        return change["text"]
+    index = _LineIndex(text)
+    start = index.offset(change["range"]["start"])
+    end = index.offset(change["range"]["end"])
+    return text[:start] + change["text"] + text[end:]
+
+
+# ---------------- símbolos ----------------
+
+def _quiet_error(t) -> None:
+    t.lexer.skip(1)
+
+
+def _matching(tokens, index: int, open_type: str, close_type: str) -> int:
+    """Índice del token que cierra el abierto en ``index`` (o el último)."""
+    depth = 0
+    for position in range(index, len(tokens)):
+        kind = tokens[position].type
+        if kind == open_type:
+            depth += 1
+        elif kind == close_type:
+            depth -= 1
+            if depth == 0:
+                return position
+    return len(tokens) - 1
+
+
+def find_declarations(text: str) -> List[Dict]:
+    """Clases y funciones declaradas, con offsets: name, kind, start, end, name_start, children."""
+    lex = lexer_module.get_lexer()
+    lex.lexerrorf = _quiet_error
+    lex.input(text)
+    tokens = list(iter(lex.token, None))
+
+    top: List[Dict] = []
+    classes: List[Dict] = []  # clases abiertas; cada una recuerda la profundidad de su cuerpo
+    depth = 0
+    index = 0
+    while index < len(tokens):
+        tok = tokens[index]
+        container = classes[-1] if classes else None
+        body_depth = container["depth"] if container else 0
+        if (tok.type == "CLASS" and index + 2 < len(tokens)
+                and tokens[index + 1].type == "ID" and tokens[index + 2].type == "LBRACE"):
+            name = tokens[index + 1]
+            node = {"name": name.value, "kind": SYMBOL_CLASS, "start": tok.lexpos, "end": len(text),
+                    "name_start": name.lexpos, "children": [], "depth": depth + 1}
+            (container["children"] if container else top).append(node)
+            classes.append(node)
+        elif (tok.type == "ID" and depth == body_depth and index > 0
+                and index + 1 < len(tokens) and tokens[index + 1].type == "LPAREN"
+                and tokens[index - 1].type in _RETURN_TYPE_TOKENS):
+            close = _matching(tokens, index + 1, "LPAREN", "RPAREN")
+            end = close
+            if close + 1 < len(tokens) and tokens[close + 1].type == "LBRACE":
+                end = _matching(tokens, close + 1, "LBRACE", "RBRACE")
+            elif close + 1 < len(tokens) and tokens[close + 1].type == "ARROW":
+                end = close + 1
+                while end + 1 < len(tokens) and tokens[end].type != "SEMICOLON":
+                    end += 1
+            previous = tokens[index - 1]
+            node = {"name": tok.value, "kind": SYMBOL_METHOD if container else SYMBOL_FUNCTION,
+                    "start": previous.lexpos, "end": tokens[end].lexpos + len(str(tokens[end].value)),
+                    "name_start": tok.lexpos, "children": []}
+            (container["children"] if container else top).append(node)
+            # El cuerpo no declara nada visible fuera: saltarlo
+            for skipped in tokens[index + 1:end + 1]:
+                if skipped.type == "LBRACE":
+                    depth += 1
+                elif skipped.type == "RBRACE":
+                    depth -= 1
+            index = end + 1
+            continue
+        elif tok.type == "LBRACE":
+            depth += 1
+        elif tok.type == "RBRACE":
+            depth -= 1
+            if container and depth < container["depth"]:
+                container["end"] = tok.lexpos + 1
+                classes.pop()
+        index += 1
+    return top
+
+
+def _function_detail(name: str, functions: Dict[str, Dict]) -> Optional[str]:
+    info = functions.get(name)
+    if info is None:
+        return None
+    params = ", ".join(f"{param_type} {param_name}" for param_type, param_name in info["params"])
+    return f"{info['type']} {name}({params})"
+
+
+# ---------------- documentos ----------------
+
+class _Document:
+    def __init__(self, uri: str, text: str, version: int) -> None:
+        self.uri = uri
+        self.text = text
+        self.version = version
+        self.analyzer = LiveAnalyzer()
+        self.highlighter = IncrementalHighlighter()
+        self.highlighter.set_text(text)
+        self.timer: Optional[threading.Timer] = None
+        self.symbols: Optional[tuple] = None  # (versión, símbolos)
+
+    def close(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+        self.analyzer.shutdown()
+
+
+class LanguageServer:
+    def __init__(self, stdin: BinaryIO, stdout: BinaryIO) -> None:
+        self._in = stdin
+        self._out = stdout
+        self._write_lock = threading.Lock()
+        self._documents: Dict[str, _Document] = {}
+        self._initialized = False
+        self._shutdown = False
+        self._handlers = {
+            "initialize": self._initialize,
+            "shutdown": self._shutdown_request,
+            "textDocument/semanticTokens/full": self._semantic_tokens,
+            "textDocument/documentSymbol": self._document_symbols,
+        }
+        self._notifications = {
+            "initialized": lambda params: None,
+            "exit": self._exit,
+            "textDocument/didOpen": self._did_open,
+            "textDocument/didChange": self._did_change,
+            "textDocument/didSave": self._did_save,
+            "textDocument/didClose": self._did_close,
+        }
+
+    # ---------------- transporte ----------------
+
+    def _read_message(self) -> Optional[Dict]:
+        headers = {}
+        while True:
+            line = self._in.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode("ascii", "replace").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        return json.loads(self._in.read(length).decode("utf-8"))
+
+    def _send(self, payload: Dict) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        with self._write_lock:
+            self._out.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+            self._out.flush()
+
+    def _notify(self, method: str, params: Dict) -> None:
+        self._send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def serve(self) -> int:
+        """Atiende mensajes hasta ``exit``; retorna el código de salida."""
+        while True:
+            try:
+                message = self._read_message()
+            except ValueError as exc:
+                print(f"Mensaje LSP inválido: {exc}", file=sys.stderr)
+                continue
+            if message is None:
+                break
+            exit_code = self._dispatch(message)
+            if exit_code is not None:
+                return exit_code
+        self._close_documents()
+        return 0 if self._shutdown else 1
+
+    def _dispatch(self, message: Dict) -> Optional[int]:
+        method = message.get("method")
+        params = message.get("params") or {}
+        if "id" not in message:
+            if method == "exit":
+                return self._exit(params)
+            handler = self._notifications.get(method)
+            if handler is not None and (self._initialized or method == "initialized"):
+                try:
+                    handler(params)
+                except Exception as exc:
+                    # Sin id no hay a quién responder: se registra y se sigue atendiendo
+                    print(f"Error en la notificación {method}: {exc!r}", file=sys.stderr)
+            return None  # notificaciones desconocidas (p. ej. $/cancelRequest) se ignoran
+
+        request_id = message["id"]
+        handler = self._handlers.get(method)
+        if handler is None:
+            error = {"code": METHOD_NOT_FOUND, "message": f"Método no soportado: {method}"}
+        elif not self._initialized and method != "initialize":
+            error = {"code": SERVER_NOT_INITIALIZED, "message": "Falta 'initialize'"}
+        elif self._shutdown:
+            error = {"code": INVALID_REQUEST, "message": "El servidor se está cerrando"}
+        else:
+            try:
+                result = handler(params)
+            except (KeyError, TypeError, ValueError) as exc:
+                # Parámetros mal formados, p. ej. sin textDocument
+                error = {"code": INVALID_PARAMS, "message": f"Parámetros inválidos para {method}: {exc!r}"}
+            except Exception as exc:
+                print(f"Error atendiendo {method}: {exc!r}", file=sys.stderr)
+                error = {"code": INTERNAL_ERROR, "message": f"Error interno en {method}: {exc!r}"}
+            else:
+                self._send({"jsonrpc": "2.0", "id": request_id, "result": result})
+                return None
+        self._send({"jsonrpc": "2.0", "id": request_id, "error": error})
+        return None
+
+    # ---------------- ciclo de vida ----------------
+
+    def _initialize(self, params: Dict) -> Dict:
+        self._initialized = True
+        return {
+            "capabilities": {
+                "textDocumentSync": {"openClose": True, "change": 2, "save": True},
+                "semanticTokensProvider": {
+                    "legend": {"tokenTypes": SEMANTIC_TOKEN_TYPES, "tokenModifiers": []},
+                    "full": True,
+                },
+                "documentSymbolProvider": True,
+            },
+            "serverInfo": {"name": "tokenmasters-dart"},
+        }
+
+    def _shutdown_request(self, params: Dict) -> None:
+        self._shutdown = True
+        self._close_documents()
+        return None
+
+    def _exit(self, params: Dict) -> int:
+        self._close_documents()
+        return 0 if self._shutdown else 1
+
+    def _close_documents(self) -> None:
+        for document in self._documents.values():
+            document.close()
+        self._documents.clear()
+
+    # ---------------- sincronización ----------------
+
+    def _did_open(self, params: Dict) -> None:
+        item = params["textDocument"]
+        previous = self._documents.pop(item["uri"], None)
+        if previous is not None:
+            previous.close()
+        document = _Document(item["uri"], item["text"], item.get("version", 0))
+        self._documents[document.uri] = document
+        self._analyze(document)
+
+    def _did_change(self, params: Dict) -> None:
+        document = self._documents.get(params["textDocument"]["uri"])
+        if document is None:
+            return
+        text = document.text
+        for change in params["contentChanges"]:
+            text = apply_change(text, change)
+        document.text = text
+        document.version = params["textDocument"].get("version", document.version + 1)
+        self._schedule(document)
+
+    def _did_save(self, params: Dict) -> None:
+        document = self._documents.get(params["textDocument"]["uri"])
+        if document is not None:
+            self._analyze(document)
+
+    def _did_close(self, params: Dict) -> None:
+        document = self._documents.pop(params["textDocument"]["uri"], None)
+        if document is not None:
+            document.close()
+            self._notify("textDocument/publishDiagnostics", {"uri": document.uri, "diagnostics": []})
+
+    # ---------------- diagnósticos ----------------
+
+    def _schedule(self, document: _Document) -> None:
+        """Reinicia la espera: sólo se analiza cuando el usuario deja de escribir."""
+        if document.timer is not None:
+            document.timer.cancel()
+        document.timer = threading.Timer(DEBOUNCE_SECONDS, self._analyze, (document,))
+        document.timer.daemon = True
+        document.timer.start()
+
+    def _analyze(self, document: _Document) -> None:
+        if document.timer is not None:
+            document.timer.cancel()
+            document.timer = None
+        text, version = document.text, document.version
+        future = document.analyzer.submit(text)
+        future.add_done_callback(lambda done: self._publish(document, text, version, done))
+
+    def _publish(self, document: _Document, text: str, version: int, future: Future) -> None:
+        if future.cancelled() or document.version != version:
+            return  # hay una versión más nueva en camino
+        error = future.exception()
+        if isinstance(error, AnalysisCancelled):
+            return
+        if error is not None:
+            print(f"Error analizando {document.uri}: {error!r}", file=sys.stderr)
+            return
+        lines = text.split("\n")
+        self._notify("textDocument/publishDiagnostics", {
+            "uri": document.uri,
+            "version": version,
+            "diagnostics": [_diagnostic(lines, entry) for entry in future.result()],
+        })
+
+    # ---------------- tokens y símbolos ----------------
+
+    def _semantic_tokens(self, params: Dict) -> Dict:
+        document = self._documents.get(params["textDocument"]["uri"])
+        if document is None:
+            return {"data": []}
+        highlighter = document.highlighter
+        highlighter.update(document.text)
+        lines = document.text.split("\n")
+        data: List[int] = []
+        previous_line = previous_start = 0
+        for line, spans in highlighter.spans_for(0, highlighter.line_count - 1).items():
+            text = lines[line]
+            for start, end, tag in spans:
+                start_col = _utf16_column(text, start)
+                length = _utf16_column(text, end) - start_col
+                delta_start = start_col - previous_start if line == previous_line else start_col
+                data.extend((line - previous_line, delta_start, length, _TAG_TYPES[tag], 0))
+                previous_line, previous_start = line, start_col
+        return {"data": data}
+
+    def _document_symbols(self, params: Dict) -> List[Dict]:
+        document = self._documents.get(params["textDocument"]["uri"])
+        if document is None:
+            return []
+        if document.symbols is None or document.symbols[0] != document.version:
+            index = _LineIndex(document.text)
+            functions = document.analyzer.functions
+
+            def convert(node: Dict) -> Dict:
+                symbol = {
+                    "name": str(node["name"]),
+                    "kind": node["kind"],
+                    "range": {"start": index.position(node["start"]), "end": index.position(node["end"])},
+                    "selectionRange": {
+                        "start": index.position(node["name_start"]),
+                        "end": index.position(node["name_start"] + len(str(node["name"]))),
+                    },
+                    "children": [convert(child) for child in node["children"]],
+                }
+                detail = _function_detail(str(node["name"]), functions) if node["kind"] == SYMBOL_FUNCTION else None
+                if detail:
+                    symbol["detail"] = detail
+                return symbol
+
+            document.symbols = (document.version, [convert(node) for node in find_declarations(document.text)])
+        return document.symbols[1]
+
+
+def _diagnostic(lines: List[str], entry: Dict) -> Dict:
+    """Diagnóstico LSP para un error de ``LiveAnalyzer`` (línea completa o token)."""
+    row = min(max((entry.get("line") or 1) - 1, 0), len(lines) - 1)
+    text = lines[row]
+    start, end = len(text) - len(text.lstrip()), len(text.rstrip())
+    match = _UNEXPECTED_TOKEN_RE.search(entry["description"])
+    if match and match.group(1) in text:
+        start = text.index(match.group(1))
+        end = start + len(match.group(1))
+    return {
+        "range": {
+            "start": {"line": row, "character": _utf16_column(text, start)},
+            "end": {"line": row, "character": _utf16_column(text, max(start, end))},
+        },
+        "severity": 1,
+        "source": "tokenmasters",
+        "code": entry["type"],
+        "message": entry["description"],
+    }
+
+
+def main() -> int:
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    # El protocolo es dueño de stdout: cualquier print (PLY, lexer) va a stderr
+    sys.stdout = sys.stderr
+    return LanguageServer(stdin, stdout).serve()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
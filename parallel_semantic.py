@@ -0,0 +1,233 @@
+"""Validación semántica en paralelo por función de nivel superior.
+
+Con el parseo terminado, el cuerpo de cada función de nivel superior sólo
+depende de la tabla de funciones y de las globales declaradas antes de ella.
+Este módulo:
+
+1. Recorre en el proceso principal las sentencias de nivel superior que no
+   son funciones (globales, clases, sentencias sueltas), en orden, para
+   registrar las globales igual que el recorrido secuencial.
+2. Reparte las funciones en lotes de tamaño parecido (por sentencias)
+   entre procesos, junto con ``function_table`` y las globales como tuplas
+   simples; cada función lleva cuántas de esas globales eran visibles en su
+   posición. Con "fork" los procesos heredan el AST y un lote son sólo
+   posiciones (serializar el AST cuesta tanto como validarlo); con "spawn"
+   viaja el programa codificado con ``ast_codec`` y cada proceso decodifica
+   sólo las sentencias de su lote.
+3. Une los diagnósticos por posición de la sentencia en el programa, de modo
+   que el resultado coincide con ``validate_semantic_rules`` secuencial.
+
+Los símbolos que se enlazan en los procesos trabajadores no regresan: en
+este modo el AST del proceso principal conserva enlazadas sólo las
+sentencias que no son funciones.
+
+Sólo las reglas registradas al importar ``parser.py`` existen en los
+procesos trabajadores.
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter_ns
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import ast_codec
+import parser as parser_module
+from symbol_table import Symbol, name_id
+
+FUNCTION_KINDS = ("function", "function_void", "arrow_function")
+
+# Por debajo de este tamaño (sentencias en funciones) no compensa repartir
+MIN_PARALLEL_STATEMENTS = 5_000
+# Lotes por proceso: más lotes equilibran mejor funciones de tamaño dispar
+CHUNKS_PER_WORKER = 4
+
+# Con "fork" los procesos heredan el AST ya parseado y los lotes viajan como
+# posiciones; sin "fork" (Windows, macOS) se usa "spawn" y se envía el AST codificado.
+START_METHOD = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+# Estado heredado por los procesos creados con "fork" (ver validate_parallel)
+_inherited: Dict[str, object] = {}
+
+
+def _get_spawn_pool(workers: int) -> ProcessPoolExecutor:
+    """Pool "spawn" reutilizable entre análisis (arrancar intérpretes es caro)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def _validate_chunk(functions: Optional[Dict], global_rows: Optional[Sequence[Tuple]],
+                    jobs: Sequence[Tuple], rules, encoded: Optional[bytes] = None):
+    """Trabajador: valida cada (posición, globales visibles) del lote.
+
+    Con "fork" ``functions`` y ``global_rows`` llegan en None y se toman,
+    junto con las sentencias, del estado heredado; con "spawn" las
+    sentencias se decodifican de ``encoded``. Retorna [(posición, errores)]
+    y los contadores semánticos del lote.
+    """
+    if encoded is not None:
+        nodes = ast_codec.ASTReader(encoded).statements(index for index, _ in jobs)
+    else:
+        functions = _inherited["functions"]
+        global_rows = _inherited["global_rows"]
+        statements = _inherited["statements"]
+        nodes = [statements[index] for index, _ in jobs]
+
+    base: Dict[int, Symbol] = {}
+    applied = 0
+    results = []
+    stats = {"scopes_pushed": 0, "symbol_lookups": 0}
+    for (index, visible), node in zip(jobs, nodes):
+        # Las funciones llegan en orden de código: la base sólo crece
+        while applied < visible:
+            name, type_, flags, lineno = global_rows[applied]
+            ident = name_id(name)
+            base[ident] = Symbol(ident, type_, flags, lineno)
+            applied += 1
+        parser_module.reset_semantic_state(functions, base)
+        parser_module.bind_symbols(node, rules)
+        results.append((index, parser_module.semantic_errors))
+        for key in stats:
+            stats[key] += parser_module.semantic_stats[key]
+    return results, stats
+
+
+def _submit_chunks(chunks: List[List[Tuple]], tree, functions: Dict,
+                   global_rows: List[Tuple], rules, workers: int):
+    """Lanza los lotes y retorna (futuros, pool a cerrar o None)."""
+    if START_METHOD == "fork":
+        # Pool por análisis: los hijos ven el AST y las tablas de esta corrida
+        _inherited.update(statements=tree[1], functions=functions, global_rows=global_rows)
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            mp_context=multiprocessing.get_context("fork"),
+        )
+        futures = [pool.submit(_validate_chunk, None, None, chunk, rules) for chunk in chunks]
+        return futures, pool
+    pool = _get_spawn_pool(workers)
+    encoded = ast_codec.encode(tree)
+    futures = [
+        pool.submit(_validate_chunk, functions, global_rows, chunk, rules, encoded)
+        for chunk in chunks
+    ]
+    return futures, None
+
+
+def _weight(function) -> int:
+    """Costo aproximado de validar una función: sentencias de su cuerpo.
+
+    Contar nodos (``count_ast_nodes``) cuesta casi tanto como validarlos.
+    """
+    body = function[-1]
+    return len(body) if isinstance(body, list) else 1
+
+
+def _chunks(jobs: List[Tuple], weights: List[int], count: int) -> List[List[Tuple]]:
+    """Divide los trabajos (ya en orden) en ``count`` lotes contiguos de peso similar."""
+    total = sum(weights)
+    target = max(1, total // count)
+    chunks: List[List[Tuple]] = [[]]
+    accumulated = 0
+    for job, weight in zip(jobs, weights):
+        if accumulated >= target and len(chunks) < count:
+            chunks.append([])
+            accumulated = 0
+        chunks[-1].append(job)
+        accumulated += weight
+    return chunks
+
+
+def validate_parallel(tree, rules=None, workers: Optional[int] = None) -> bool:
+    """Valida ``tree`` como ``validate_semantic_rules`` repartiendo las funciones.
+
+    Retorna False (sin hacer nada) si el árbol no amerita paralelizar; el
+    llamador entonces usa el recorrido secuencial.
+    """
+    if not tree or tree[0] != "program":
+        return False
+    workers = workers or os.cpu_count() or 1
+    statements = tree[1]
+
+    weights = {
+        index: _weight(stmt)
+        for index, stmt in enumerate(statements)
+        if isinstance(stmt, tuple) and stmt and stmt[0] in FUNCTION_KINDS
+    }
+    if workers < 2 or len(weights) < 2 or sum(weights.values()) < MIN_PARALLEL_STATEMENTS:
+        return False
+
+    rules = list(parser_module.SEMANTIC_RULES) if rules is None else list(rules)
+    parser_module.rule_dispatch(rules)  # nombres desconocidos fallan aquí, no en el trabajador
+
+    start = perf_counter_ns()
+    parse_errors = list(parser_module.semantic_errors)  # p. ej. print mal escrito
+    errors_at: Dict[int, List[str]] = {}
+    jobs: List[Tuple] = []
+
+    # 1) Sentencias de nivel superior que no son funciones, en el proceso principal
+    for index, stmt in enumerate(statements):
+        if index in weights:
+            # Tras cada sentencia se vuelve al ámbito global: sus primeros N símbolos
+            jobs.append((index, parser_module.symbols.current_size()))
+            continue
+        before = len(parser_module.semantic_errors)
+        parser_module.bind_symbols(stmt, rules)
+        errors_at[index] = parser_module.semantic_errors[before:]
+        del parser_module.semantic_errors[before:]
+    global_rows = [
+        (name, symbol.type, symbol.flags, symbol.lineno)
+        for name, symbol in parser_module.symbols.current()
+    ]
+    phase_main = perf_counter_ns() - start
+
+    # 2) Funciones en lotes, en paralelo
+    start = perf_counter_ns()
+    chunks = _chunks(jobs, [weights[job[0]] for job in jobs], workers * CHUNKS_PER_WORKER)
+    functions = dict(parser_module.function_table)
+    futures, own_pool = _submit_chunks(chunks, tree, functions, global_rows, rules, workers)
+    try:
+        for future in futures:
+            results, stats = future.result()
+            for index, errors in results:
+                errors_at[index] = errors
+            for key, value in stats.items():
+                parser_module.semantic_stats[key] += value
+    finally:
+        if own_pool is not None:
+            own_pool.shutdown()
+            _inherited.clear()
+
+    # 3) Diagnósticos en orden de código
+    parser_module.semantic_errors[:] = parse_errors + [
+        error for index in sorted(errors_at) for error in errors_at[index]
+    ]
+    parser_module.phase_timings["semantic_pass"] = phase_main
+    parser_module.phase_timings["semantic_parallel"] = perf_counter_ns() - start
+    return True
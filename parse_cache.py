@@ -0,0 +1,243 @@
+"""Caché persistente del parseo (AST + diagnósticos) por contenido.
+
+``analyze_syntax`` y ``analyze_semantic`` consultan esta caché antes de
+tokenizar y parsear: si el mismo código ya se parseó con la misma gramática,
+se recuperan el AST, los errores sintácticos, los errores semánticos que
+se detectan durante el parseo, la tabla de funciones y la salida impresa.
+
+- Clave: SHA-256 del código fuente.
+- Huella de gramática: hash de los docstrings de las producciones ``p_*``,
+  del código de sus acciones, de la recuperación de errores sintácticos,
+  de la precedencia y de las reglas del lexer.
+  Las entradas viven en un subdirectorio por huella; al cambiar la
+  gramática los directorios de huellas anteriores se eliminan.
+- Formato: ``ast_codec`` (sin pickle: cargar una entrada no ejecuta código).
+- Límites: ``MAX_ENTRIES`` entradas y ``MAX_BYTES`` en total; al superarlos
+  se eliminan las entradas usadas hace más tiempo (LRU por fecha de
+  modificación, que se actualiza en cada acierto).
+
+Uso:
+    python parse_cache.py --estado
+    python parse_cache.py --limpiar
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+import ast_codec
+
+CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "parse"
+MAX_ENTRIES = 500
+MAX_BYTES = 128 * 1024 * 1024
+SUFFIX = ".ast"
+
+# Se desactiva con set_enabled(False) (p. ej. mientras el perfilador mide el parseo)
+_enabled = True
+_fingerprint: Optional[str] = None
+_pruned = False
+_lock = threading.Lock()
+
+RECORD_TAG = "parse_cache"
+
+# Funciones de parser.py que, además de las producciones, afectan el resultado
+RECOVERY_FUNCTIONS = (
+    "_report_syntax_error", "_report_eof_error", "_report_unexpected_token",
+    "_open_nesting", "_accepts_eof", "_balanced_tokens",
+)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def set_enabled(enabled: bool) -> bool:
+    """Activa o desactiva la caché; retorna el estado anterior."""
+    global _enabled
+    previous, _enabled = _enabled, enabled
+    return previous
+
+
+def _code_digest(code, digest) -> None:
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            _code_digest(const, digest)  # comprensiones y funciones anidadas
+        else:
+            digest.update(repr(const).encode("utf-8"))
+    digest.update(repr(code.co_names).encode("utf-8"))
+
+
+def grammar_fingerprint() -> str:
+    """Huella de la gramática y del lexer del proceso actual."""
+    global _fingerprint
+    if _fingerprint is None:
+        import lexer as lexer_module
+        import parser as parser_module
+
+        digest = hashlib.sha256()
+        digest.update(f"ast_codec {ast_codec.VERSION}\n".encode("utf-8"))
+        digest.update(repr(parser_module.precedence).encode("utf-8"))
+        # En orden de definición: PLY resuelve conflictos según ese orden
+        productions = sorted(
+            (func.__code__.co_firstlineno, name, func)
+            for name, func in vars(parser_module).items()
+            if name.startswith("p_") and callable(func)
+        )
+        for _, name, func in productions:
+            digest.update(f"{name}\n{func.__doc__ or ''}\n".encode("utf-8"))
+            _code_digest(func.__code__, digest)
+        # La recuperación de errores también decide el AST y los errores guardados
+        digest.update(f"MAX_SYNTAX_ERRORS={parser_module.MAX_SYNTAX_ERRORS}\n".encode("utf-8"))
+        for name in RECOVERY_FUNCTIONS:
+            _code_digest(getattr(parser_module, name).__code__, digest)
+        digest.update(repr(sorted(lexer_module.tokens)).encode("utf-8"))
+        for name, rule in sorted(vars(lexer_module).items()):
+            if not name.startswith("t_"):
+                continue
+            if isinstance(rule, str):
+                digest.update(f"{name}={rule}\n".encode("utf-8"))
+            elif callable(rule) and hasattr(rule, "__code__"):
+                digest.update(f"{name}\n{rule.__doc__ or ''}\n".encode("utf-8"))
+                _code_digest(rule.__code__, digest)
+        _fingerprint = digest.hexdigest()[:16]
+    return _fingerprint
+
+
+def _directory() -> Path:
+    global _pruned
+    directory = CACHE_DIR / grammar_fingerprint()
+    if not _pruned:
+        # Una vez por proceso: descartar las entradas de gramáticas anteriores
+        _pruned = True
+        if CACHE_DIR.is_dir():
+            for stale in CACHE_DIR.iterdir():
+                if stale.is_dir() and stale.name != directory.name:
+                    shutil.rmtree(stale, ignore_errors=True)
+    return directory
+
+
+def _entry_path(source: str) -> Path:
+    key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    return _directory() / f"{key}{SUFFIX}"
+
+
+def load(source: str) -> Optional[Tuple]:
+    """Registro guardado para ``source`` o None.
+
+    El registro es ``(ast, errores_sintácticos, errores_semánticos,
+    tabla_de_funciones, nodos_del_ast, profundidad_del_ast, salida_impresa)``.
+    """
+    if not _enabled:
+        return None
+    path = _entry_path(source)
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    try:
+        record = ast_codec.decode(data)
+    except (ValueError, IndexError, UnicodeDecodeError):
+        _remove(path)  # entrada truncada o de otra versión del formato
+        return None
+    if not isinstance(record, tuple) or len(record) != 8 or record[0] != RECORD_TAG:
+        _remove(path)
+        return None
+    try:
+        os.utime(path)  # uso reciente para la política LRU
+    except OSError:
+        pass
+    return record[1:]
+
+
+def store(source: str, tree, syntax_errors, semantic_errors, functions, ast_nodes: int, ast_depth: int,
+          output: str) -> None:
+    """Guarda el resultado del parseo de ``source`` y aplica los límites."""
+    if not _enabled:
+        return
+    path = _entry_path(source)
+    record = (RECORD_TAG, tree, list(syntax_errors), list(semantic_errors), dict(functions), ast_nodes, ast_depth,
+              output)
+    data = ast_codec.encode(record)
+    if len(data) > MAX_BYTES:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Escritura atómica: otro proceso nunca lee una entrada a medias
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        os.replace(temp_name, path)
+    except OSError:
+        _remove(Path(temp_name))
+        return
+    with _lock:
+        evict(path.parent)
+
+
+def evict(directory: Optional[Path] = None) -> int:
+    """Elimina las entradas menos usadas hasta cumplir los límites; retorna cuántas."""
+    directory = directory or _directory()
+    entries = []
+    total = 0
+    try:
+        with os.scandir(directory) as iterator:
+            for entry in iterator:
+                if entry.name.endswith(SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+    except OSError:
+        return 0
+    removed = 0
+    entries.sort()  # más antiguas primero
+    while entries and (len(entries) > MAX_ENTRIES or total > MAX_BYTES):
+        _, size, name = entries.pop(0)
+        _remove(Path(name))
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear() -> None:
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+def stats() -> dict:
+    directory = _directory()
+    files = list(directory.glob(f"*{SUFFIX}")) if directory.is_dir() else []
+    return {
+        "directorio": str(directory),
+        "huella": grammar_fingerprint(),
+        "entradas": len(files),
+        "bytes": sum(f.stat().st_size for f in files),
+        "max_entradas": MAX_ENTRIES,
+        "max_bytes": MAX_BYTES,
+    }
+
+
+def _remove(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        pass
+
+
+def main() -> None:
+    if "--limpiar" in sys.argv:
+        clear()
+        print(f"Caché eliminada: {CACHE_DIR}")
+    else:
+        for key, value in stats().items():
+            print(f"{key:<14} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Lexer y parser en paralelo (tubería) para archivos grandes.
+
+Dentro de ``parser.parse()`` el lexer y el parser se turnan: PLY pide un
+token, el lexer lo reconoce y recién entonces sigue el parseo. En modo
+tubería un productor tokeniza el código completo por adelantado y deja los
+tokens, en lotes de ``BATCH_SIZE``, en una cola acotada de ``RING_SLOTS``
+lotes (el productor espera si el parser se atrasa); el parser consume los
+lotes con un ``StreamingLexer``, que reproduce tokens y errores léxicos
+igual que ``token_stream.ReplayLexer``.
+
+Dos productores:
+
+- ``"hilo"``: un hilo del mismo proceso. Con el GIL el lexer y el parser no
+  corren a la vez (ambos son Python puro), así que sólo sirve para
+  comparar: ver ``benchmarks/pipeline_bench.py``.
+- ``"proceso"``: un proceso hijo persistente (se lanza una vez y atiende
+  todos los parseos) recibe el código y devuelve los lotes por una cola de
+  ``multiprocessing``; el parser sólo reproduce tokens mientras el hijo
+  tokeniza el resto.
+
+Desactivado por defecto. ``set_mode("proceso")`` lo activa para los códigos
+de al menos ``min_bytes`` (por debajo, lanzar el trabajo cuesta más de lo
+que se ahorra) y sólo si hay más de un núcleo; ``python parser.py <archivo>
+<usuario> --tuberia proceso`` lo activa para una corrida. El AST, los
+errores y los límites de ``parser.limits`` son los mismos que sin tubería.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+import threading
+from typing import Callable, Optional, Tuple
+
+import lexer as lexer_module
+from token_stream import ReplayLexer, TokenArray
+
+MODES = ("hilo", "proceso")
+BATCH_SIZE = 4096
+RING_SLOTS = 8
+DEFAULT_MIN_BYTES = 256 * 1024
+
+mode: Optional[str] = None
+min_bytes = DEFAULT_MIN_BYTES
+
+
+def set_mode(new_mode: Optional[str], new_min_bytes: Optional[int] = None) -> Optional[str]:
+    """Activa la tubería (``"hilo"``/``"proceso"``) o la desactiva (None); retorna el modo anterior."""
+    global mode, min_bytes
+    if new_mode is not None and new_mode not in MODES:
+        raise ValueError(f"Modo de tubería desconocido: {new_mode} (opciones: {', '.join(MODES)})")
+    previous = mode
+    mode = new_mode
+    if new_min_bytes is not None:
+        min_bytes = new_min_bytes
+    return previous
+
+
+def enabled_for(data: str) -> bool:
+    if mode is None or len(data) < min_bytes:
+        return False
+    # Con un solo núcleo el proceso hijo no corre a la vez que el parser
+    return mode == "hilo" or (os.cpu_count() or 1) > 1
+
+
+def lex_batches(data: str, emit: Callable[[TokenArray, bool], bool], batch_size: int = BATCH_SIZE) -> None:
+    """Tokeniza ``data`` y entrega lotes a ``emit(lote, es_el_ultimo)``.
+
+    Los errores léxicos de cada lote se guardan con índices relativos al
+    lote; el último lote trae la línea final y el largo del código. Si
+    ``emit`` retorna False (el consumidor abandonó) se deja de tokenizar.
+    """
+    lexer = lexer_module.get_lexer()
+    batch = TokenArray()
+
+    def record_error(t) -> None:
+        batch.add_error(t.lexer.lineno, t.lexpos)  # siempre el lote en curso
+        t.lexer.skip(1)
+
+    lexer.lexerrorf = record_error
+    lexer.input(data)
+    while True:
+        tok = lexer.token()
+        if not tok:
+            break
+        batch.append(tok)
+        if len(batch) >= batch_size:
+            if not emit(batch, False):
+                return
+            batch = TokenArray()
+    emit(batch.finish(lexer, data), True)
+
+
+class StreamingLexer(ReplayLexer):
+    """``ReplayLexer`` que va pidiendo lotes a un productor a medida que los consume.
+
+    ``next_batch()`` retorna (lote, es_el_ultimo); ``close()`` avisa al
+    productor que no hacen falta más lotes (el parseo terminó o se cortó).
+    """
+
+    def __init__(self, next_batch: Callable[[], Tuple[TokenArray, bool]], close: Callable[[], None]) -> None:
+        self._next_batch = next_batch
+        self._close = close
+        self._last = False
+        super().__init__(TokenArray())
+
+    def input(self, data: str) -> None:
+        # El largo se comprobó al crear la tubería; los lotes no lo conocen
+        self.lexdata = data
+        self.lexpos = 0
+        self.lineno = 1
+        self._index = 0
+        self._next_error = 0
+
+    def token(self):
+        while True:
+            tok = ReplayLexer.token(self)
+            if tok is not None or self._last:
+                return tok
+            self.tokens, self._last = self._next_batch()
+            self._index = self._next_error = 0
+
+    def close(self) -> None:
+        self._close()
+
+
+class _ThreadProducer:
+    """Tokeniza en un hilo del mismo proceso (un hilo por parseo)."""
+
+    def __init__(self, data: str, batch_size: int) -> None:
+        self._queue: queue.Queue = queue.Queue(RING_SLOTS)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(data, batch_size), name="lexer-tuberia", daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, data: str, batch_size: int) -> None:
+        try:
+            lex_batches(data, lambda batch, last: self._put((batch, last, None)), batch_size)
+        except BaseException as exc:
+            self._put((None, True, exc))
+
+    def next_batch(self) -> Tuple[TokenArray, bool]:
+        batch, last, exc = self._queue.get()
+        if exc is not None:
+            raise exc
+        return batch, last
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _lexer_worker(jobs, batches, cancel) -> None:
+    # Proceso hijo: atiende un código por vez hasta recibir None
+    lexer_module.get_lexer()
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        job_id, data, batch_size = job
+
+        def emit(batch: TokenArray, last: bool) -> bool:
+            if cancel.is_set():
+                batches.put((job_id, None, True, None))
+                return False
+            batches.put((job_id, batch, last, None))
+            return True
+
+        try:
+            lex_batches(data, emit, batch_size)
+        except Exception as exc:
+            batches.put((job_id, None, True, f"{type(exc).__name__}: {exc}"))
+
+
+class _LexerProcess:
+    """Proceso hijo persistente que tokeniza para la tubería (un código por vez)."""
+
+    def __init__(self) -> None:
+        from parallel_semantic import START_METHOD
+
+        context = multiprocessing.get_context(START_METHOD)
+        self._jobs = context.Queue()
+        self._batches = context.Queue(RING_SLOTS)
+        self._cancel = context.Event()
+        self._process = context.Process(
+            target=_lexer_worker, args=(self._jobs, self._batches, self._cancel),
+            name="lexer-tuberia", daemon=True,
+        )
+        self._process.start()
+        self._lock = threading.Lock()
+        self._job_id = 0
+
+    def is_alive(self) -> bool:
+        return self._process.is_alive()
+
+    def open(self, data: str, batch_size: int) -> "_ProcessStream":
+        self._lock.acquire()  # se libera en _ProcessStream.close()
+        self._job_id += 1
+        self._jobs.put((self._job_id, data, batch_size))
+        return _ProcessStream(self, self._job_id)
+
+    def receive(self, job_id: int):
+        while True:
+            try:
+                message = self._batches.get(timeout=1.0)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    raise RuntimeError("El proceso del lexer de la tubería terminó inesperadamente")
+                continue
+            if message[0] == job_id:
+                return message[1:]
+
+    def shutdown(self) -> None:
+        if self._process.is_alive():
+            self._jobs.put(None)
+            self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+
+
+class _ProcessStream:
+    """Los lotes de un código en ``_LexerProcess``; ``close()`` descarta lo que falte."""
+
+    def __init__(self, owner: _LexerProcess, job_id: int) -> None:
+        self._owner = owner
+        self._job_id = job_id
+        self._finished = False
+
+    def next_batch(self) -> Tuple[TokenArray, bool]:
+        batch, last, error = self._owner.receive(self._job_id)
+        self._finished = last
+        if error is not None:
+            raise RuntimeError(f"Error en el lexer de la tubería: {error}")
+        return batch, last
+
+    def close(self) -> None:
+        owner = self._owner
+        try:
+            if not self._finished:
+                # El parseo se cortó: el hijo deja de tokenizar y se vacía la cola
+                owner._cancel.set()
+                while not self._finished:
+                    self._finished = owner.receive(self._job_id)[1]
+                owner._cancel.clear()
+        finally:
+            owner._lock.release()
+
+
+_lexer_process: Optional[_LexerProcess] = None
+_lexer_process_lock = threading.Lock()
+
+
+def _get_lexer_process() -> _LexerProcess:
+    global _lexer_process
+    with _lexer_process_lock:
+        if _lexer_process is None or not _lexer_process.is_alive():
+            _lexer_process = _LexerProcess()
+        return _lexer_process
+
+
+def shutdown() -> None:
+    """Detiene el proceso del lexer, si se lanzó (se vuelve a lanzar al usarlo)."""
+    global _lexer_process
+    with _lexer_process_lock:
+        if _lexer_process is not None:
+            _lexer_process.shutdown()
+            _lexer_process = None
+
+
+class PipelinedTokens:
+    """Tokens de ``data`` producidos en paralelo al parseo.
+
+    Se usa como un ``TokenArray`` en ``parser._parse_timed(data, token_array)``:
+    el productor arranca recién en ``replay()``, así que un acierto de la
+    caché de parseo no tokeniza nada.
+    """
+
+    def __init__(self, data: str, mode: Optional[str] = None, batch_size: int = BATCH_SIZE) -> None:
+        mode = mode or globals()["mode"] or "proceso"
+        if mode not in MODES:
+            raise ValueError(f"Modo de tubería desconocido: {mode} (opciones: {', '.join(MODES)})")
+        self.mode = mode
+        self.data = data
+        self.batch_size = batch_size
+        self.source_length = len(data)
+
+    def replay(self) -> StreamingLexer:
+        if self.mode == "hilo":
+            producer = _ThreadProducer(self.data, self.batch_size)
+        else:
+            producer = _get_lexer_process().open(self.data, self.batch_size)
+        return StreamingLexer(producer.next_batch, producer.close)
@@ -13,20 +13,45 @@ AVANCE 3: Análisis Semántico ✅ COMPLETADO
   ✅ Mateo: Reglas de Operaciones (Null Safety, Compatibilidad, Conversiones)
 """
 
+import ply.lex as lex
 import ply.yacc as yacc
-from lexer import tokens
+from lexer import tokens, literal_value
+from symbol_table import CONST, FINAL, PARAM, Symbol, SymbolTable, name_id
 from datetime import datetime
+from time import perf_counter_ns
+from contextlib import redirect_stdout
+import io
 import os
 
 # ============================================================================
 # TABLAS SEMÁNTICAS - Avance 3 (Samir/Andrés/Mateo)
 # ============================================================================
-# Pila de tablas de símbolos para manejar el alcance (scopes). scope_stack[0] es el ámbito global.
-scope_stack = [{}] # Ámbito global inicial
+# Tabla de símbolos con la pila de ámbitos (scopes); ver symbol_table.py.
+# Su marco inferior es el ámbito global.
+symbols = SymbolTable()
 function_table = {}    # Tabla de funciones: firmas y tipos de retorno
+# Funciones y constructores de los demás archivos del proyecto (set_workspace)
+workspace_functions = {}
 loop_stack = []        # Stack de loops: validar break/continue
 semantic_errors = []   # Lista de errores semánticos
 
+# Reglas semánticas registradas: nombre -> {'kinds', 'check', 'description'}.
+# Todas se aplican en un único recorrido del AST (ver bind_symbols): cada regla
+# declara los tipos de nodo que le interesan y recibe esos nodos al salir de
+# ellos, cuando sus hijos ya están enlazados.
+SEMANTIC_RULES = {}
+
+def semantic_rule(name, *kinds, description=''):
+    """Decorador que registra una regla semántica para los tipos de nodo dados."""
+    def register(check):
+        SEMANTIC_RULES[name] = {'kinds': frozenset(kinds), 'check': check, 'description': description}
+        return check
+    return register
+
+# Métricas del último análisis: tiempos por fase (ns) y contadores
+phase_timings = {}
+semantic_stats = {'scopes_pushed': 0, 'symbol_lookups': 0, 'ast_nodes': 0, 'ast_depth': 0}
+
 # Precedencia de operadores
 precedence = (
     ('left', 'PLUS', 'MINUS'),
@@ -38,32 +63,100 @@ precedence = (
 # ============================================================================
 
 def push_scope():
-    """Abre un nuevo ámbito (nuevo diccionario) y lo añade a la pila."""
-    scope_stack.append({})
+    """Abre un nuevo ámbito y lo añade a la pila."""
+    semantic_stats['scopes_pushed'] += 1
+    symbols.push()
     
 def pop_scope():
-    """Cierra el ámbito actual (elimina el último diccionario de la pila)."""
-    if len(scope_stack) > 1:
-        scope_stack.pop()
+    """Cierra el ámbito actual (el global nunca se cierra)."""
+    symbols.pop()
         
 def get_current_scope():
-    """Retorna la tabla de símbolos del ámbito actual."""
-    return scope_stack[-1]
+    """Retorna las variables del ámbito actual como {nombre: Symbol}."""
+    return dict(symbols.current())
+
+def _name_id(name):
+    # Las Ref del AST ya traen su nombre internado
+    return name.name_id if isinstance(name, Ref) else name_id(name)
+
+def declare_symbol(name, var_info):
+    """Registra una variable (Symbol) en el ámbito actual."""
+    symbols.declare(_name_id(name), var_info)
 
 def lookup_variable(name, local_only=False):
     """
     Busca una variable por nombre, desde el ámbito actual hacia el global.
-    Retorna el diccionario de información de la variable (tipo, inmutabilidad) o None.
-    Implementa el alcance léxico (lexical scoping).
+    Retorna el Symbol de la variable (tipo, inmutabilidad) o None.
+    Implementa el alcance léxico (lexical scoping) en O(1).
     """
-    # Recorrer la pila de ámbitos de arriba a abajo (local a global)
-    for scope in reversed(scope_stack):
-        if name in scope:
-            return scope[name] # Retorna el dict: {'type': 'int', 'is_final': True, ...}
-        # Si solo buscamos localmente, paramos tras el ámbito actual
-        if local_only:
-            break
-    return None # No encontrado
+    semantic_stats['symbol_lookups'] += 1
+    if local_only:
+        return symbols.lookup_local(_name_id(name))
+    return symbols.lookup(_name_id(name))
+
+class Ref(str):
+    """
+    Identificador en el AST. Se compara y se usa como el str del nombre;
+    bind_symbols() le asigna en 'symbol' el Symbol de la variable a la que
+    se refiere (o None si no está declarada en ese punto).
+    """
+    symbol = None
+
+    def __new__(cls, name, lineno=None):
+        ref = str.__new__(cls, name)
+        ref.lineno = lineno
+        ref.name_id = name_id(name)
+        return ref
+
+    def __reduce__(self):
+        # Entre procesos viaja sólo (nombre, línea): el name_id se interna de
+        # nuevo en el destino y el símbolo enlazado no se copia.
+        return (Ref, (str(self), self.lineno))
+
+class Literal:
+    """
+    Literal numérico o string en el AST. Guarda el texto del token y calcula
+    el valor (int, float o ('str', contenido)) la primera vez que se pide;
+    infer_type() toma el tipo del texto sin convertirlo. Se compara, se
+    hashea y se muestra como su valor.
+    """
+    __slots__ = ('text', '_value')
+
+    def __init__(self, text):
+        self.text = text
+
+    @property
+    def kind(self):
+        return 'STRING' if self.text[0] in '"\'' else 'NUMBER'
+
+    @property
+    def type_name(self):
+        text = self.text
+        if text[0] in '"\'':
+            return 'String'
+        return 'double' if '.' in text else 'int'
+
+    @property
+    def value(self):
+        try:
+            return self._value
+        except AttributeError:
+            value = self._value = literal_value(self.kind, self.text)
+            return value
+
+    def __eq__(self, other):
+        if isinstance(other, Literal):
+            return self.value == other.value
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return repr(self.value)
+
+    def __reduce__(self):
+        return (Literal, (self.text,))
 
 # ============================================================================
 # INICIO APORTE: Mateo Mayorga (bironmanusa)
@@ -72,7 +165,10 @@ def lookup_variable(name, local_only=False):
 
 # ---------------- REGLA DE PROGRAMA PRINCIPAL ----------------
 def p_program(p):
-    '''program : statement_list'''
+    '''program : statement_list
+               | statement_list error'''
+    # Con 'error', el archivo terminó mientras se descartaban tokens de una
+    # sentencia dañada: se conserva lo parseado hasta ahí.
     p[0] = ('program', p[1])
 
 # ---------------- LISTA DE SENTENCIAS ----------------
@@ -82,8 +178,12 @@ def p_statement_list(p):
                       | empty'''
     if len(p) == 2:
         p[0] = [p[1]] if p[1] else []
+    elif p[2] is None:
+        p[0] = p[1]  # sentencia descartada por la recuperación de errores
     else:
-        p[0] = p[1] + [p[2]]
+        # La lista es de esta reducción: agregar en su lugar (concatenar es cuadrático)
+        p[1].append(p[2])
+        p[0] = p[1]
 
 # ---------------- SENTENCIA ----------------
 def p_statement(p):
@@ -105,16 +205,26 @@ def p_statement(p):
                  '''
     p[0] = p[1]
 
+# Recuperación de errores en modo pánico (ver p_error): PLY descarta los
+# tokens desde el inesperado hasta un ';' (fin de la sentencia dañada) o
+# hasta la '}' que cierra el bloque (block_end), y el parseo sigue desde ahí.
+def p_statement_error(p):
+    '''statement : error SEMICOLON'''
+    p[0] = None
+
+def p_block_end(p):
+    '''block_end : RBRACE
+                 | error RBRACE'''
+    # Cierre de bloque o de cuerpo de función; con 'error' la última
+    # sentencia estaba dañada y se descartó hasta la llave.
+
 # ---------------- Manejo de i++ y i-- ----------------
 def p_increment_statement(p):
     '''increment_statement : ID INCREMENT SEMICOLON
                            | ID DECREMENT SEMICOLON'''
-    # Se guarda como una asignación especial o una operación unaria
-    p[0] = ('increment', p[1], p[2])
-    # Validación semántica rápida: verificar que ID existe
-    var_info = lookup_variable(p[1])
-    if not var_info:
-        semantic_errors.append(f"Línea {p.lineno(1)}: Variable '{p[1]}' no declarada para incremento/decremento.")
+    # Se guarda como una asignación especial o una operación unaria.
+    # La existencia de ID se valida en bind_symbols().
+    p[0] = ('increment', Ref(p[1], p.lineno(1)), p[2])
 
 # ---------------- DECLARACIÓN DE VARIABLES ----------------
 def p_variable_declaration(p):
@@ -125,34 +235,21 @@ def p_variable_declaration(p):
                             | FINAL tipo ID ASSIGN expression SEMICOLON
                             | tipo ID ASSIGN expression SEMICOLON
                             | tipo ID SEMICOLON'''
-    
+    # AST: ('var_decl', tipo_o_palabra_clave, nombre, inicializador, modificador)
+    # El registro en la tabla de símbolos lo hace bind_symbols() (register_variable).
+
     # Caso 1: const int x = 1; (7 tokens contando p[0])
     if len(p) == 7:
-        p[0] = ('var_decl', p[2], p[3], p[5]) 
-        # Detectamos si el primer token era const o final
-        es_const = (p[1] == 'const')
-        es_final = (p[1] == 'final')
-        try:
-            # Enviamos los flags forzados
-            register_variable(p[3], p[2], p[5], p.lineno(3), force_const=es_const, force_final=es_final)
-        except:
-            pass
+        # El primer token (const o final) se guarda como modificador
+        p[0] = ('var_decl', p[2], Ref(p[3], p.lineno(3)), p[5], p[1])
 
     # Caso 2: var x = 1; o const x = 1; (6 tokens)
     elif len(p) == 6:
-        p[0] = ('var_decl', p[1], p[2], p[4])
-        try:
-            register_variable(p[2], p[1], p[4], p.lineno(2))
-        except Exception:
-            register_variable(p[2], p[1], p[4])
-            
+        p[0] = ('var_decl', p[1], Ref(p[2], p.lineno(2)), p[4], None)
+
     # Caso 3: int x; (4 tokens)
     else: 
-        p[0] = ('var_decl', p[1], p[2], None)
-        try:
-            register_variable(p[2], p[1], None, p.lineno(2))
-        except Exception:
-            register_variable(p[2], p[1], None)
+        p[0] = ('var_decl', p[1], Ref(p[2], p.lineno(2)), None, None)
 # ---------------- ASIGNACIÓN ----------------
 def p_assignment(p):
     '''assignment : ID ASSIGN expression SEMICOLON
@@ -161,12 +258,8 @@ def p_assignment(p):
                   | ID TIMESEQUAL expression SEMICOLON
                   | ID DIVIDEEQUAL expression SEMICOLON
                   | ID MODULOEQUAL expression SEMICOLON'''
-    p[0] = ('assign', p[1], p[3])
-    try:
-        # Uso de validate_assignment (Mateo/Andrés/Samir)
-        validate_assignment(p[1], p[3], p.lineno(1))
-    except Exception:
-        validate_assignment(p[1], p[3])
+    # validate_assignment (Mateo/Andrés/Samir) se aplica en bind_symbols()
+    p[0] = ('assign', Ref(p[1], p.lineno(1)), p[3])
 
 # ---------------- EXPRESIONES ----------------
 def p_expression(p):
@@ -184,8 +277,10 @@ def p_expression(p):
                   | LPAREN expression RPAREN'''
     if len(p) == 2 and isinstance(p[1], str) and p.slice[1].type == 'ID':
         # NO validar existencia aquí (PLY bottom-up causa falsos positivos)
-        # La validación se hace post-parsing en validate_semantic_rules()
-        p[0] = p[1]
+        # El símbolo se resuelve post-parsing en bind_symbols()
+        p[0] = Ref(p[1], p.lineno(1))
+    elif len(p) == 2 and p.slice[1].type in ('NUMBER', 'STRING'):
+        p[0] = Literal(p[1])
     elif len(p) == 4 and p[1] == '(':
         p[0] = p[2]
     else:
@@ -228,14 +323,15 @@ def p_list_elements(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 # ---------------- MAPAS ----------------
 def p_map_literal(p):
     '''map_literal : LBRACE map_entries RBRACE 
                    | LBRACE RBRACE'''
     if len(p) == 3:
-        p[0] = (map, {})
+        p[0] = ('map', {})
     else:
         p[0] = ('map', dict(p[2]))
 
@@ -245,23 +341,18 @@ def p_map_entries(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_map_entry(p):
     '''map_entry : STRING COLON expression'''
-    p[0] = (p[1], p[3])
+    p[0] = (Literal(p[1]), p[3])
 
 # ---------------- CLASES BÁSICAS ----------------
 def p_class_declaration(p):
     '''class_declaration : CLASS ID LBRACE class_members RBRACE'''
-    
-    # 1. Gestión de Ámbito de la Clase (propiedades y métodos)
-    push_scope() # Empieza el ámbito de la clase
-    
-    # 2. class_members [p[4]] se procesan dentro del nuevo ámbito
+    # bind_symbols() abre el ámbito de la clase (propiedades y métodos)
     p[0] = ('class', p[2], p[4])
-    
-    pop_scope() # Cierra el ámbito de la clase
 
 def p_class_members(p):
     '''class_members : class_member
@@ -270,7 +361,8 @@ def p_class_members(p):
     if len(p) == 2:
         p[0] = [p[1]] if p[1] else []
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 def p_class_member(p):
     '''class_member : variable_declaration
@@ -293,7 +385,8 @@ def p_argument_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 # ---------------- VACÍO ----------------
 def p_empty(p):
@@ -309,7 +402,7 @@ def is_numeric_type(t):
 
 def get_base_type(var_info):
     """Extrae el tipo base (string) de la información de la variable."""
-    return var_info['type'] if isinstance(var_info, dict) else var_info
+    return var_info.type if isinstance(var_info, Symbol) else var_info
 
 def can_implicitly_convert(from_t, to_t):
     """Reglas de conversión implícita:
@@ -338,9 +431,9 @@ def infer_type(node):
         return 'int'
     if isinstance(node, float):
         return 'double'
-    # Literales string ahora se representan como tupla ('str', valor)
-    if isinstance(node, tuple) and len(node) == 2 and node[0] == 'str':
-        return 'String'
+    # Literales del código: el tipo sale del texto del token
+    if type(node) is Literal:
+        return node.type_name
     if isinstance(node, list):
         return 'List'
     if isinstance(node, dict):
@@ -384,9 +477,9 @@ def infer_type(node):
         # return, var_decl, assign, etc -> no inf
         return 'unknown'
 
-    # identificadores: nombre de variable (cadenas simples)
+    # identificadores: Ref ya enlazada por bind_symbols() o nombre simple
     if isinstance(node, str):
-        var_info = lookup_variable(node)
+        var_info = node.symbol if isinstance(node, Ref) else lookup_variable(node)
         # Si encuentra la variable, devuelve el tipo base. Si no, devuelve 'unknown'.
         if var_info:
             return get_base_type(var_info)
@@ -405,15 +498,13 @@ def register_variable(name, declared_token, init_expr, lineno=None, force_final=
     """
     Registrar variable en el ámbito actual y validar compatibilidad inicial e inmutabilidad.
     """
-    current_scope = get_current_scope()
-
     # Determinar si es inmutable (Corrección: combina token con flags forzados)
     is_final = (declared_token == 'final') or force_final
     is_const = (declared_token == 'const') or force_const
     is_keyword = declared_token in ('var', 'const', 'final')
     
     # Validar RE-DECLARACIÓN LOCAL (Alcance)
-    if name in current_scope:
+    if lookup_variable(name, local_only=True) is not None:
         semantic_errors.append(f"Línea {lineno}: Error semántico: Variable '{name}' ya declarada en este ámbito.")
         return # No registrar si ya existe en el ámbito local
 
@@ -432,13 +523,9 @@ def register_variable(name, declared_token, init_expr, lineno=None, force_final=
         # Declarado con tipo explícito (ej: 'int')
         t = declared_token
 
-    # Estructura de registro unificada
-    var_info = {
-        'type': t,
-        'is_final': is_final,
-        'is_const': is_const
-    }
-    current_scope[name] = var_info
+    # Estructura de registro unificada (banderas en bits)
+    flags = (FINAL if is_final else 0) | (CONST if is_const else 0)
+    declare_symbol(name, Symbol(_name_id(name), t, flags, lineno))
 
     # 3. Validación de compatibilidad inicial
     if init_expr is not None and not is_keyword:
@@ -467,7 +554,7 @@ def validate_assignment(target_name, expr_node, lineno=None):
         return # Sale si no existe
 
     # 2. Validación de INMUTABILIDAD (Regla de Dart - Andrés)
-    if var_info.get('is_final') or var_info.get('is_const'):
+    if var_info.flags & (FINAL | CONST):
         semantic_errors.append(f"Línea {lineno}: Error semántico: No se puede asignar a la variable inmutable '{target_name}'.")
         return # Sale si es inmutable
 
@@ -504,79 +591,253 @@ def validate_assignment(target_name, expr_node, lineno=None):
     if not can_implicitly_convert(expr_t, declared_type): # Usar declared_type
         semantic_errors.append(f"Línea {lineno}: Asignación incompatible: '{expr_t}' no se convierte implícitamente a '{declared_type}' en '{target_name}'")
 
-def validate_binary_operations(tree):
-    """Recorre el AST y valida operaciones binarias respecto a tipos y null-safety."""
-    if tree is None:
-        return
-    if isinstance(tree, list):
-        for item in tree:
-            validate_binary_operations(item)
+@semantic_rule('operaciones_binarias', 'binop',
+               description="Tipos y null-safety de operadores aritméticos, lógicos y comparaciones")
+def check_binary_operation(tree):
+    """Valida un nodo ('binop', op, izq, der, línea) respecto a tipos y null-safety."""
+    op = tree[1]
+    left = tree[2]
+    right = tree[3]
+    lt = infer_type(left)
+    rt = infer_type(right)
+    lineno = None
+    if len(tree) > 4:
+        lineno = tree[4]
+    
+    # Si no se pudo inferir algún tipo, no validar (evitar falsos positivos)
+    if lt == 'unknown' or rt == 'unknown':
         return
-    if not isinstance(tree, tuple) or len(tree) == 0:
-        return
-    node_type = tree[0]
-    if node_type == 'binop':
-        op = tree[1]
-        left = tree[2]
-        right = tree[3]
-        lt = infer_type(left)
-        rt = infer_type(right)
-        lineno = None
-        if len(tree) > 4:
-            lineno = tree[4]
-        
-        # Si no se pudo inferir algún tipo, no validar (evitar falsos positivos)
-        if lt == 'unknown' or rt == 'unknown':
-            # Recursión y salir
-            for child in tree[1:]:
-                validate_binary_operations(child)
-            return
-        
-        # Null safety: si alguno es Null y op no es '??' o comparación, alertar
-        if ('Null' in (lt, rt)) and op not in ('??', '==', '!='):
-            if lineno:
-                semantic_errors.append(f"Línea {lineno}: Operación '{op}' con valor null sin comprobación")
-            else:
-                semantic_errors.append(f"Operación '{op}' con valor null sin comprobación")
-        # Operadores aritméticos
-        if op in ('+', '-', '*', '/', '%', '~/'):
-            if not (is_numeric_type(lt) and is_numeric_type(rt)):
-                # permitir concatenación String + String
-                if not (op == '+' and lt == 'String' and rt == 'String'):
-                    if lineno:
-                        semantic_errors.append(f"Línea {lineno}: Operador aritmético '{op}' requiere operandos numéricos (encontrado '{lt}', '{rt}')")
-                    else:
-                        semantic_errors.append(f"Operador aritmético '{op}' requiere operandos numéricos (encontrado '{lt}', '{rt}')")
-        # Operadores lógicos
-        if op in ('&&', '||'):
-            if lt != 'bool' or rt != 'bool':
-                if lineno:
-                    semantic_errors.append(f"Línea {lineno}: Operador lógico '{op}' requiere operandos booleanos (encontrado '{lt}', '{rt}')")
-                else:
-                    semantic_errors.append(f"Operador lógico '{op}' requiere operandos booleanos (encontrado '{lt}', '{rt}')")
-        # Comparaciones: permitir entre tipos comparables
-        if op in ('==', '!=', '<', '>', '<=', '>='):
-            if lt != rt and not (is_numeric_type(lt) and is_numeric_type(rt)):
+    
+    # Null safety: si alguno es Null y op no es '??' o comparación, alertar
+    if ('Null' in (lt, rt)) and op not in ('??', '==', '!='):
+        if lineno:
+            semantic_errors.append(f"Línea {lineno}: Operación '{op}' con valor null sin comprobación")
+        else:
+            semantic_errors.append(f"Operación '{op}' con valor null sin comprobación")
+    # Operadores aritméticos
+    if op in ('+', '-', '*', '/', '%', '~/'):
+        if not (is_numeric_type(lt) and is_numeric_type(rt)):
+            # permitir concatenación String + String
+            if not (op == '+' and lt == 'String' and rt == 'String'):
                 if lineno:
-                    semantic_errors.append(f"Línea {lineno}: Comparación '{op}' entre tipos incompatibles ('{lt}', '{rt}')")
+                    semantic_errors.append(f"Línea {lineno}: Operador aritmético '{op}' requiere operandos numéricos (encontrado '{lt}', '{rt}')")
                 else:
-                    semantic_errors.append(f"Comparación '{op}' entre tipos incompatibles ('{lt}', '{rt}')")
+                    semantic_errors.append(f"Operador aritmético '{op}' requiere operandos numéricos (encontrado '{lt}', '{rt}')")
+    # Operadores lógicos
+    if op in ('&&', '||'):
+        if lt != 'bool' or rt != 'bool':
+            if lineno:
+                semantic_errors.append(f"Línea {lineno}: Operador lógico '{op}' requiere operandos booleanos (encontrado '{lt}', '{rt}')")
+            else:
+                semantic_errors.append(f"Operador lógico '{op}' requiere operandos booleanos (encontrado '{lt}', '{rt}')")
+    # Comparaciones: permitir entre tipos comparables
+    if op in ('==', '!=', '<', '>', '<=', '>='):
+        if lt != rt and not (is_numeric_type(lt) and is_numeric_type(rt)):
+            if lineno:
+                semantic_errors.append(f"Línea {lineno}: Comparación '{op}' entre tipos incompatibles ('{lt}', '{rt}')")
+            else:
+                semantic_errors.append(f"Comparación '{op}' entre tipos incompatibles ('{lt}', '{rt}')")
+
 
-    # Recursión en hijos
-    for child in tree[1:]:
-        validate_binary_operations(child)
+# ============================================================================
+# PASADA DE ENLACE (BINDING) Y REGLAS: un solo recorrido del AST terminado
+# ============================================================================
+# PLY reduce de abajo hacia arriba: cuando se reduce un bloque o una función,
+# sus sentencias ya se redujeron, así que abrir el ámbito en la acción llega
+# tarde. Esta pasada recorre el AST de arriba hacia abajo en orden de código,
+# abre y cierra los ámbitos en el punto correcto, registra las declaraciones
+# (register_variable) y asigna a cada Ref el símbolo visible en ese punto.
+# Al salir de cada nodo aplica las reglas de SEMANTIC_RULES habilitadas para
+# su tipo, que leen ref.symbol (infer_type) sin volver a buscar.
+
+_active_rules = {}   # tipo de nodo -> funciones de las reglas habilitadas
+_loop_depth = 0      # bucles que encierran al nodo actual (break/continue)
+
+def _timed_rule(name, check):
+    # Acumula el tiempo de la regla en phase_timings['regla:<nombre>'] (incluido en semantic_pass)
+    key = f'regla:{name}'
+    def timed(node):
+        start = perf_counter_ns()
+        check(node)
+        phase_timings[key] = phase_timings.get(key, 0) + perf_counter_ns() - start
+    return timed
+
+def rule_dispatch(rules=None):
+    """Tabla tipo de nodo -> reglas; ``rules`` es un iterable de nombres (None = todas)."""
+    if rules is None:
+        rules = SEMANTIC_RULES
+    dispatch = {}
+    for name in rules:
+        rule = SEMANTIC_RULES.get(name)
+        if rule is None:
+            raise ValueError(f"Regla semántica desconocida: {name}")
+        check = _timed_rule(name, rule['check'])
+        for kind in rule['kinds']:
+            dispatch.setdefault(kind, []).append(check)
+    return dispatch
+
+def bind_symbols(tree, rules=()):
+    """Enlaza todos los identificadores del AST y aplica las reglas indicadas."""
+    global _active_rules, _loop_depth
+    _active_rules = rule_dispatch(rules)
+    _loop_depth = 0
+    _bind(tree)
+
+def _bind(node):
+    if isinstance(node, Ref):
+        node.symbol = lookup_variable(node)
+        return
+    if isinstance(node, list):
+        for item in node:
+            _bind(item)
+        return
+    if isinstance(node, dict):  # entradas de un mapa literal
+        for value in node.values():
+            _bind(value)
+        return
+    if not isinstance(node, tuple) or len(node) == 0:
+        return
+    binder = _BINDERS.get(node[0])
+    if binder:
+        binder(node)
+    else:
+        for child in node[1:]:
+            _bind(child)
+    checks = _active_rules.get(node[0])
+    if checks:
+        for check in checks:
+            check(node)
+
+def _bind_scoped(children):
+    push_scope()
+    for child in children:
+        _bind(child)
+    pop_scope()
+
+def _bind_params(params):
+    for tag, param_type, param_name in params:
+        lineno = getattr(param_name, 'lineno', None)
+        if lookup_variable(param_name, local_only=True) is not None:
+            semantic_errors.append(f"Línea {lineno}: Error semántico: Parámetro '{param_name}' ya declarado en esta función.")
+        else:
+            # Los parámetros de Dart son implícitamente final
+            declare_symbol(param_name, Symbol(_name_id(param_name), param_type, FINAL | PARAM, lineno))
+        if isinstance(param_name, Ref):
+            param_name.symbol = lookup_variable(param_name, local_only=True)
+
+def _bind_var_decl(node):
+    # ('var_decl', tipo_o_palabra_clave, nombre, inicializador, modificador)
+    declared, name, init_expr, modifier = node[1], node[2], node[3], node[4]
+    _bind(init_expr)  # el inicializador ve los símbolos previos a la declaración
+    register_variable(name, declared, init_expr, getattr(name, 'lineno', None),
+                      force_final=(modifier == 'final'), force_const=(modifier == 'const'))
+    if isinstance(name, Ref):
+        name.symbol = lookup_variable(name, local_only=True)
+
+def _bind_loop(children):
+    global _loop_depth
+    _loop_depth += 1
+    for child in children:
+        _bind(child)
+    _loop_depth -= 1
+
+def _bind_function(node):
+    # ('function', tipo, nombre, params, cuerpo) / ('function_void', nombre, params, cuerpo)
+    params, body = node[-2], node[-1]
+    _check_deadline()
+    push_scope()
+    _bind_params(params)
+    _bind(body)
+    pop_scope()
 
+def _bind_arrow_function(node):
+    # ('arrow_function', tipo, nombre, params, expresión)
+    push_scope()
+    _bind_params(node[3])
+    _bind(node[4])
+    pop_scope()
+
+def _bind_for_in(node):
+    # ('for_in', iterador, iterable, cuerpo)
+    global _loop_depth
+    iterator, iterable, body = node[1], node[2], node[3]
+    _bind(iterable)
+    _loop_depth += 1
+    push_scope()
+    if iterator and iterator[0] == 'iterator_decl':
+        name = iterator[2]
+        register_variable(name, iterator[1], None, getattr(name, 'lineno', None))
+        if isinstance(name, Ref):
+            name.symbol = lookup_variable(name, local_only=True)
+    else:
+        _bind(iterator)
+    _bind(body)
+    pop_scope()
+    _loop_depth -= 1
 
-def validate_semantic_rules(tree):
+def _bind_for(node):
+    # ('for', init, condición, actualización, cuerpo): la variable del for vive en su propio ámbito
+    push_scope()
+    _bind_loop(node[1:])
+    pop_scope()
+
+_BINDERS = {
+    'var_decl': _bind_var_decl,
+    'function': _bind_function,
+    'function_void': _bind_function,
+    'arrow_function': _bind_arrow_function,
+    'class': lambda node: _bind_scoped(node[2:]),
+    'block': lambda node: _bind_scoped(node[1:]),
+    'for': _bind_for,
+    'for_in': _bind_for_in,
+    'while': lambda node: _bind_loop(node[1:]),
+    'do_while': lambda node: _bind_loop(node[1:]),
+}
+
+@semantic_rule('asignaciones', 'assign',
+               description="Existencia, inmutabilidad y compatibilidad de tipos en asignaciones")
+def check_assignment(node):
+    # ('assign', destino, expresión)
+    target = node[1]
+    validate_assignment(target, node[2], getattr(target, 'lineno', None))
+
+@semantic_rule('incrementos', 'increment', description="Variable declarada en ++/--")
+def check_increment(node):
+    # ('increment', destino, operador)
+    target = node[1]
+    if lookup_variable(target) is None:
+        semantic_errors.append(f"Línea {getattr(target, 'lineno', None)}: Variable '{target}' no declarada para incremento/decremento.")
+
+def validate_semantic_rules(tree, rules=None, workers=None):
     """
-    Recorrido Post-Parse: Solo para validaciones que requieren el AST completo 
-    (como break/continue y operaciones binarias), NO para registro de símbolos.
+    Recorrido Post-Parse: enlace de símbolos y todas las reglas semánticas
+    habilitadas (break/continue, operaciones binarias, retornos, ...) en una
+    sola pasada. ``rules`` limita las reglas a esos nombres (None = todas).
+    Con ``workers`` > 1 los cuerpos de las funciones de nivel superior se
+    validan en un pool de procesos (ver parallel_semantic.py) cuando el
+    programa es lo bastante grande; los diagnósticos salen en el mismo orden.
     """
-    # 1) Validar break/continue (ya existente)
-    validate_break_continue(tree, in_loop=False)
-    
-    # 2) Validar operaciones binarias y null-safety
-    validate_binary_operations(tree)
+    # Llamadas a otros archivos del proyecto; lo declarado aquí tiene prioridad
+    for name, signature in workspace_functions.items():
+        function_table.setdefault(name, signature)
+    try:
+        if workers is not None and workers > 1:
+            import parallel_semantic
+            if parallel_semantic.validate_parallel(tree, rules, workers):
+                return
+        start = perf_counter_ns()
+        bind_symbols(tree, rules)
+        phase_timings['semantic_pass'] = perf_counter_ns() - start
+    except AnalysisLimitExceeded as exc:
+        _report_limit(exc, semantic_errors)
+    except RecursionError:
+        # Respaldo si el AST no pasó por _check_tree_limits (p. ej. parse_source)
+        _report_limit(AnalysisLimitExceeded('max_depth', limits['max_depth']), semantic_errors)
+    finally:
+        max_errors = limits['max_errors']
+        if max_errors is not None and len(semantic_errors) > max_errors:
+            del semantic_errors[max_errors:]
+            semantic_errors.append(f"{AnalysisLimitExceeded('max_errors', max_errors)}; no se reportan los siguientes")
     
     # IMPORTANTE: Se elimina la función walk_and_validate
     # que causaba la doble registración de variables.
@@ -593,7 +854,7 @@ def validate_semantic_rules(tree):
 
 # Sentencia compuesta o simple (ayuda a aceptar bloques con o sin llaves).
 def p_block_or_statement(p):
-    '''block_or_statement : LBRACE statement_list RBRACE
+    '''block_or_statement : LBRACE statement_list block_end
                           | statement'''
     # Esta regla solo normaliza el AST; el manejo de ámbito se hace en las estructuras de control.
     if len(p) == 4:
@@ -607,7 +868,7 @@ def p_if_statement(p):
                     | IF LPAREN expression RPAREN statement_block ELSE statement_block
                     | IF LPAREN expression RPAREN statement_block else_if_list'''
     
-    # El statement_block (p[5]) ya maneja el push/pop scope internamente.
+    # El statement_block (p[5]) abre su ámbito en bind_symbols().
     
     # Caso simple: if (cond) stmt
     if len(p) == 6:
@@ -638,15 +899,12 @@ def p_else_if_list(p):
 
 # Regla de bloque con gestión de ámbito
 def p_statement_block(p):
-    '''statement_block : LBRACE statement_list RBRACE
+    '''statement_block : LBRACE statement_list block_end
                        | statement'''
     
     if len(p) == 4:
-        # Si tiene llaves, se crea un ámbito explícito para el bloque.
-        push_scope()
-        result = ('block', p[2])
-        pop_scope()
-        p[0] = result
+        # Si tiene llaves, bind_symbols() crea un ámbito explícito para el bloque.
+        p[0] = ('block', p[2])
     else:
         # Si es una sola sentencia, el ámbito es el del padre (no se necesita push/pop).
         p[0] = p[1]
@@ -655,20 +913,22 @@ def p_statement_block(p):
 # ---------------- WHILE ----------------
 def p_while_statement(p):
     '''while_statement : WHILE LPAREN expression RPAREN statement_block'''
-    # El statement_block (p[5]) ya maneja el push/pop scope internamente.
+    # El statement_block (p[5]) abre su ámbito en bind_symbols().
     p[0] = ('while', p[3], p[5])
 
 # ---------------- DO-WHILE ----------------
 def p_do_while_statement(p):
-    '''do_while_statement : DO statement_block WHILE LPAREN expression RPAREN SEMICOLON'''
-    # El statement_block (p[2]) ya maneja el push/pop scope internamente.
-    p[0] = ('do_while', p[2], p[5])
+    '''do_while_statement : DO statement_block WHILE LPAREN expression RPAREN SEMICOLON
+                          | DO statement_block error'''
+    # El statement_block (p[2]) abre su ámbito en bind_symbols().
+    # Con 'error', faltó o está dañado el 'while (...);' final: sin condición.
+    p[0] = ('do_while', p[2], p[5] if len(p) == 8 else None)
 
 # ---------------- FOR (tradicional) ----------------
 # Para la parte de inicialización permitimos variable_declaration, assignment o empty.
 def p_for_statement(p):
     '''for_statement : FOR LPAREN for_init SEMICOLON for_condition SEMICOLON for_update RPAREN statement_block'''
-    # El statement_block (p[9]) ya maneja el push/pop scope internamente.
+    # El statement_block (p[9]) abre su ámbito en bind_symbols().
     p[0] = ('for', p[3], p[5], p[7], p[9])
 
 def p_for_init(p):
@@ -695,11 +955,11 @@ def p_variable_declaration_no_semicolon(p):
                                          | FINAL ID ASSIGN expression
                                          | tipo ID ASSIGN expression
                                          | tipo ID'''
+    # Nota: bind_symbols() registra estas variables en el ámbito del for.
     if len(p) == 5:
-        p[0] = ('var_decl', p[1], p[2], p[4])
-        # Nota: Estas variables se registran en el ámbito actual de la función/bloque.
+        p[0] = ('var_decl', p[1], Ref(p[2], p.lineno(2)), p[4], None)
     else:
-        p[0] = ('var_decl', p[1], p[2], None)
+        p[0] = ('var_decl', p[1], Ref(p[2], p.lineno(2)), None, None)
 
 def p_assignment_no_semicolon(p):
     '''assignment_no_semicolon : ID ASSIGN expression
@@ -710,11 +970,11 @@ def p_assignment_no_semicolon(p):
                                | ID MODULOEQUAL expression'''
     # Addaantayo iti 4 nga elemento: ID, OP, EXPR
     # Ngem iti PLY, p[2] ti operator.
-    p[0] = ('assign', p[1], p[3])
+    p[0] = ('assign', Ref(p[1], p.lineno(1)), p[3])
 # ---------------- FOR-IN (for each) ----------------
 def p_for_in_statement(p):
     '''for_in_statement : FOR LPAREN for_in_iterator IN expression RPAREN statement_block'''
-    # El statement_block (p[7]) ya maneja el push/pop scope internamente.
+    # El statement_block (p[7]) abre su ámbito en bind_symbols().
     p[0] = ('for_in', p[3], p[5], p[7])
 
 #iterador del for-in (iterator)
@@ -722,9 +982,9 @@ def p_for_in_iterator(p):
     '''for_in_iterator : VAR ID
                        | ID''' # ID aquí asume que ID puede ser un tipo de dato
     if len(p) == 3:
-        p[0] = ('iterator_decl', p[1], p[2])
+        p[0] = ('iterator_decl', p[1], Ref(p[2], p.lineno(2)))
     else:
-        p[0] = ('iterator_id', p[1])
+        p[0] = ('iterator_id', Ref(p[1], p.lineno(1)))
 
 # ---------------- BREAK / CONTINUE ----------------
 def p_break_statement(p):
@@ -857,73 +1117,37 @@ def has_return_in_elif_chain(elif_chain):
     
     return False
 
-def validate_break_continue(tree, in_loop=False):
-    """
-    Valida que break/continue solo aparezcan dentro de bucles (Samir - Regla 2.2)
-    
-    Se ejecuta DESPUÉS del parsing porque:
-    - PLY usa parsing bottom-up (reduce primero las hojas, luego los padres)
-    - Intentar usar loop_stack durante el parsing causa falsos positivos
-    - Esta función recorre el árbol de arriba hacia abajo
-    
-    Parámetros:
-    - tree: Árbol sintáctico (tupla o lista) generado por el parser
-    - in_loop: Flag que indica si estamos dentro de un bucle
-    """
-    # Si es None o vacío, terminar
-    if tree is None:
-        return
-    
-    # Si es una lista (statement_list), recorrer cada elemento
-    if isinstance(tree, list):
-        for item in tree:
-            validate_break_continue(item, in_loop)
-        return
-    
-    # Si no es tupla, no hay nada que validar
-    if not isinstance(tree, tuple) or len(tree) == 0:
-        return
-    
-    node_type = tree[0]
-    
-    # Si encontramos un bucle, activamos el flag para sus hijos
-    if node_type in ('while', 'for', 'do_while', 'for_in'):
-        # while: ('while', condition, body)
-        # for: ('for', init, condition, update, body)
-        # do-while: ('do-while', body, condition)
-        # for-in: ('for-in', variable, iterable, body)
-        
-        # Recorrer TODOS los hijos CON in_loop=True
-        for child in tree[1:]:
-            validate_break_continue(child, in_loop=True)
-    
-    # Si encontramos break/continue, verificamos si estamos en bucle
-    elif node_type == 'break':
-        lineno = tree[1] if len(tree) > 1 else None
-        if not in_loop:
-            if lineno is not None:
-                semantic_errors.append(f"Línea {lineno}: Error semántico: 'break' fuera de bucle")
-            else:
-                semantic_errors.append("Error semántico: 'break' fuera de bucle")
-    
-    elif node_type == 'continue':
-        lineno = tree[1] if len(tree) > 1 else None
-        if not in_loop:
-            if lineno is not None:
-                semantic_errors.append(f"Línea {lineno}: Error semántico: 'continue' fuera de bucle")
-            else:
-                semantic_errors.append("Error semántico: 'continue' fuera de bucle")
-    
-    # Para cualquier otro nodo, seguir recorriendo CON el mismo flag
+def report_outside_loop(tree):
+    """Reporta un nodo ('break'|'continue', línea) que aparece fuera de bucle."""
+    keyword = tree[0]
+    lineno = tree[1] if len(tree) > 1 else None
+    if lineno is not None:
+        semantic_errors.append(f"Línea {lineno}: Error semántico: '{keyword}' fuera de bucle")
     else:
-        for child in tree[1:]:
-            validate_break_continue(child, in_loop)
+        semantic_errors.append(f"Error semántico: '{keyword}' fuera de bucle")
+
+# ========== REGLAS PARA EL RECORRIDO ÚNICO (ver SEMANTIC_RULES) ==========
+
+@semantic_rule('break_continue', 'break', 'continue', description="break/continue sólo dentro de bucles (Regla 2.2)")
+def check_break_continue(node):
+    # bind_symbols() lleva la cuenta de los bucles que encierran al nodo
+    if _loop_depth == 0:
+        report_outside_loop(node)
+
+@semantic_rule('retornos', 'function', description="Funciones con tipo retornan en todos los caminos (Regla 1)")
+def check_return_paths(node):
+    # ('function', tipo, nombre, params, cuerpo); void y arrow functions no aplican
+    func_type, func_name, body = node[1], node[2], node[4]
+    if func_type != 'VOID' and not has_return_in_all_paths(body):
+        semantic_errors.append(
+            f"Línea {getattr(func_name, 'lineno', None)}: Función '{func_name}' debe retornar '{func_type}' en todos los caminos"
+        )
 
 # ========== 1. DECLARACIÓN DE FUNCIONES (Gestión de Alcance) ==========
 
 # Función con tipo de retorno y parámetros
 def p_function_with_params(p):
-    '''function_declaration : tipo ID LPAREN parameters RPAREN LBRACE statement_list RBRACE'''
+    '''function_declaration : tipo ID LPAREN parameters RPAREN LBRACE statement_list block_end'''
     # SINTÁCTICO: Reconocer estructura
     func_type = p[1]
     func_name = p[2]
@@ -932,33 +1156,19 @@ def p_function_with_params(p):
     # ========== SEMÁNTICA: Guardar función en tabla ANTES de procesar el cuerpo ==========
     function_params_list = []
     for tag, param_type, param_name in params: 
-        function_params_list.append((param_type, param_name))
+        function_params_list.append((param_type, str(param_name)))
     function_table[func_name] = {'type': func_type, 'params': function_params_list}
     # ========== FIN REGISTRO PREVIO ==========
     
-    # 1. Entrar a nuevo ámbito para la función (Alcance)
-    push_scope()
-    
-    # 2. Registrar los parámetros en el nuevo ámbito (Scope)
-    for tag, param_type, param_name in params: 
-        # Los parámetros de Dart son implícitamente final
-        get_current_scope()[param_name] = {'type': param_type, 'is_final': True, 'is_const': False}
-    
-    # 3. Procesar el cuerpo (statement_list se procesa DENTRO del scope con parámetros)
+    # El ámbito de la función y sus parámetros los registra bind_symbols()
     body = p[7]
     
-    # ========== SEMÁNTICA: Validar retornos (Samir - Regla 1) ==========
-    # Validar que la función tenga return
-    if func_type != 'VOID' and not has_return_in_all_paths(body):
-        semantic_errors.append(f"Línea {p.lineno(2)}: Función '{func_name}' debe retornar '{func_type}' en todos los caminos")
-    # ========== FIN SEMÁNTICA ==========
-    
-    pop_scope() # Cierra el ámbito de la función
-    p[0] = ('function', func_type, func_name, params, body)
+    # SEMÁNTICA: los retornos (Samir - Regla 1) los valida la regla 'retornos'
+    p[0] = ('function', func_type, Ref(func_name, p.lineno(2)), params, body)
 
 # Función con tipo de retorno sin parámetros
 def p_function_no_params(p):
-    '''function_declaration : tipo ID LPAREN RPAREN LBRACE statement_list RBRACE'''
+    '''function_declaration : tipo ID LPAREN RPAREN LBRACE statement_list block_end'''
     # SINTÁCTICO: Reconocer estructura
     func_type = p[1]
     func_name = p[2]
@@ -967,23 +1177,14 @@ def p_function_no_params(p):
     function_table[func_name] = {'type': func_type, 'params': []}
     # ========== FIN REGISTRO PREVIO ==========
 
-    push_scope() # Abre el ámbito de la función
-
     body = p[6]
     
-    # ========== SEMÁNTICA: Validar retornos (Samir - Regla 1) ==========
-    if not has_return_in_all_paths(body):
-        semantic_errors.append(
-            f"Línea {p.lineno(2)}: Función '{func_name}' debe retornar '{func_type}' en todos los caminos"
-        )
-    # ========== FIN SEMÁNTICA ==========
-    
-    pop_scope() # Cierra el ámbito de la función
-    p[0] = ('function', func_type, func_name, [], body)
+    # SEMÁNTICA: los retornos (Samir - Regla 1) los valida la regla 'retornos'
+    p[0] = ('function', func_type, Ref(func_name, p.lineno(2)), [], body)
 
 # Función void con parámetros
 def p_function_void_params(p):
-    '''function_declaration : VOID ID LPAREN parameters RPAREN LBRACE statement_list RBRACE'''
+    '''function_declaration : VOID ID LPAREN parameters RPAREN LBRACE statement_list block_end'''
     # SINTÁCTICO: Reconocer estructura
     func_name = p[2]
     params = p[4]
@@ -991,26 +1192,19 @@ def p_function_void_params(p):
     # ========== SEMÁNTICA: Guardar función en tabla ANTES de procesar el cuerpo ==========
     function_params_list = []
     for tag, param_type, param_name in params: 
-        function_params_list.append((param_type, param_name))
+        function_params_list.append((param_type, str(param_name)))
     function_table[func_name] = {'type': 'void', 'params': function_params_list}
     # ========== FIN REGISTRO PREVIO ==========
     
-    push_scope() # Abre el ámbito de la función
-
-    # Registrar los parámetros en el nuevo ámbito (Scope)
-    for tag, param_type, param_name in params: 
-        # Los parámetros de Dart son implícitamente final
-        get_current_scope()[param_name] = {'type': param_type, 'is_final': True, 'is_const': False}
-        
+    # El ámbito de la función y sus parámetros los registra bind_symbols()
     body = p[7]
     # Void no requiere return, está OK
     
-    pop_scope() # Cierra el ámbito de la función
     p[0] = ('function_void', func_name, params, p[7])
 
 # Función void sin parámetros
 def p_function_void_no_params(p):
-    '''function_declaration : VOID ID LPAREN RPAREN LBRACE statement_list RBRACE'''
+    '''function_declaration : VOID ID LPAREN RPAREN LBRACE statement_list block_end'''
     # SINTÁCTICO: Reconocer estructura
     func_name = p[2]
     
@@ -1018,13 +1212,10 @@ def p_function_void_no_params(p):
     function_table[func_name] = {'type': 'void', 'params': []}
     # ========== FIN REGISTRO PREVIO ==========
     
-    push_scope() # Abre el ámbito de la función
-    
     # Procesar cuerpo
     body = p[6]
     # Void no requiere return, está OK
     
-    pop_scope() # Cierra el ámbito de la función
     p[0] = ('function_void', func_name, [], body)
 
 # Arrow function con parámetros
@@ -1038,7 +1229,7 @@ def p_arrow_function_params(p):
     function_params_list = []
     for tag, param_type, param_name in params: 
         # No se necesita push/pop scope aquí porque las arrow functions no crean un bloque de alcance local para variables internas
-        function_params_list.append((param_type, param_name))
+        function_params_list.append((param_type, str(param_name)))
         
     function_table[func_name] = {'type': p[1], 'params': function_params_list}
     p[0] = ('arrow_function', p[1], func_name, p[4], p[7])
@@ -1058,13 +1249,19 @@ def p_parameters_multiple(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
+
+def p_parameters_error(p):
+    '''parameters : error'''
+    # Parámetro mal formado: se descarta hasta la ',' o el ')' siguiente
+    p[0] = []
 
 # Parámetro individual
 def p_parameter(p):
     '''parameter : tipo ID'''
     # El valor reducido aquí es la tupla de 3 elementos: ('param', tipo, ID)
-    p[0] = ('param', p[1], p[2])
+    p[0] = ('param', p[1], Ref(p[2], p.lineno(2)))
 
 # Tipo de dato
 def p_tipo(p):
@@ -1117,18 +1314,232 @@ def p_input_read(p):
 # Manejo de errores
 syntax_errors = []
 
-def p_error(p):
-    global syntax_errors
-    if p:
-        error_msg = f"Error sintáctico en línea {p.lineno}: Token inesperado '{p.value}' (tipo: {p.type})"
-        syntax_errors.append(error_msg)
-        print(error_msg)
-        parser.errok()
-    else:
-        error_msg = "Error sintáctico: Final de archivo inesperado"
+# Errores sintácticos reportados por archivo; pasado el límite se sigue
+# recuperando (para conservar el AST) pero sin reportar ni imprimir nada.
+MAX_SYNTAX_ERRORS = 50
+EOF_ERROR = "Error sintáctico: Final de archivo inesperado"
+
+def _report_syntax_error(error_msg):
+    if len(syntax_errors) > MAX_SYNTAX_ERRORS:
+        return
+    syntax_errors.append(error_msg)
+    print(error_msg)
+    if len(syntax_errors) == MAX_SYNTAX_ERRORS:
+        error_msg = f"Se alcanzó el límite de {MAX_SYNTAX_ERRORS} errores sintácticos; no se reportan los siguientes"
         syntax_errors.append(error_msg)
         print(error_msg)
 
+# ---------------- LÍMITES POR ANÁLISIS ----------------
+# Una entrada hostil (megabytes de código, listas gigantes, anidamiento
+# profundo, millones de caracteres ilegales) no debe colgar ni tumbar el
+# proceso: al pasar un límite el análisis se corta con un diagnóstico.
+# Se cambian con set_limits(); None desactiva un límite.
+DEFAULT_LIMITS = {
+    'max_bytes': 16 * 1024 * 1024,  # tamaño del código (UTF-8)
+    'max_tokens': 2_000_000,
+    'max_depth': 300,               # profundidad del AST: los validadores y ast_codec son recursivos
+    'max_nodes': 5_000_000,
+    'max_seconds': 60.0,            # tiempo de cada fase (desde reset_semantic_state)
+    'max_errors': 1000,             # errores léxicos y semánticos
+}
+LIMIT_DESCRIPTIONS = {
+    'max_bytes': 'tamaño del código en bytes',
+    'max_tokens': 'cantidad de tokens',
+    'max_depth': 'profundidad del AST',
+    'max_nodes': 'nodos del AST',
+    'max_seconds': 'segundos de análisis',
+    'max_errors': 'cantidad de errores',
+}
+limits = dict(DEFAULT_LIMITS)
+_deadline = None          # perf_counter_ns() límite del análisis en curso
+_limit_exceeded = None    # mensaje del límite alcanzado en el análisis en curso
+
+class AnalysisLimitExceeded(Exception):
+    """El análisis en curso superó uno de los límites de ``limits``."""
+    def __init__(self, name, limit):
+        super().__init__(f"Límite de análisis excedido: {LIMIT_DESCRIPTIONS[name]} (máximo {limit})")
+        self.name = name
+        self.limit = limit
+
+def set_limits(**changes):
+    """Cambia los límites indicados (None = sin límite); retorna los anteriores."""
+    unknown = sorted(set(changes) - set(DEFAULT_LIMITS))
+    if unknown:
+        raise ValueError(f"Límite desconocido: {', '.join(unknown)}")
+    previous = dict(limits)
+    limits.update(changes)
+    return previous
+
+def _report_limit(exc, errors):
+    global _limit_exceeded
+    _limit_exceeded = str(exc)
+    errors.append(_limit_exceeded)
+    print(_limit_exceeded)
+
+def _check_deadline():
+    if _deadline is not None and perf_counter_ns() > _deadline:
+        raise AnalysisLimitExceeded('max_seconds', limits['max_seconds'])
+
+def _check_input_size(data):
+    max_bytes = limits['max_bytes']
+    # len() en caracteres es una cota inferior de los bytes: codificar sólo si hace falta
+    if max_bytes is not None and (len(data) > max_bytes or
+                                  (len(data) * 4 > max_bytes and len(data.encode('utf-8')) > max_bytes)):
+        raise AnalysisLimitExceeded('max_bytes', max_bytes)
+
+def _check_tree_limits():
+    for name, stat in (('max_nodes', 'ast_nodes'), ('max_depth', 'ast_depth')):
+        limit = limits[name]
+        if limit is not None and semantic_stats[stat] > limit:
+            raise AnalysisLimitExceeded(name, limit)
+
+def _report_eof_error():
+    if EOF_ERROR not in syntax_errors[-2:]:
+        _report_syntax_error(EOF_ERROR)
+
+def _report_unexpected_token(tok):
+    value = literal_value(tok.type, tok.value)
+    _report_syntax_error(f"Error sintáctico en línea {tok.lineno}: Token inesperado '{value}' (tipo: {tok.type})")
+
+def p_error(p):
+    """
+    Sólo reporta: la recuperación la hacen las producciones con 'error'
+    (statement, block_end, parameters, do_while_statement, program), que
+    descartan tokens hasta ';', '}', ',' o ')' según dónde ocurrió el error.
+    PLY no vuelve a llamar a p_error hasta haber desplazado 3 tokens tras la
+    recuperación, así un token inesperado no genera una cascada de errores.
+    """
+    if not p:
+        _report_eof_error()
+    elif not getattr(p, 'synthetic', False):  # los de _balanced_tokens ya se reportaron
+        _report_unexpected_token(p)
+
+_OPENERS = ('LBRACE', 'LPAREN', 'LBRACKET')
+_CLOSERS = ('RBRACE', 'block_end', 'RPAREN', 'RBRACKET')
+
+def _open_nesting(seen):
+    """
+    (llaves, agrupadores) abiertos en la pila del parser: las '{' sin cerrar
+    (la '}' final puede estar desplazada y aún sin reducir) y todos los '{',
+    '(' y '[' sin cerrar, es decir, el anidamiento en curso.
+
+    ``seen`` guarda, por posición de la pila, el símbolo y las cuentas hasta
+    él y se reutiliza entre llamadas del mismo parseo: la pila sólo cambia en
+    el tope (desplazamientos, reducciones y lo que descarta la recuperación),
+    así que se descarta lo que ya no está y sólo se recorre lo nuevo.
+    """
+    stack = parser.symstack
+    valid = min(len(seen), len(stack))
+    while valid and seen[valid - 1][0] is not stack[valid - 1]:
+        valid -= 1
+    del seen[valid:]
+    blocks, depth = seen[-1][1] if seen else (0, 0)
+    for sym in stack[valid:]:
+        if sym.type in _OPENERS:
+            depth += 1
+            blocks += sym.type == 'LBRACE'
+        elif sym.type in _CLOSERS:
+            depth -= 1
+            blocks -= sym.type in ('RBRACE', 'block_end')
+        seen.append((sym, (blocks, depth)))
+    return blocks, depth
+
+def _accepts_eof():
+    """
+    Si el fin de archivo completaría el programa desde el estado actual.
+    Simula las reducciones sobre una copia de la pila: por la fusión de
+    estados LALR una reducción con $end no garantiza que se llegue a aceptar.
+    """
+    stack = list(parser.statestack)
+    while True:
+        action = parser.action[stack[-1]].get('$end')
+        if action is None or action > 0:
+            return False
+        if action == 0:
+            return True
+        production = parser.productions[-action]
+        if production.len:
+            del stack[-production.len:]
+        stack.append(parser.goto[stack[-1]][production.name])
+
+def _balanced_tokens(lexer):
+    """
+    tokenfunc para parser.parse() que mantiene las llaves en equilibrio con
+    la pila del parser:
+
+    - una '}' sin '{' abierta se reporta y se descarta antes de llegar al
+      parser; si no, la recuperación la toma por el final de una sentencia
+      dañada y descarta todo hasta el próximo ';', incluida la cabecera de
+      la función siguiente.
+    - al agotarse la entrada, mientras el estado actual no acepte el fin de
+      archivo, entrega '}' sintéticas para los bloques abiertos y ';' para
+      la sentencia a medias. PLY abandona el parseo (retorna None) si un
+      error llega con el fin de archivo como siguiente token; así un bloque
+      sin cerrar se reporta una vez y se conserva el resto del AST.
+
+    También aplica los límites de tokens, errores léxicos, tiempo y
+    anidamiento (``limits``): al superarlos lanza AnalysisLimitExceeded. El
+    anidamiento se controla con cada '{', '(' o '[' que llega al parser, así
+    una entrada demasiado profunda se corta antes de terminar de parsearla.
+    """
+    budget = None
+    count = 0
+    max_tokens = limits['max_tokens']
+    max_depth = limits['max_depth']
+    max_errors = limits['max_errors']
+    report_error = lexer.lexerrorf
+
+    def counted_error(t):
+        # PLY llama a lexerrorf por cada carácter ilegal dentro de un solo token()
+        nonlocal max_errors
+        max_errors -= 1
+        if max_errors < 0:
+            raise AnalysisLimitExceeded('max_errors', limits['max_errors'])
+        if not max_errors & 0xFFF:
+            _check_deadline()
+        return report_error(t)
+
+    if max_errors is not None and report_error is not None:
+        lexer.lexerrorf = counted_error
+
+    stack_seen = []  # cuentas de _open_nesting para este parseo
+
+    def token():
+        nonlocal budget, count
+        tok = lexer.token()
+        while tok is not None and tok.type == 'RBRACE' and _open_nesting(stack_seen)[0] <= 0:
+            _report_unexpected_token(tok)
+            tok = lexer.token()
+        if tok is not None:
+            count += 1
+            if max_tokens is not None and count > max_tokens:
+                raise AnalysisLimitExceeded('max_tokens', max_tokens)
+            if not count & 0x3FF:
+                _check_deadline()
+            if max_depth is not None and tok.type in _OPENERS and _open_nesting(stack_seen)[1] >= max_depth:
+                raise AnalysisLimitExceeded('max_depth', max_depth)
+            return tok
+        if _accepts_eof():
+            return None
+        open_blocks = _open_nesting(stack_seen)[0]
+        if budget is None:
+            _report_eof_error()
+            # Cada token cierra algo o lo consume la recuperación; el tope evita ciclos
+            budget = 2 * max(open_blocks, 0) + 2
+        if budget == 0:
+            return None
+        budget -= 1
+        closer = lex.LexToken()
+        if open_blocks > 0 and parser.symstack[-1].type != 'error':
+            closer.type, closer.value = 'RBRACE', '}'
+        else:
+            closer.type, closer.value = 'SEMICOLON', ';'  # termina la sentencia a medias
+        closer.lineno, closer.lexpos = lexer.lineno, lexer.lexpos
+        closer.synthetic = True
+        return closer
+
+    return token
+
 # Construcción del parser
 parser = None
 
@@ -1137,27 +1548,208 @@ def build_parser():
     parser = yacc.yacc(debug=False)
     return parser
 
-def analyze_syntax(filename, git_user):
-    global syntax_errors, semantic_errors, scope_stack, function_table
+def get_parser():
+    """Retorna el parser LALR construido una sola vez por proceso."""
+    if parser is None:
+        build_parser()
+    return parser
+
+def reset_semantic_state(functions=None, global_scope=None):
+    """
+    Reinicia errores y tablas antes de un nuevo análisis.
+    Opcionalmente siembra funciones y variables globales conocidas de antemano
+    (lo usa el diagnóstico en vivo al analizar un fragmento del archivo); las
+    declaraciones globales propias se obtienen con symbols.snapshot().
+    """
+    global syntax_errors, semantic_errors, symbols, function_table, _deadline, _limit_exceeded
     syntax_errors = []
     semantic_errors = []
-    scope_stack = [{}]  # Reiniciar scope global
-    function_table = {}  # Limpiar tabla de funciones
+    # Las globales sembradas ({name_id: Symbol}) quedan como base exterior
+    # compartida: el fragmento puede volver a declarar las suyas sin que se
+    # reporte redeclaración, y sembrar no copia nada.
+    symbols = SymbolTable(global_scope)
+    function_table = dict(functions or {})    # Limpiar tabla de funciones
+    phase_timings.clear()
+    for key in semantic_stats:
+        semantic_stats[key] = 0
+    # El tiempo de cada análisis (max_seconds) cuenta desde aquí
+    max_seconds = limits['max_seconds']
+    _deadline = None if max_seconds is None else perf_counter_ns() + int(max_seconds * 1e9)
+    _limit_exceeded = None
+
+def set_workspace(functions=None, classes=()):
+    """
+    Publica para la fase semántica las funciones y clases de los demás
+    archivos del proyecto (ver workspace_index.py). Cada clase se registra
+    como su constructor: la llamada ``Persona()`` es de tipo 'Persona'.
+    """
+    global workspace_functions
+    workspace_functions = {name: {'type': name, 'params': []} for name in classes}
+    workspace_functions.update(functions or {})
+
+def count_ast_nodes(tree):
+    """Cuenta los nodos (tuplas) del AST sin recursión."""
+    count = 0
+    pending = [tree]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, tuple):
+            count += 1
+            pending.extend(node[1:])
+        elif isinstance(node, list):
+            pending.extend(node)
+    return count
+
+def ast_shape(tree):
+    """(nodos, profundidad) del AST sin recursión; cuenta igual que count_ast_nodes."""
+    count = depth = 0
+    pending = [(tree, 0)]
+    while pending:
+        node, level = pending.pop()
+        if isinstance(node, tuple):
+            count += 1
+            level += 1
+            if level > depth:
+                depth = level
+            pending.extend((child, level) for child in node[1:])
+        elif isinstance(node, list):
+            pending.extend((child, level) for child in node)
+    return count, depth
+
+def format_metrics_lines():
+    """Líneas de texto con los tiempos y contadores del último análisis."""
+    lines = []
+    for phase, elapsed in phase_timings.items():
+        lines.append(f" {phase:<28} {elapsed / 1e6:>10.3f} ms")
+    for counter, value in semantic_stats.items():
+        lines.append(f" {counter:<28} {value:>10}")
+    return lines
+
+def _parse_timed(data, token_array=None):
+    """
+    Construye (o reutiliza) lexer y parser y parsea registrando cada fase.
+    Si el mismo código ya se parseó con esta gramática, lo recupera de la
+    caché persistente (parse_cache.py) sin tokenizar ni parsear. Con
+    ``token_array`` (un token_stream.TokenArray de ``data``) el parser los
+    consume sin volver a tokenizar.
+    Con un límite superado (ver ``limits``) reporta el diagnóstico, retorna
+    None y no guarda nada en la caché.
+    """
+    global syntax_errors, semantic_errors, function_table
+    import parse_cache
+    try:
+        _check_input_size(data)
+    except AnalysisLimitExceeded as exc:
+        _report_limit(exc, syntax_errors)
+        return None
+    start = perf_counter_ns()
+    cached = parse_cache.load(data)
+    if cached is not None:
+        result, syntax_errors, semantic_errors, function_table, ast_nodes, ast_depth, output = cached
+        print(output, end='')  # mensajes del lexer y de p_error, como en el parseo original
+        semantic_stats['ast_nodes'] = ast_nodes
+        semantic_stats['ast_depth'] = ast_depth
+        phase_timings['parse_cache_hit'] = perf_counter_ns() - start
+        return _within_tree_limits(result)
+
+    with redirect_stdout(io.StringIO()) as output:
+        result = _within_tree_limits(_parse_uncached(data, token_array))
+    print(output.getvalue(), end='')
+    if _limit_exceeded is not None:
+        return result  # depende de los límites, no sólo del código: no se guarda
+
+    start = perf_counter_ns()
+    parse_cache.store(data, result, syntax_errors, semantic_errors, function_table,
+                      semantic_stats['ast_nodes'], semantic_stats['ast_depth'], output.getvalue())
+    if parse_cache.is_enabled():
+        phase_timings['parse_cache_store'] = perf_counter_ns() - start
+    return result
+
+def _parse_uncached(data, token_array=None):
+    # Tokenización + parseo reales (sin caché); con tokens ya reconocidos, sólo parseo
+    from lexer import get_lexer
+    import parse_pipeline
+    if token_array is not None and token_array.source_length != len(data):
+        token_array = None  # de otro texto (p. ej. '\r\n' convertidos al leer el archivo)
+    if token_array is None and parse_pipeline.enabled_for(data):
+        token_array = parse_pipeline.PipelinedTokens(data)
+    start = perf_counter_ns()
+    parser_obj = get_parser()
+    phase_timings['parser_build'] = perf_counter_ns() - start
+
+    start = perf_counter_ns()
+    lexer = get_lexer() if token_array is None else token_array.replay()
+    phase_timings['lexer_build' if token_array is None else 'token_replay'] = perf_counter_ns() - start
+
+    # PLY pide los tokens bajo demanda: el tiempo de parseo incluye la tokenización
+    start = perf_counter_ns()
+    try:
+        result = _run_parse(parser_obj, data, lexer)
+    finally:
+        if token_array is not None:
+            lexer.close()  # en la tubería, detiene al productor si el parseo se cortó
+    phase_timings['parse'] = perf_counter_ns() - start
+
+    semantic_stats['ast_nodes'], semantic_stats['ast_depth'] = ast_shape(result)
+    return result
+
+def _run_parse(parser_obj, data, lexer):
+    """parser.parse() con _balanced_tokens; un límite superado se reporta y retorna None."""
+    try:
+        return parser_obj.parse(data, lexer=lexer, tokenfunc=_balanced_tokens(lexer))
+    except AnalysisLimitExceeded as exc:
+        _report_limit(exc, syntax_errors)
+        return None
+
+def _within_tree_limits(tree):
+    """El AST, o None (con diagnóstico) si supera max_nodes o max_depth."""
+    if tree is None:
+        return None
+    try:
+        _check_tree_limits()
+    except AnalysisLimitExceeded as exc:
+        _report_limit(exc, syntax_errors)
+        return None
+    return tree
+
+def _write_log(log_filename, log, encoding):
+    """Escribe el log ya renderizado y anexa el tiempo de escritura."""
+    start = perf_counter_ns()
+    with open(log_filename, 'w', encoding=encoding) as out:
+        out.write(log.getvalue())
+    phase_timings['log_io'] = perf_counter_ns() - start
+    with open(log_filename, 'a', encoding='utf-8') as out:
+        out.write(f" {'log_io':<28} {phase_timings['log_io'] / 1e6:>10.3f} ms\n")
+
+def parse_source(data, lexer=None):
+    """
+    Parsea código ya cargado en memoria con el lexer/parser en caché.
+    ``lexer`` puede ser cualquier fuente de tokens con la interfaz de PLY,
+    p. ej. ``token_stream.ReplayLexer`` sobre tokens ya reconocidos.
+    """
+    from lexer import get_lexer
+    if lexer is None:
+        lexer = get_lexer()
+    try:
+        _check_input_size(data)
+    except AnalysisLimitExceeded as exc:
+        _report_limit(exc, syntax_errors)
+        return None
+    return _run_parse(get_parser(), data, lexer)
+
+def analyze_syntax(filename, git_user, token_array=None):
+    reset_semantic_state()
     
     with open(filename, 'r', encoding='utf-8') as f:
         data = f.read()
     
-    from lexer import build_lexer
-    lexer = build_lexer()
-    parser_obj = build_parser()
-    
     print(f"\n{'='*70}")
     print("  ANALIZADOR SINTÁCTICO - DART - TokenMasters")
     print(f"{'='*70}")
     print(f"Archivo: {filename}")
     print(f"Usuario: {git_user}")
     
-    result = parser_obj.parse(data, lexer=lexer)
+    result = _parse_timed(data, token_array)
     
     now = datetime.now()
     timestamp = now.strftime("%d-%m-%Y-%Hh%M")
@@ -1165,7 +1757,8 @@ def analyze_syntax(filename, git_user):
     
     os.makedirs('logs', exist_ok=True)
     
-    with open(log_filename, 'w', encoding='utf-8') as log:
+    start = perf_counter_ns()
+    with io.StringIO() as log:
         log.write("=" * 80 + "\n")
         log.write("  ANÁLISIS SINTÁCTICO - DART\n")
         log.write("  Proyecto: TokenMasters\n")
@@ -1184,38 +1777,38 @@ def analyze_syntax(filename, git_user):
             log.write("=" * 80 + "\n")
             log.write("  ✓ ANÁLISIS EXITOSO - SIN ERRORES\n")
             log.write("=" * 80 + "\n")
+        
+        log.write("\n" + "=" * 80 + "\n")
+        log.write("  TIEMPOS Y CONTADORES\n")
+        log.write("=" * 80 + "\n\n")
+        phase_timings['log_render'] = perf_counter_ns() - start
+        for line in format_metrics_lines():
+            log.write(line + "\n")
+        _write_log(log_filename, log, 'utf-8')
     
     print(f"\nErrores: {len(syntax_errors)}")
     print(f"Log: {log_filename}")
     print(f"{'='*70}\n")
 
 
-def analyze_semantic(filename, git_user):
-    global syntax_errors, semantic_errors, scope_stack, function_table
-    syntax_errors = []
-    semantic_errors = []
-    scope_stack = [{}]  # Reiniciar scope global
-    function_table = {}  # Limpiar tabla de funciones
+def analyze_semantic(filename, git_user, rules=None, workers=None, token_array=None):
+    reset_semantic_state()
     
     with open(filename, 'r', encoding='utf-8') as f:
         data = f.read()
     
-    from lexer import build_lexer
-    lexer = build_lexer()
-    parser_obj = build_parser()
-    
     print(f"\n{'='*70}")
     print("  ANALIZADOR SEMÁNTICO - DART - TokenMasters")
     print(f"{'='*70}")
     print(f"Archivo: {filename}")
     print(f"Usuario: {git_user}")
     
-    result = parser_obj.parse(data, lexer=lexer)
+    result = _parse_timed(data, token_array)
     
     # ========== SEMÁNTICA: Validaciones post-parse (null-safety, operaciones, conversiones) ==========
     # Ejecutar validaciones semánticas completas que recorren el árbol
     if result is not None:
-        validate_semantic_rules(result)
+        validate_semantic_rules(result, rules, workers)
     
     now = datetime.now()
     timestamp = now.strftime("%d%m%Y-%Hh%M")
@@ -1223,7 +1816,8 @@ def analyze_semantic(filename, git_user):
     
     os.makedirs('logs', exist_ok=True)
     
-    with open(log_filename, 'w', encoding='utf-8-sig') as log:
+    start = perf_counter_ns()
+    with io.StringIO() as log:
         log.write("=" * 80 + "\n")
         log.write("  ANÁLISIS SEMÁNTICO - DART\n")
         log.write("  Proyecto: TokenMasters\n")
@@ -1242,6 +1836,14 @@ def analyze_semantic(filename, git_user):
             log.write("=" * 80 + "\n")
             log.write("  ✓ ANÁLISIS EXITOSO - SIN ERRORES\n")
             log.write("=" * 80 + "\n")
+        
+        log.write("\n" + "=" * 80 + "\n")
+        log.write("  TIEMPOS Y CONTADORES\n")
+        log.write("=" * 80 + "\n\n")
+        phase_timings['log_render'] = perf_counter_ns() - start
+        for line in format_metrics_lines():
+            log.write(line + "\n")
+        _write_log(log_filename, log, 'utf-8-sig')
     
     print(f"\nErrores semánticos: {len(semantic_errors)}")
     print(f"Log: {log_filename}")
@@ -1249,6 +1851,31 @@ def analyze_semantic(filename, git_user):
 
 def main():
     import sys
+    if '--sin-cache' in sys.argv:
+        # Forzar tokenización y parseo aunque el archivo esté en la caché
+        import parse_cache
+        parse_cache.set_enabled(False)
+        sys.argv.remove('--sin-cache')
+    if '--tuberia' in sys.argv:
+        # Tokenizar en paralelo al parseo (hilo o proceso) en archivos grandes
+        import parse_pipeline
+        position = sys.argv.index('--tuberia')
+        mode = sys.argv[position + 1] if position + 1 < len(sys.argv) else 'proceso'
+        del sys.argv[position:position + 2]
+        parse_pipeline.set_mode(mode)
+    if '--proyecto' in sys.argv:
+        # Funciones y clases de los demás .dart de la carpeta (índice en .cache/workspace)
+        import workspace_index
+        position = sys.argv.index('--proyecto')
+        root = sys.argv[position + 1] if position + 1 < len(sys.argv) else '.'
+        del sys.argv[position:position + 2]
+        index = workspace_index.open_index(root, os.cpu_count())
+        if len(sys.argv) >= 2:
+            set_workspace(index.functions(exclude=sys.argv[1]), index.classes(exclude=sys.argv[1]))
+    if len(sys.argv) >= 3 and sys.argv[1] == '--watch':
+        # Vigilar una carpeta y volver a analizar sólo los archivos que cambian
+        import watch_mode
+        sys.exit(watch_mode.main(sys.argv[2:]))
     if len(sys.argv) >= 3:
         # Verificar qué tipo de análisis se solicita
         if len(sys.argv) >= 4:
@@ -1270,8 +1897,15 @@ def main():
         print("  Sintáctico: python parser.py <archivo.dart> <usuario-git>")
         print("  Semántico:  python parser.py <archivo.dart> <usuario-git> --semantico")
         print("  Ambos:      python parser.py <archivo.dart> <usuario-git> --ambos")
+        print("  Sin caché de parseo: agregar --sin-cache")
+        print("  Con funciones de otros archivos: agregar --proyecto <carpeta>")
+        print("  Lexer y parser en paralelo (archivos grandes): agregar --tuberia hilo|proceso")
+        print("  Vigilar:    python parser.py --watch <carpeta> [--intervalo S]")
         print("\nEjecutando análisis sintáctico por defecto...")
         analyze_syntax("algoritmos_prueba/algoritmo_samir.dart", "Sam-24-dev")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Como script este archivo es __main__; usar el módulo "parser" que importan
+    # parse_cache, ast_codec y parallel_semantic (una sola clase Ref y un solo estado)
+    import parser
+    parser.main()
\ No newline at end of file
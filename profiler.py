@@ -0,0 +1,217 @@
+"""Perfilado opcional de las acciones gramaticales y reglas semánticas.
+
+Con el perfilado activo, cada acción ``p_*`` del parser, cada regla de
+``parser.SEMANTIC_RULES`` (como ``regla:<nombre>``) y cada helper semántico
+de ``parser.py`` (ver ``SEMANTIC_HELPERS``) se envuelven con un contador de
+llamadas y tiempo acumulado. Desactivado, se restauran los
+objetos originales: no queda ningún envoltorio ni comprobación en el
+camino caliente.
+
+- En las producciones se reemplaza ``MiniProduction.callable`` del parser
+  en caché (PLY invoca ``p.callable(pslice)`` en cada reducción).
+- En las reglas se reemplaza la función registrada; el recorrido toma la
+  tabla de reglas al iniciar cada análisis.
+- En los helpers se reemplaza el atributo del módulo ``parser``; las
+  llamadas internas (``infer_type`` recursivo, ``validate_semantic_rules``)
+  resuelven el nombre global en cada llamada y pasan por el envoltorio.
+- La caché de parseo (``parse_cache``) se desactiva mientras tanto: un
+  acierto no ejecutaría ninguna acción gramatical.
+
+Además del total por función se acumula el tiempo propio por pila de
+llamadas, que se exporta en formato "collapsed stack" (una línea
+``raiz;hijo;nieto <microsegundos>``) compatible con flamegraph.pl o
+speedscope.
+
+Uso:
+    python profiler.py <archivo.dart> <usuario-git>
+"""
+
+from __future__ import annotations
+
+import functools
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional
+
+import parse_cache
+import parser as parser_module
+
+
+# Helpers semánticos de parser.py que se instrumentan
+SEMANTIC_HELPERS = (
+    "bind_symbols",
+    "register_variable",
+    "validate_assignment",
+    "infer_type",
+    "has_return_in_all_paths",
+)
+
+# Raíz de todas las pilas exportadas
+ROOT_FRAME = "analisis"
+
+_lock = threading.Lock()
+_enabled = False
+# Estado de la caché de parseo antes de enable(): un acierto no ejecutaría las acciones
+_cache_was_enabled = True
+# producción, nombre de helper o ("regla", nombre) -> función original
+_originals: Dict[object, Callable] = {}
+
+# nombre -> [llamadas, tiempo total ns, tiempo propio ns]
+_stats: Dict[str, List[int]] = {}
+# "raiz;a;b" -> tiempo propio ns
+_collapsed: Dict[str, int] = {}
+# Pila activa: [nombre, ns consumidos por hijos]
+_stack: List[list] = []
+
+
+def _wrap(name: str, func: Callable) -> Callable:
+    @functools.wraps(func)
+    def profiled(*args, **kwargs):
+        frame = [name, 0]
+        _stack.append(frame)
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_counter_ns() - start
+            _stack.pop()
+            own = elapsed - frame[1]
+            if _stack:
+                _stack[-1][1] += elapsed
+
+            entry = _stats.get(name)
+            if entry is None:
+                entry = _stats[name] = [0, 0, 0]
+            entry[0] += 1
+            # Las llamadas recursivas ya están contadas en el total del ancestro
+            if not any(outer[0] == name for outer in _stack):
+                entry[1] += elapsed
+            entry[2] += own
+
+            path = ";".join([ROOT_FRAME] + [outer[0] for outer in _stack] + [name])
+            _collapsed[path] = _collapsed.get(path, 0) + own
+
+    return profiled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable() -> None:
+    """Instala los envoltorios (idempotente). Construye el parser si hace falta."""
+    global _enabled, _cache_was_enabled
+    with _lock:
+        if _enabled:
+            return
+        _cache_was_enabled = parse_cache.set_enabled(False)
+        for production in parser_module.get_parser().productions:
+            func = production.callable
+            if func is None:
+                continue
+            _originals[production] = func
+            production.callable = _wrap(production.func, func)
+        for name, rule in parser_module.SEMANTIC_RULES.items():
+            _originals[("regla", name)] = rule["check"]
+            rule["check"] = _wrap(f"regla:{name}", rule["check"])
+        for name in SEMANTIC_HELPERS:
+            func = getattr(parser_module, name)
+            _originals[name] = func
+            setattr(parser_module, name, _wrap(name, func))
+        _enabled = True
+
+
+def disable() -> None:
+    """Restaura las funciones originales; las estadísticas se conservan."""
+    global _enabled
+    with _lock:
+        if not _enabled:
+            return
+        for target, func in _originals.items():
+            if isinstance(target, str):
+                setattr(parser_module, target, func)
+            elif isinstance(target, tuple):
+                parser_module.SEMANTIC_RULES[target[1]]["check"] = func
+            else:
+                target.callable = func
+        _originals.clear()
+        parse_cache.set_enabled(_cache_was_enabled)
+        _enabled = False
+
+
+def reset() -> None:
+    """Descarta las estadísticas acumuladas (p. ej. al iniciar una corrida)."""
+    _stats.clear()
+    _collapsed.clear()
+    del _stack[:]
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    """Estadísticas por función: llamadas y tiempos total/propio en ms."""
+    return {
+        name: {"calls": calls, "total_ms": total / 1e6, "self_ms": own / 1e6}
+        for name, (calls, total, own) in _stats.items()
+    }
+
+
+def format_profile_lines(limit: Optional[int] = 25) -> List[str]:
+    """Tabla de las funciones con más tiempo propio."""
+    ordered = sorted(_stats.items(), key=lambda item: item[1][2], reverse=True)
+    if limit is not None:
+        ordered = ordered[:limit]
+    lines = [f" {'FUNCIÓN':<36} {'LLAMADAS':>10} {'TOTAL ms':>12} {'PROPIO ms':>12}"]
+    for name, (calls, total, own) in ordered:
+        lines.append(f" {name:<36} {calls:>10} {total / 1e6:>12.3f} {own / 1e6:>12.3f}")
+    return lines
+
+
+def collapsed_stacks() -> List[str]:
+    """Líneas "pila valor" con el tiempo propio en microsegundos."""
+    return [
+        f"{path} {max(1, own // 1000)}"
+        for path, own in sorted(_collapsed.items())
+    ]
+
+
+def write_collapsed(path) -> Path:
+    """Escribe las pilas acumuladas en ``path`` (formato collapsed stack)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as out:
+        for line in collapsed_stacks():
+            out.write(line + "\n")
+    return path
+
+
+def collapsed_filename(git_user: str, log_dir) -> Path:
+    timestamp = datetime.now().strftime("%d-%m-%Y-%Hh%M")
+    return Path(log_dir) / f"perfil-{git_user}-{timestamp}.folded"
+
+
+def main() -> None:
+    if len(sys.argv) < 3:
+        print("Uso: python profiler.py <archivo.dart> <usuario-git>")
+        return
+
+    import analyzer_service
+
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        code = f.read()
+
+    enable()
+    try:
+        result = analyzer_service.run_full_analysis(code, sys.argv[2])
+    finally:
+        disable()
+
+    print("\n".join(format_profile_lines()))
+    print(f"\nPerfil: {result.profile_path}")
+
+
+if __name__ == "__main__":
+    # Como script este archivo es __main__; usar el módulo que importa analyzer_service
+    import profiler
+    profiler.main()
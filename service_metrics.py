@@ -0,0 +1,283 @@
+"""Métricas opcionales del servicio de análisis en formato de texto de Prometheus.
+
+Cuando el analizador corre como servicio compartido (``analysis_daemon.py``)
+este registro cuenta:
+
+- ``tokenmasters_analyses_total{phase}``: análisis por fase (``lexico``,
+  ``sintactico``, ``semantico``) y análisis completos (``completo``);
+- ``tokenmasters_tokens_total``: tokens reconocidos;
+- ``tokenmasters_errors_total{phase,code}``: errores por fase y tipo
+  (``code`` sale de ``error_code``);
+- ``tokenmasters_phase_duration_seconds{phase}``: histograma de latencia
+  (suma de los tiempos que ya mide cada fase, sin relojes extra);
+- ``tokenmasters_input_bytes``: histograma del tamaño del código analizado;
+- ``tokenmasters_cache_requests_total{cache,result}`` y
+  ``tokenmasters_cache_hit_ratio{cache}``: caché de parseo (``parse``), de
+  respuestas del daemon (``daemon``) y deduplicación de lotes (``lote``).
+
+Desactivado (por defecto) cada punto de registro cuesta una comprobación de
+un booleano. Activo, se registra una vez por fase, nunca por token, con un
+lock corto. El registro es por proceso: los análisis que corren en un pool
+(``async_analysis``, ``parallel_semantic``) no se cuentan en el principal.
+
+Exposición: ``serve(puerto)`` atiende ``GET /metrics`` en localhost desde un
+hilo y ``write(ruta)`` vuelca el texto a un archivo (p. ej. para el
+"textfile collector" de node_exporter).
+
+Uso:
+    python analysis_daemon.py --metricas-puerto 9464 [--metricas-archivo RUTA]
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_enabled = False
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float], labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        # etiquetas -> [conteo por cubeta (no acumulado)..., +Inf, suma]
+        self.values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, labels: Tuple[str, ...] = ()) -> None:
+        row = self.values.get(labels)
+        if row is None:
+            row = self.values[labels] = [0] * (len(self.buckets) + 2)
+        row[bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, row in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), row):
+                cumulative += count
+                le = 'le="' + _number(float(bound)) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(row[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Métricas del proceso; todas las actualizaciones pasan por ``lock``."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.analyses = Counter("tokenmasters_analyses_total", "Análisis ejecutados por fase", ("phase",))
+        self.tokens = Counter("tokenmasters_tokens_total", "Tokens reconocidos por el lexer")
+        self.errors = Counter("tokenmasters_errors_total", "Errores reportados por fase y tipo", ("phase", "code"))
+        self.duration = Histogram(
+            "tokenmasters_phase_duration_seconds", "Duración de cada fase del análisis",
+            LATENCY_BUCKETS, ("phase",),
+        )
+        self.input_bytes = Histogram("tokenmasters_input_bytes", "Tamaño del código analizado", SIZE_BUCKETS)
+        self.cache = Counter(
+            "tokenmasters_cache_requests_total", "Consultas a las cachés por resultado", ("cache", "result")
+        )
+
+    def render(self) -> str:
+        with self.lock:
+            lines: List[str] = []
+            for metric in (self.analyses, self.tokens, self.errors, self.duration, self.input_bytes, self.cache):
+                lines.extend(metric.render())
+            lines.append("# HELP tokenmasters_cache_hit_ratio Aciertos sobre consultas de cada caché")
+            lines.append("# TYPE tokenmasters_cache_hit_ratio gauge")
+            for cache in sorted({labels[0] for labels in self.cache.values}):
+                hits = self.cache.values.get((cache, "hit"), 0)
+                total = hits + self.cache.values.get((cache, "miss"), 0)
+                ratio = hits / total if total else 0.0
+                lines.append(f'tokenmasters_cache_hit_ratio{{cache="{_escape(cache)}"}} {ratio:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def reset() -> None:
+    """Descarta todo lo registrado (el estado de activación no cambia)."""
+    global REGISTRY
+    REGISTRY = Registry()
+
+
+# ---------------- clasificación de errores ----------------
+
+# Primer patrón que coincide con la descripción -> código (etiqueta acotada)
+_ERROR_CODES = (
+    (re.compile(r"Carácter ilegal"), "caracter_ilegal"),
+    (re.compile(r"Final de archivo"), "fin_de_archivo"),
+    (re.compile(r"no se reportan"), "limite_de_errores"),
+    (re.compile(r"Límite de análisis excedido"), "limite_de_analisis"),
+    (re.compile(r"Token inesperado"), "token_inesperado"),
+    (re.compile(r"ya declarad[ao]"), "redeclaracion"),
+    (re.compile(r"no declarad"), "no_declarada"),
+    (re.compile(r"inmutable"), "inmutable"),
+    (re.compile(r"fuera de bucle"), "break_continue"),
+    (re.compile(r"retornar|retorno"), "retorno"),
+    (re.compile(r"null sin comprobación"), "null_safety"),
+    (re.compile(r"^(?:Línea \S+: )?(?:Operador|Comparación)"), "operacion"),
+    (re.compile(r"Tipo incompatible|Asignación|No se puede asignar|cast"), "tipo_incompatible"),
+)
+
+
+def error_code(description: str) -> str:
+    """Código corto y estable para una descripción de error ('otro' si no se reconoce)."""
+    for pattern, code in _ERROR_CODES:
+        if pattern.search(description):
+            return code
+    return "otro"
+
+
+# ---------------- registro desde analyzer_service ----------------
+
+def phase_total_ns(timings_ns: Dict[str, int]) -> int:
+    """Suma de las subfases; las claves ``regla:<nombre>`` ya están dentro de ``semantic_pass``."""
+    return sum(elapsed for name, elapsed in timings_ns.items() if ":" not in name)
+
+
+def record_phase(phase: str, timings_ns: Dict[str, int], errors: List[Dict], tokens: Optional[int] = None) -> None:
+    """Una fase terminada: conteo, latencia, errores y aciertos de la caché de parseo."""
+    codes = [error_code(entry["description"]) for entry in errors]
+    registry = REGISTRY
+    with registry.lock:
+        registry.analyses.inc((phase,))
+        registry.duration.observe(phase_total_ns(timings_ns) / 1e9, (phase,))
+        for code in codes:
+            registry.errors.inc((phase, code))
+        if tokens is not None:
+            registry.tokens.inc(amount=tokens)
+        if "parse_cache_hit" in timings_ns:
+            registry.cache.inc(("parse", "hit"))
+        elif "parse_cache_store" in timings_ns:
+            registry.cache.inc(("parse", "miss"))
+
+
+def record_analysis(code: str, metrics: Dict[str, Dict]) -> None:
+    """Un análisis completo: latencia total y tamaño de la entrada."""
+    elapsed = sum(phase_total_ns(phase.get("timings_ns", {})) for phase in metrics.values())
+    size = len(code.encode("utf-8"))
+    registry = REGISTRY
+    with registry.lock:
+        registry.analyses.inc(("completo",))
+        registry.duration.observe(elapsed / 1e9, ("completo",))
+        registry.input_bytes.observe(size)
+
+
+def record_cache(cache: str, hit: bool, count: int = 1) -> None:
+    registry = REGISTRY
+    with registry.lock:
+        registry.cache.inc((cache, "hit" if hit else "miss"), count)
+
+
+# ---------------- exposición ----------------
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def write(path) -> Path:
+    """Vuelca las métricas a ``path`` de forma atómica (nunca queda a medias)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            out.write(render())
+        os.replace(temp_name, path)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass  # una línea por scrape no aporta nada
+
+
+def serve(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Activa el registro y atiende ``GET /metrics`` en un hilo de fondo."""
+    enable()
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
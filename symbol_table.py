@@ -0,0 +1,153 @@
+"""Tabla de símbolos compacta para el análisis semántico de TokenMasters.
+
+- Los nombres de identificador se internan una sola vez y se representan
+  con un entero (``name_id``); las tablas se indexan por ese entero.
+- Cada símbolo es un registro con ``__slots__`` y banderas en bits
+  (final, const, parámetro) en lugar de un dict por variable.
+- Los ámbitos forman una pila de marcos: abrir un ámbito es O(1) y cerrarlo
+  cuesta lo que declaró (O(1) amortizado por declaración). Un índice
+  ``name_id -> símbolo visible`` mantiene la búsqueda en O(1) sin importar
+  la profundidad; cada símbolo enlaza al que oculta (``outer``).
+- Bajo la pila puede colgar una ``base`` inmutable (p. ej. las globales de
+  otros segmentos en el diagnóstico en vivo) que se comparte entre tablas
+  sin copiarse; ``snapshot()`` produce esa base a partir del ámbito global.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+# Banderas de Symbol.flags
+FINAL = 1
+CONST = 2
+PARAM = 4
+
+_names: List[str] = []
+_name_ids: Dict[str, int] = {}
+_intern_lock = threading.Lock()
+
+
+def name_id(name: str) -> int:
+    """Identificador entero (estable durante el proceso) del nombre dado."""
+    ident = _name_ids.get(name)
+    if ident is None:
+        with _intern_lock:
+            ident = _name_ids.get(name)
+            if ident is None:
+                name = sys.intern(str(name))
+                ident = len(_names)
+                _names.append(name)
+                _name_ids[name] = ident
+    return ident
+
+
+def name_of(ident: int) -> str:
+    return _names[ident]
+
+
+class Symbol:
+    """Variable declarada: tipo, banderas y línea de declaración.
+
+    ``outer`` apunta al símbolo del mismo nombre que esta declaración oculta
+    (o None) y ``depth`` es el ámbito donde se declaró; así la tabla no
+    necesita listas ni dicts por ámbito para resolver el ocultamiento.
+    """
+
+    __slots__ = ("name_id", "type", "flags", "lineno", "outer", "depth")
+
+    def __init__(self, ident: int, type: str, flags: int = 0, lineno: Optional[int] = None) -> None:
+        self.name_id = ident
+        self.type = type
+        self.flags = flags
+        self.lineno = lineno
+        self.outer = None
+        self.depth = 0
+
+    @property
+    def name(self) -> str:
+        return _names[self.name_id]
+
+    @property
+    def is_final(self) -> bool:
+        return bool(self.flags & FINAL)
+
+    @property
+    def is_const(self) -> bool:
+        return bool(self.flags & CONST)
+
+    @property
+    def is_param(self) -> bool:
+        return bool(self.flags & PARAM)
+
+    def __repr__(self) -> str:
+        # Sin la línea: la clave de caché del diagnóstico en vivo no debe
+        # cambiar sólo porque la declaración se movió.
+        return f"Symbol({self.name!r}, {self.type!r}, flags={self.flags})"
+
+
+class SymbolTable:
+    """Pila de ámbitos con búsqueda O(1) por ``name_id``."""
+
+    __slots__ = ("_frames", "_visible", "_base")
+
+    def __init__(self, base: Optional[Mapping[int, Symbol]] = None) -> None:
+        self._base = base if base is not None else {}
+        # Símbolos declarados en cada ámbito abierto, en orden de declaración
+        self._frames: List[List[Symbol]] = [[]]
+        # name_id -> símbolo visible más interno (los ocultos cuelgan de .outer)
+        self._visible: Dict[int, Symbol] = {}
+
+    @property
+    def depth(self) -> int:
+        return len(self._frames)
+
+    def push(self) -> None:
+        self._frames.append([])
+
+    def pop(self) -> None:
+        if len(self._frames) == 1:
+            return  # el ámbito global no se cierra
+        visible = self._visible
+        # Del último al primero: un nombre repetido en el ámbito cuelga del anterior
+        for symbol in reversed(self._frames.pop()):
+            if symbol.outer is None:
+                del visible[symbol.name_id]
+            else:
+                visible[symbol.name_id] = symbol.outer
+
+    def declare(self, ident: int, symbol: Symbol) -> None:
+        symbol.name_id = ident
+        symbol.depth = len(self._frames) - 1
+        symbol.outer = self._visible.get(ident)
+        self._visible[ident] = symbol
+        self._frames[-1].append(symbol)
+
+    def lookup(self, ident: int) -> Optional[Symbol]:
+        symbol = self._visible.get(ident)
+        if symbol is not None:
+            return symbol
+        return self._base.get(ident)
+
+    def lookup_local(self, ident: int) -> Optional[Symbol]:
+        symbol = self._visible.get(ident)
+        if symbol is not None and symbol.depth == len(self._frames) - 1:
+            return symbol
+        return None
+
+    def current_size(self) -> int:
+        """Cantidad de símbolos declarados en el ámbito actual."""
+        return len(self._frames[-1])
+
+    def current(self) -> Iterator[Tuple[str, Symbol]]:
+        """Pares (nombre, símbolo) declarados en el ámbito actual."""
+        for symbol in self._frames[-1]:
+            yield _names[symbol.name_id], symbol
+
+    def snapshot(self) -> Dict[int, Symbol]:
+        """Ámbito global actual ({name_id: Symbol}), utilizable como ``base`` de otra tabla.
+
+        Las tablas que lo reciben como base lo comparten sin copiarlo.
+        """
+        return {symbol.name_id: symbol for symbol in self._frames[0]}
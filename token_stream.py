@@ -0,0 +1,168 @@
+"""Tokens ya reconocidos que el parser puede volver a consumir sin el lexer.
+
+``parser.parse()`` pide los tokens de a uno a un objeto con la interfaz del
+lexer de PLY (``input``, ``token``, ``lineno``, ``lexpos``, ``lexerrorf``).
+Un ``TokenArray`` guarda el resultado de tokenizar un código una vez:
+
+- tipo, valor (el texto del token), línea y posición de cada token, en
+  listas paralelas;
+- los errores léxicos como (índice del token siguiente, línea, posición),
+  para volver a llamar a ``lexerrorf`` en el mismo punto del flujo;
+- la línea final y el largo del código.
+
+``ReplayLexer`` entrega esos tokens con la interfaz de PLY, así que sirve
+para ``parser.parse_source(codigo, lexer=...)`` y para ``_parse_timed``:
+el análisis léxico, un caché o otro proceso tokenizan y el parser sólo
+consume. Los mensajes de error léxico, los límites de ``parser.limits`` y
+los tokens sintéticos de ``_balanced_tokens`` se comportan igual que con el
+lexer real.
+
+``to_bytes``/``from_bytes`` usan el formato de ``ast_codec`` (sin pickle);
+pickle también funciona.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+import ply.lex as lex
+
+import lexer as lexer_module
+
+
+class TokenArray:
+    """Tokens y errores léxicos de un código, en el orden del lexer."""
+
+    __slots__ = ("types", "values", "lines", "positions", "errors", "end_line", "source_length")
+
+    def __init__(self) -> None:
+        self.types: List[str] = []
+        self.values: List[str] = []
+        self.lines: List[int] = []
+        self.positions: List[int] = []
+        self.errors: List[Tuple[int, int, int]] = []
+        self.end_line = 1
+        self.source_length = 0
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def append(self, tok) -> None:
+        self.types.append(tok.type)
+        self.values.append(tok.value)
+        self.lines.append(tok.lineno)
+        self.positions.append(tok.lexpos)
+
+    def add_error(self, lineno: int, lexpos: int) -> None:
+        self.errors.append((len(self.types), lineno, lexpos))
+
+    def finish(self, lexer, data: str) -> "TokenArray":
+        """Cierra el arreglo con el estado final del lexer que lo produjo."""
+        self.end_line = lexer.lineno
+        self.source_length = len(data)
+        return self
+
+    def replay(self) -> "ReplayLexer":
+        return ReplayLexer(self)
+
+    def to_bytes(self) -> bytes:
+        import ast_codec
+
+        return ast_codec.encode((
+            "tokens", self.types, self.values, self.lines, self.positions,
+            [list(error) for error in self.errors], self.end_line, self.source_length,
+        ))
+
+    @classmethod
+    def from_bytes(cls, data) -> "TokenArray":
+        import ast_codec
+
+        tag, types, values, lines, positions, errors, end_line, source_length = ast_codec.decode(data)
+        if tag != "tokens":
+            raise ValueError("No es un arreglo de tokens")
+        array = cls()
+        array.types, array.values, array.lines, array.positions = types, values, lines, positions
+        array.errors = [tuple(error) for error in errors]
+        array.end_line, array.source_length = end_line, source_length
+        return array
+
+
+def record_tokens(data: str, lexer=None) -> TokenArray:
+    """Tokeniza ``data`` una vez y guarda tokens y errores (no imprime nada)."""
+    lexer = lexer or lexer_module.get_lexer()
+    array = TokenArray()
+
+    def record_error(t) -> None:
+        array.add_error(t.lexer.lineno, t.lexpos)
+        t.lexer.skip(1)
+
+    lexer.lexerrorf = record_error
+    lexer.input(data)
+    append = array.append
+    while True:
+        tok = lexer.token()
+        if not tok:
+            break
+        append(tok)
+    return array.finish(lexer, data)
+
+
+class ReplayLexer:
+    """Entrega los tokens de un ``TokenArray`` con la interfaz del lexer de PLY.
+
+    ``lexerrorf`` empieza como ``lexer.t_error`` (igual que un lexer de
+    ``lexer.get_lexer()``) y se llama en cada error léxico guardado.
+    """
+
+    def __init__(self, tokens: TokenArray) -> None:
+        self.tokens = tokens
+        self.lexerrorf = lexer_module.t_error
+        self.input("")
+
+    def input(self, data: str) -> None:
+        if data and len(data) != self.tokens.source_length:
+            raise ValueError("El código no es el que produjo estos tokens")
+        self.lexdata = data
+        self.lexpos = 0
+        self.lineno = 1
+        self._index = 0
+        self._next_error = 0
+
+    def skip(self, n: int) -> None:
+        pass  # las posiciones ya son las del lexer original
+
+    def close(self) -> None:
+        pass  # nada que liberar (ver parse_pipeline.StreamingLexer)
+
+    def _replay_errors(self, index: int) -> None:
+        errors = self.tokens.errors
+        while self._next_error < len(errors) and errors[self._next_error][0] == index:
+            _, lineno, lexpos = errors[self._next_error]
+            self._next_error += 1
+            self.lineno, self.lexpos = lineno, lexpos
+            tok = lex.LexToken()
+            tok.type = "error"
+            tok.value = self.lexdata[lexpos:]
+            tok.lineno = lineno
+            tok.lexpos = lexpos
+            tok.lexer = self
+            if self.lexerrorf is None:
+                raise lex.LexError(f"Illegal character '{tok.value[:1]}' at index {lexpos}", tok.value)
+            self.lexerrorf(tok)
+
+    def token(self) -> Optional[lex.LexToken]:
+        tokens = self.tokens
+        index = self._index
+        if self._next_error < len(tokens.errors):
+            self._replay_errors(index)
+        if index >= len(tokens.types):
+            self.lineno = tokens.end_line
+            self.lexpos = tokens.source_length
+            return None
+        tok = lex.LexToken()
+        tok.type = tokens.types[index]
+        tok.value = tokens.values[index]
+        tok.lineno = self.lineno = tokens.lines[index]
+        tok.lexpos = self.lexpos = tokens.positions[index]
+        self._index = index + 1
+        return tok
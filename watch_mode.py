@@ -0,0 +1,225 @@
+"""Modo vigilancia: vuelve a analizar sólo los .dart que cambiaron.
+
+Pensado para sesiones de laboratorio en las que muchos estudiantes guardan
+archivos en una carpeta compartida. Un ``DartWatcher`` recorre el árbol cada
+``interval`` segundos (sondeo: funciona igual en discos de red, donde
+inotify no ve los cambios hechos desde otras máquinas) y por archivo guarda:
+
+- tamaño y ``mtime``, para descartar sin leerlos los que no se tocaron;
+- el hash del contenido: guardar sin cambios no provoca un nuevo análisis;
+- los diagnósticos léxicos, sintácticos y semánticos del último análisis.
+
+El AST y los errores de parseo salen de la caché persistente
+(``parse_cache.py``), así que reiniciar el vigilante sobre los mismos
+archivos no vuelve a parsearlos. No se escriben logs: para el log oficial
+sigue estando ``python parser.py <archivo> <usuario>``.
+
+Por cada archivo modificado se imprime un diff compacto: ``+`` errores
+nuevos y ``-`` errores corregidos. Un error que sólo cambió de línea (se
+agregaron líneas arriba) no cuenta como nuevo ni como corregido.
+
+Uso:
+    python parser.py --watch <carpeta> [--intervalo S]
+    python watch_mode.py <carpeta> [--intervalo S] [--una-vez]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import re
+import sys
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import analyzer_service
+from analyzer_service import format_error_entry
+from workspace_index import iter_dart_files
+
+DEFAULT_INTERVAL = 1.0
+
+_LINE_REF_RE = re.compile(r"([Ll][íi]nea\s+)\d+")
+
+
+def _diagnostic_key(entry: Dict) -> Tuple[str, str]:
+    # Sin número de línea: mover código no debe contar como error nuevo
+    return entry["type"], _LINE_REF_RE.sub(r"\1#", entry["description"])
+
+
+def diff_diagnostics(old: List[Dict], new: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """(nuevos, corregidos) entre dos listas de diagnósticos, como multiconjuntos."""
+    remaining = Counter(_diagnostic_key(e) for e in old)
+    added = []
+    for entry in new:
+        key = _diagnostic_key(entry)
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            added.append(entry)
+    fixed = []
+    for entry in old:
+        key = _diagnostic_key(entry)
+        if remaining[key]:
+            remaining[key] -= 1
+            fixed.append(entry)
+    return added, fixed
+
+
+@dataclass
+class FileState:
+    size: int
+    mtime_ns: int
+    digest: str
+    errors: List[Dict]
+
+
+@dataclass
+class FileChange:
+    path: Path
+    errors: List[Dict]
+    added: List[Dict] = field(default_factory=list)
+    fixed: List[Dict] = field(default_factory=list)
+    created: bool = False
+    removed: bool = False
+
+
+class DartWatcher:
+    """Estado por archivo de un árbol de carpetas y análisis de lo que cambió."""
+
+    def __init__(self, root, interval: float = DEFAULT_INTERVAL) -> None:
+        self.root = Path(root)
+        self.interval = interval
+        self.files: Dict[Path, FileState] = {}
+        # hash del contenido -> diagnósticos (copias idénticas se analizan una vez)
+        self._by_digest: Dict[str, List[Dict]] = {}
+        self.analyzed = 0
+        self._stop = threading.Event()
+
+    def _analyze(self, data: bytes) -> Tuple[str, List[Dict]]:
+        digest = hashlib.sha256(data).hexdigest()
+        errors = self._by_digest.get(digest)
+        if errors is None:
+            try:
+                code = data.decode("utf-8-sig")
+            except UnicodeDecodeError as exc:
+                errors = [format_error_entry(f"El archivo no es UTF-8 válido: {exc}", "Archivo")]
+            else:
+                errors = analyzer_service.analyze_without_logs(code)
+                self.analyzed += 1
+            self._by_digest[digest] = errors
+        return digest, errors
+
+    def scan(self) -> List[FileChange]:
+        """Una pasada: analiza lo nuevo o modificado y retorna los cambios."""
+        changes: List[FileChange] = []
+        seen = set()
+        for entry in iter_dart_files(self.root):
+            path = Path(entry.path)
+            seen.add(path)
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            previous = self.files.get(path)
+            if previous is not None and (previous.size, previous.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            try:
+                data = path.read_bytes()
+            except OSError:
+                continue  # se está escribiendo o se borró: la próxima pasada lo verá
+            digest, errors = self._analyze(data)
+            self.files[path] = FileState(stat.st_size, stat.st_mtime_ns, digest, errors)
+            if previous is None:
+                changes.append(FileChange(path, errors, added=list(errors), created=True))
+            elif previous.digest != digest:
+                added, fixed = diff_diagnostics(previous.errors, errors)
+                changes.append(FileChange(path, errors, added, fixed))
+
+        for path in [p for p in self.files if p not in seen]:
+            state = self.files.pop(path)
+            changes.append(FileChange(path, [], fixed=list(state.errors), removed=True))
+
+        # Sólo se conservan los diagnósticos de contenidos que siguen en disco
+        live = {state.digest for state in self.files.values()}
+        self._by_digest = {d: e for d, e in self._by_digest.items() if d in live}
+        return changes
+
+    def watch(self, on_changes: Callable[[List[FileChange]], None]) -> None:
+        """Llama ``on_changes`` tras cada pasada con cambios hasta ``stop()``."""
+        self._stop.clear()
+        while not self._stop.is_set():
+            changes = self.scan()
+            if changes:
+                on_changes(changes)
+            self._stop.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def format_changes(changes: List[FileChange], root: Path, details: bool = True) -> List[str]:
+    """Líneas del diff compacto de una pasada (``details``: listar cada error)."""
+    lines = []
+    stamp = datetime.now().strftime("%H:%M:%S")
+    for change in changes:
+        try:
+            name = change.path.relative_to(root)
+        except ValueError:
+            name = change.path
+        if change.removed:
+            lines.append(f"[{stamp}] {name}: eliminado")
+            continue
+        total = len(change.errors)
+        if change.created:
+            summary = f"{total} error(es)" if total else "sin errores"
+        elif not change.added and not change.fixed:
+            summary = f"sin cambios en los diagnósticos ({total} error(es))"
+        else:
+            summary = f"{len(change.added)} nuevo(s), {len(change.fixed)} corregido(s), {total} en total"
+        lines.append(f"[{stamp}] {name}: {summary}")
+        if not details:
+            continue
+        lines.extend(f"  + [{e['type']}] {e['description']}" for e in change.added)
+        lines.extend(f"  - [{e['type']}] {e['description']}" for e in change.fixed)
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = argparse.ArgumentParser(description="Vigila una carpeta y analiza los .dart que cambian")
+    args.add_argument("carpeta")
+    args.add_argument("--intervalo", type=float, default=DEFAULT_INTERVAL, help="segundos entre pasadas")
+    args.add_argument("--una-vez", action="store_true", help="una sola pasada y salir")
+    opts = args.parse_args(argv)
+
+    root = Path(opts.carpeta)
+    if not root.is_dir():
+        print(f"No existe la carpeta: {root}", file=sys.stderr)
+        return 2
+    watcher = DartWatcher(root, opts.intervalo)
+
+    def report(changes: List[FileChange], details: bool = True) -> None:
+        for line in format_changes(changes, root, details):
+            print(line)
+        sys.stdout.flush()
+
+    # Primera pasada: sólo el resumen por archivo (con --una-vez, el detalle)
+    report(watcher.scan(), details=opts.una_vez)
+    total = sum(len(state.errors) for state in watcher.files.values())
+    print(f"{len(watcher.files)} archivo(s) .dart, {total} error(es). ", end="")
+    if opts.una_vez:
+        print()
+        return 1 if total else 0
+    print("Vigilando cambios (Ctrl+C para salir)...", flush=True)
+    try:
+        watcher.watch(report)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""Índice de funciones y clases de todos los .dart de un proyecto.
+
+``function_table`` se arma por archivo y se descarta al terminar, así que
+una llamada a una función definida en otro archivo queda con tipo
+'unknown'. Este índice reúne las declaraciones de nivel superior de cada
+archivo del proyecto:
+
+- funciones: nombre -> ``{'type', 'params'}``, tal como las registran las
+  producciones ``p_function_*``;
+- clases: nombres de ``p_class_declaration`` (una llamada ``Persona()`` es
+  el constructor y su tipo es ``Persona``).
+
+El índice se guarda en ``.cache/workspace/`` (JSON, uno por carpeta raíz) y
+se actualiza de forma incremental: sólo se vuelven a leer los archivos cuyo
+tamaño o ``mtime`` cambiaron, y sólo se parsean aquellos cuyo contenido
+cambió. El parseo sale además de la caché persistente (``parse_cache.py``).
+Con muchos archivos pendientes se reparten en un pool de procesos.
+
+``parser.set_workspace`` publica el índice para la fase semántica; las
+declaraciones del archivo analizado siempre tienen prioridad.
+
+Uso:
+    python parser.py <archivo.dart> <usuario-git> --semantico --proyecto <carpeta>
+    python workspace_index.py <carpeta> [--workers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import parse_cache
+import parser as parser_module
+from analyzer_service import ANALYSIS_LOCK
+
+INDEX_DIR = Path(__file__).resolve().parent / ".cache" / "workspace"
+
+# Carpetas que nunca contienen código del proyecto
+SKIP_DIRS = {"__pycache__", "logs", "node_modules"}
+
+# Por debajo de esta cantidad de archivos pendientes no compensa el pool
+MIN_PARALLEL_FILES = 8
+
+
+def iter_dart_files(root) -> Iterator[os.DirEntry]:
+    """Archivos .dart bajo ``root`` (sin carpetas ocultas ni de ``SKIP_DIRS``)."""
+    pending = [str(root)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith(".") and entry.name not in SKIP_DIRS:
+                            pending.append(entry.path)
+                    elif entry.name.endswith(".dart") and entry.is_file():
+                        yield entry
+        except OSError:
+            continue  # carpeta borrada o sin permisos durante el recorrido
+
+
+def top_level_declarations(tree) -> Tuple[List[str], List[str]]:
+    """(funciones, clases) declaradas en el nivel superior del AST."""
+    functions: List[str] = []
+    classes: List[str] = []
+    if not tree or tree[0] != "program":
+        return functions, classes
+    for stmt in tree[1]:
+        if not isinstance(stmt, tuple) or not stmt:
+            continue
+        if stmt[0] in ("function", "arrow_function"):
+            functions.append(str(stmt[2]))
+        elif stmt[0] == "function_void":
+            functions.append(stmt[1])
+        elif stmt[0] == "class":
+            classes.append(stmt[1])
+    return functions, classes
+
+
+def extract_declarations(code: str) -> Tuple[Dict[str, Dict], List[str]]:
+    """Firmas de las funciones y nombres de las clases de nivel superior."""
+    with ANALYSIS_LOCK:
+        parser_module.reset_semantic_state()
+        with redirect_stdout(io.StringIO()):
+            tree = parser_module._parse_timed(code)
+        names, classes = top_level_declarations(tree)
+        table = parser_module.function_table
+        functions = {name: table[name] for name in names if name in table}
+    return functions, classes
+
+
+@dataclass
+class FileEntry:
+    size: int
+    mtime_ns: int
+    digest: str
+    functions: Dict[str, Dict] = field(default_factory=dict)
+    classes: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "FileEntry":
+        entry = cls(**data)
+        # JSON no tiene tuplas: los parámetros vuelven a ser (tipo, nombre)
+        for signature in entry.functions.values():
+            signature["params"] = [tuple(param) for param in signature["params"]]
+        return entry
+
+
+def _index_file(path: str, previous_digest: Optional[str]) -> Optional[FileEntry]:
+    """Lee y, si el contenido cambió, parsea un archivo (corre también en el pool)."""
+    try:
+        stat = os.stat(path)
+        with open(path, "rb") as source:
+            data = source.read()
+    except OSError:
+        return None
+    digest = hashlib.sha256(data).hexdigest()
+    if digest == previous_digest:
+        return FileEntry(stat.st_size, stat.st_mtime_ns, digest)  # sólo se tocó
+    try:
+        functions, classes = extract_declarations(data.decode("utf-8-sig"))
+    except UnicodeDecodeError:
+        functions, classes = {}, []
+    return FileEntry(stat.st_size, stat.st_mtime_ns, digest, functions, classes)
+
+
+class WorkspaceIndex:
+    """Declaraciones de nivel superior de los .dart bajo ``root``."""
+
+    def __init__(self, root) -> None:
+        self.root = Path(root).resolve()
+        self.files: Dict[str, FileEntry] = {}
+        self.parsed = 0
+        key = hashlib.sha256(str(self.root).encode("utf-8")).hexdigest()[:16]
+        self.path = INDEX_DIR / f"{key}.json"
+
+    # ---------------- persistencia ----------------
+
+    def load(self) -> bool:
+        """Carga el índice guardado; False si no existe o es de otra gramática."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("grammar") != parse_cache.grammar_fingerprint():
+                return False
+            self.files = {rel: FileEntry.from_json(entry) for rel, entry in data["files"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            self.files = {}
+            return False
+        return True
+
+    def save(self) -> None:
+        data = {
+            "grammar": parse_cache.grammar_fingerprint(),
+            "root": str(self.root),
+            "files": {rel: asdict(entry) for rel, entry in sorted(self.files.items())},
+        }
+        INDEX_DIR.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=str(INDEX_DIR), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as out:
+                json.dump(data, out, ensure_ascii=False)
+            os.replace(temp_name, self.path)
+        except OSError:
+            try:
+                os.unlink(temp_name)
+            except OSError:
+                pass
+
+    # ---------------- actualización ----------------
+
+    def update(self, workers: Optional[int] = None) -> int:
+        """Sincroniza el índice con el disco; retorna cuántos archivos se releyeron o eliminaron."""
+        pending: List[Tuple[str, Optional[str]]] = []
+        seen = set()
+        for entry in iter_dart_files(self.root):
+            rel = os.path.relpath(entry.path, self.root)
+            seen.add(rel)
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            known = self.files.get(rel)
+            if known is not None and (known.size, known.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            pending.append((entry.path, known.digest if known is not None else None))
+
+        removed = [rel for rel in self.files if rel not in seen]
+        for rel in removed:
+            del self.files[rel]
+
+        workers = workers or 1
+        if workers > 1 and len(pending) >= MIN_PARALLEL_FILES:
+            import parallel_semantic
+            context = multiprocessing.get_context(parallel_semantic.START_METHOD)
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                results = list(pool.map(_index_file, *zip(*pending), chunksize=4))
+        else:
+            results = [_index_file(path, digest) for path, digest in pending]
+
+        for (path, previous_digest), entry in zip(pending, results):
+            rel = os.path.relpath(path, self.root)
+            if entry is None:
+                self.files.pop(rel, None)
+            elif entry.digest == previous_digest:
+                # Mismo contenido: se conservan las declaraciones ya indexadas
+                known = self.files[rel]
+                entry.functions, entry.classes = known.functions, known.classes
+                self.files[rel] = entry
+            else:
+                self.parsed += 1
+                self.files[rel] = entry
+        return len(pending) + len(removed)
+
+    # ---------------- consultas ----------------
+
+    def _relative(self, path) -> Optional[str]:
+        if path is None:
+            return None
+        return os.path.relpath(Path(path).resolve(), self.root)
+
+    def functions(self, exclude=None) -> Dict[str, Dict]:
+        """Firmas de todas las funciones; en nombres repetidos gana el primer archivo (orden alfabético)."""
+        skip = self._relative(exclude)
+        merged: Dict[str, Dict] = {}
+        for rel in sorted(self.files):
+            if rel != skip:
+                for name, signature in self.files[rel].functions.items():
+                    merged.setdefault(name, signature)
+        return merged
+
+    def classes(self, exclude=None) -> List[str]:
+        skip = self._relative(exclude)
+        return sorted({name for rel, entry in self.files.items() if rel != skip for name in entry.classes})
+
+
+def open_index(root, workers: Optional[int] = None) -> WorkspaceIndex:
+    """Carga el índice guardado de ``root``, lo pone al día y lo vuelve a guardar."""
+    index = WorkspaceIndex(root)
+    index.load()
+    if index.update(workers):
+        index.save()
+    return index
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = argparse.ArgumentParser(description="Índice de funciones y clases de un proyecto Dart")
+    args.add_argument("carpeta")
+    args.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    opts = args.parse_args(argv)
+
+    if not os.path.isdir(opts.carpeta):
+        print(f"No existe la carpeta: {opts.carpeta}", file=sys.stderr)
+        return 2
+    index = open_index(opts.carpeta, opts.workers)
+    functions = index.functions()
+    print(f"{len(index.files)} archivo(s), {index.parsed} parseado(s) en esta corrida")
+    for name, signature in sorted(functions.items()):
+        params = ", ".join(f"{t} {n}" for t, n in signature["params"])
+        print(f"  {signature['type']} {name}({params})")
+    for name in index.classes():
+        print(f"  class {name}")
+    print(f"Índice: {index.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())